@@ -8,10 +8,18 @@ This module contains the following helper functions for parsing command-line arg
 - `dir_path(path_name)` - Create directory and necessary parent directories.
 - `file_path(path_name)` - Verify existence of given file.
 - `has_parent(path_name)` - Create necessary parent directories for file path.
+- `refresh_policy(value)` - Parse the refresh policy of the enrichment's sources.
 """
 
-from argparse import ArgumentParser, RawDescriptionHelpFormatter
+from argparse import ArgumentParser, ArgumentTypeError, RawDescriptionHelpFormatter
 from pathlib import Path
+from typing import Dict
+
+from minall.enrichment.precedence import SourcePrecedence
+from minall.enrichment.utils import FilteredLinks
+from minall.tables.enrichment_state import parse_max_age, parse_refresh_policy
+from minall.utils.database import DATABASE_PROFILES
+from minall.utils.http_cache import DEFAULT_TTL
 
 
 def dir_path(path_name: str) -> str:
@@ -70,9 +78,41 @@ CLI_ARGS = [
     "url_col",
     "shared_content_file",
     "buzzsumo_only",
+    "compression",
+    "export_format",
+    "incremental",
+    "refresh",
+    "db_profile",
+    "analyze",
+    "precedence",
+    "http_cache",
+    "http_cache_ttl",
+    "api_cache",
+    "api_cache_ttl",
+    "cache_only",
+    "resume",
+    "quota_ledger",
 ]
 
 
+def refresh_policy(value: str) -> Dict:
+    """Function to convert CLI argument to the refresh policy of the enrichment's sources.
+
+    Args:
+        value (str): Comma-separated pairs of source and maximum age, i.e. "buzzsumo=7d".
+
+    Raises:
+        ArgumentTypeError: The policy is malformed or declares an unknown source.
+
+    Returns:
+        Dict: Key-value pairs of source and maximum age.
+    """
+    try:
+        return parse_refresh_policy(value, sources=FilteredLinks.SOURCE_SUBSETS)
+    except ValueError as e:
+        raise ArgumentTypeError(str(e))
+
+
 def cli_args() -> dict:
     """Function to call and parse command-line arguments.
 
@@ -132,5 +172,109 @@ def cli_args() -> dict:
         action="store_true",
         help="[Optional] Flag indicating only Buzzsumo API will be called on links file.",
     )
+    parser.add_argument(
+        "--compression",
+        dest="compression",
+        choices=["gzip", "zstd"],
+        required=False,
+        help="[Optional] Compress the exported files with gzip or zstd. The zstd compression of CSV files requires the 'zstandard' package.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="export_format",
+        choices=["csv", "parquet"],
+        default="csv",
+        required=False,
+        help="[Optional] Format of the exported files. The Parquet format requires the 'pyarrow' package. Defaults to CSV.",
+    )
+    parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        default=False,
+        required=False,
+        action="store_true",
+        help="[Optional] Flag indicating the tables of the database are kept between runs and each source is only called on links it has not yet enriched. Requires --database.",
+    )
+    parser.add_argument(
+        "--refresh",
+        dest="refresh",
+        type=refresh_policy,
+        required=False,
+        help="[Optional] In incremental mode, maximum age per source of previously collected data, i.e. 'buzzsumo=7d,scraper=never'. Ages are given in minutes (m), hours (h), days (d), or weeks (w). Sources: buzzsumo, youtube, twitter, crowdtangle, scraper. By default, data is never refreshed, and links for which a source returned no data are retried after a day, then after a delay that doubles with each retry, up to 30 days. Requires --incremental.",
+    )
+    parser.add_argument(
+        "--db-profile",
+        dest="db_profile",
+        choices=list(DATABASE_PROFILES),
+        required=False,
+        help="[Optional] Performance profile of the SQLite database. 'bulk' is fastest, but a power loss can lose the last commits and a crash while the in-files are ingested can corrupt the database, which must then be rebuilt; 'safe' syncs the database at every commit. If not given, SQLite's default settings are used.",
+    )
+    parser.add_argument(
+        "--analyze",
+        dest="analyze",
+        default=False,
+        required=False,
+        action="store_true",
+        help="[Optional] Flag indicating statistics on the database's tables are gathered and the query plans of the selection of links are printed before the enrichment. The query plans of each source's selection of due links are only printed in incremental mode.",
+    )
+    parser.add_argument(
+        "--precedence",
+        dest="precedence",
+        type=SourcePrecedence.parse,
+        required=False,
+        help="[Optional] Precedence of the sources for given columns, from highest to lowest, i.e. 'title=youtube>buzzsumo,work_type=scraper>buzzsumo'. Sources: buzzsumo, youtube, twitter, crowdtangle, other_social, scraper. By default, platform-specific data replaces Buzzsumo data.",
+    )
+    parser.add_argument(
+        "--http-cache",
+        dest="http_cache",
+        type=has_parent,
+        required=False,
+        help="[Optional] Path to an SQLite database caching the scraped pages, so that a repeated or resumed run does not download them again.",
+    )
+    parser.add_argument(
+        "--http-cache-ttl",
+        dest="http_cache_ttl",
+        type=parse_max_age,
+        default=DEFAULT_TTL,
+        required=False,
+        help="[Optional] Age after which a cached page is revalidated with the server, i.e. '12h', or 'never'. Ages are given in minutes (m), hours (h), days (d), or weeks (w). Defaults to 7 days.",
+    )
+    parser.add_argument(
+        "--api-cache",
+        dest="api_cache",
+        type=has_parent,
+        required=False,
+        help="[Optional] Path to an SQLite database caching the raw payloads of the Buzzsumo, CrowdTangle, and YouTube APIs, so that a later run does not query them again.",
+    )
+    parser.add_argument(
+        "--api-cache-ttl",
+        dest="api_cache_ttl",
+        type=parse_refresh_policy,
+        required=False,
+        help="[Optional] Age per source after which a cached API payload is queried again, i.e. 'buzzsumo=1d,youtube_channel=never'. Ages are given in minutes (m), hours (h), days (d), or weeks (w). Sources: buzzsumo, crowdtangle, youtube_video, youtube_channel. Defaults to 7 days.",
+    )
+    parser.add_argument(
+        "--cache-only",
+        dest="cache_only",
+        default=False,
+        required=False,
+        action="store_true",
+        help="[Optional] Flag indicating the data is normalized again from the HTTP and API caches, without any network access. Requires --http-cache or --api-cache.",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        default=False,
+        required=False,
+        action="store_true",
+        help="[Optional] Flag indicating an interrupted run on the database is resumed: each source skips the links it already enriched before the interruption. Progress is checkpointed in the database, so a run with this flag can itself be resumed. Implies --incremental and requires --database.",
+    )
+    parser.add_argument(
+        "--quota-ledger",
+        dest="quota_ledger",
+        type=has_parent,
+        required=False,
+        help="[Optional] Path to an SQLite database recording the quota spent per YouTube API key and day, and per Buzzsumo token and month, so that later runs in the same period do not overdraw the keys.",
+    )
     args = parser.parse_args()
     return args.__dict__
@@ -15,9 +15,15 @@ def cli():
     """Run minall workflow from the command line."""
 
     args = cli_args()
+    analyze = args.pop("analyze")
 
     app = Minall(**args)
 
+    if analyze:
+        for name, plan in app.analyze().items():
+            print(f"Query plan of the selection '{name}':")
+            print("\n".join(plan), "\n")
+
     app.collect_and_coalesce()
 
     app.export()
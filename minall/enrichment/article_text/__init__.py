@@ -5,9 +5,11 @@
 Modules exported by this package:
 
 - `normalizer`: Dataclass to normlalize minet's Trafilatura result object.
-- `contexts`: Context manager for scraper's CSV writers, multi-threader, and progress bar.
+- `contexts`: Context manager for scraper's result sink and progress bar.
+- `engine`: Class that fetches and scrapes target URLs concurrently.
 - `get_data`: Function that runs all of the scraping process.
-- `scraper`: Class and helper function for scraping HTML.
+- `scheduler`: Class that hands out target URLs in round-robin across their domains.
+- `scraper`: Class and helper functions for scraping HTML.
 """
 
 from minall.enrichment.article_text.get_data import get_data as get_article_text
@@ -0,0 +1,174 @@
+# minall/enrichment/article_text/engine.py
+
+"""Asynchronous engine that fetches and scrapes the target URLs' HTML.
+
+The engine runs an asyncio event loop in a background thread. A fixed number of worker coroutines pull the target URLs from the iterable, one at a time, so that the number of requests in flight, and the memory held by their responses, is bounded however many URLs there are. The workers take the URLs from a `DomainScheduler`, which hands them out in round-robin across their domains, so that no domain receives more requests, or receives them faster, than its budget allows.
+
+Because minet's `request()` is blocking, each request in flight runs in a thread of a dedicated pool, which shares a single pool of HTTP connections. The parsing of the responses' HTML and the extraction of their content, which are CPU-bound and would contend for the GIL with the requests' threads, run in a pool of processes sized to the machine's cores. The processes are started from a fresh interpreter, rather than forked from the engine's process, so that they do not inherit a lock held at fork time by one of its many threads, such as the logging module's lock. The results are handed back to the calling thread through a bounded queue, so that a slow consumer pauses the workers instead of piling up results.
+
+This module contains the following class:
+
+- `FetchEngine(scraper, max_in_flight, max_per_domain, delay, max_processes)` - Fetch and scrape target URLs concurrently, yielding the scraper's results.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Generator, Iterable, Tuple
+
+from minet.extraction import TrafilaturaResult
+from minet.web import create_pool_manager
+from minall.enrichment.article_text.scheduler import (
+    DOMAIN_DELAY,
+    MAX_PER_DOMAIN,
+    DomainScheduler,
+)
+from minall.enrichment.article_text.scraper import Scraper, parse_html
+
+# Maximum number of requests in flight, across all domains
+MAX_IN_FLIGHT = 512
+# Timeout, in seconds, of each request
+REQUEST_TIMEOUT = 30.0
+# Method with which the parsing processes are started, never by forking the threaded engine
+START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Marks the end of the results
+_DONE = object()
+
+
+class FetchEngine:
+    """Class to fetch and scrape target URLs concurrently.
+
+    Examples:
+        >>> engine = FetchEngine(scraper=Scraper(), max_in_flight=8, max_processes=1)
+        >>> engine.scraper.timeout
+        30.0
+        >>> list(engine([]))
+        []
+    """
+
+    def __init__(
+        self,
+        scraper: Scraper,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_per_domain: int = MAX_PER_DOMAIN,
+        delay: float = DOMAIN_DELAY,
+        max_processes: int | None = None,
+    ) -> None:
+        """Set up the engine's limits and give the scraper a pool of HTTP connections sized for them.
+
+        Args:
+            scraper (Scraper): Scraper whose `fetch()` method requests the target URLs.
+            max_in_flight (int, optional): Maximum number of requests in flight, across all domains. Defaults to MAX_IN_FLIGHT.
+            max_per_domain (int, optional): Maximum number of requests in flight to the same domain. Defaults to MAX_PER_DOMAIN.
+            delay (float, optional): Minimum delay, in seconds, between the start of two requests to the same domain. Defaults to DOMAIN_DELAY.
+            max_processes (int | None, optional): Number of processes that parse the HTML. If None, the number of the machine's cores. Defaults to None.
+        """
+        self.scraper = scraper
+        self.max_in_flight = max_in_flight
+        self.max_per_domain = max_per_domain
+        self.delay = delay
+        self.max_processes = max_processes if max_processes else os.cpu_count() or 1
+        if scraper.pool_manager is None:
+            scraper.pool_manager = create_pool_manager(
+                parallelism=max_per_domain, num_pools=max_in_flight
+            )
+        if scraper.timeout is None:
+            scraper.timeout = REQUEST_TIMEOUT
+
+    def __call__(
+        self, urls: Iterable[str]
+    ) -> Generator[Tuple[str, TrafilaturaResult | None], None, None]:
+        """Fetch and scrape the target URLs, yielding each URL with its result as soon as it is scraped.
+
+        The results are yielded in order of completion, not in the order of the target URLs.
+
+        Args:
+            urls (Iterable[str]): Target URLs.
+
+        Yields:
+            Generator[Tuple[str, TrafilaturaResult | None], None, None]: The target URL and, if scraping was successful, minet's Trafilatura Result object.
+        """
+        loop = asyncio.new_event_loop()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.max_in_flight)
+        error = []
+
+        async def run():
+            try:
+                await self._run(urls=urls, results=results)
+            except Exception as e:
+                error.append(e)
+            await results.put(_DONE)
+            # Keep the loop running until the consumer has taken every result
+            await loop.create_future()
+
+        def serve():
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+
+        task = loop.create_task(run())
+        thread = threading.Thread(target=serve)
+        thread.start()
+        try:
+            while True:
+                item = asyncio.run_coroutine_threadsafe(results.get(), loop).result()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Stop the loop, cancelling the workers if the consumer stopped early
+            loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            loop.close()
+        if error:
+            raise error[0]
+
+    async def _run(self, urls: Iterable[str], results: asyncio.Queue) -> None:
+        """Run the worker coroutines until the target URLs are exhausted.
+
+        Args:
+            urls (Iterable[str]): Target URLs.
+            results (asyncio.Queue): Queue of the scraper's results.
+        """
+        loop = asyncio.get_running_loop()
+        fetch_pool = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        parse_pool = ProcessPoolExecutor(
+            max_workers=self.max_processes,
+            mp_context=multiprocessing.get_context(START_METHOD),
+        )
+        scheduler = DomainScheduler(
+            urls=urls, max_per_domain=self.max_per_domain, delay=self.delay
+        )
+
+        async def worker():
+            while (url := await scheduler.get()) is not None:
+                try:
+                    text = await loop.run_in_executor(
+                        fetch_pool, self.scraper.fetch, url
+                    )
+                finally:
+                    scheduler.done(url)
+                result = None
+                if text:
+                    result = await loop.run_in_executor(parse_pool, parse_html, text)
+                self.scraper.advance()
+                await results.put((url, result))
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.max_in_flight)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+            scheduler.close()
@@ -6,23 +6,35 @@
 from pathlib import Path
 
 from minall.enrichment.article_text.contexts import ContextManager
+from minall.enrichment.article_text.engine import FetchEngine
 from minall.enrichment.article_text.normalizer import NormalizedScrapedWebPage
 from minall.enrichment.article_text.scraper import Scraper
+from minall.tables.sink import ResultSink
+from minall.utils.http_cache import HTTPCache
 
 
-def get_data(data: list[str], outfile: Path):
-    """Iterating through the target URLs, scrape data and write to out-file.
+def get_data(
+    data: list[str], outfile: Path | ResultSink, cache: HTTPCache | None = None
+):
+    """Fetching the target URLs concurrently, scrape data and push it to the result sink.
+
+    If the cache is offline, the URLs it misses are skipped, without being reported as failed scrapes, since no request is made for them.
 
     Args:
         data (list[str]): Set of target URLs for scraping.
-        outfile (Path): Path to CSV file for writing normalized results.
+        outfile (Path | ResultSink): Sink for normalized results, or path to CSV file for writing them.
+        cache (HTTPCache | None, optional): Persistent cache of the scraped pages' responses. Defaults to None.
     """
+    if cache and cache.offline:
+        data = [url for url in data if url in cache]
     with ContextManager(links_file=outfile) as contexts:
-        writer, executor, progress = contexts
-        scraper = Scraper(progress=progress, total=len(data))
-        for url, result in executor.map(scraper, data):
+        writer, progress = contexts
+        scraper = Scraper(progress=progress, total=len(data), cache=cache)
+        engine = FetchEngine(scraper=scraper)
+        for url, result in engine(data):
             if result:
                 formatted_result = NormalizedScrapedWebPage.from_payload(
                     url=url, result=result
                 )
-                writer.writerow(formatted_result.as_csv_dict_row())
+                writer.writerow(formatted_result)
+            writer.mark(url, succeeded=bool(result))
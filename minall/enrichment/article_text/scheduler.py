@@ -0,0 +1,259 @@
+# minall/enrichment/article_text/scheduler.py
+
+"""Per-domain politeness scheduler for the scraper's requests.
+
+Target URLs often come in long runs from the same outlet. So that raising the number of requests in flight does not hammer a single host while others sit idle, the scheduler sorts the URLs into one queue per domain name and hands them out in turn across the domains. A domain's URL is only handed out if fewer than the domain's maximum number of requests are in flight and if the domain's delay has passed since its last request started.
+
+To keep a bounded memory footprint, the scheduler only holds a limited number of URLs in memory, and a limited number per domain. Because the URLs are read from the database in sorted order, a domain's URLs are contiguous, so the scheduler keeps reading past the domains whose queues are full: their extra URLs are spilled to a temporary SQLite database and read back, in order, as the domain's queue drains. A single domain with many URLs therefore does not keep the other domains' URLs from being read, nor hold up the scrape behind its delay.
+
+This module contains the following class:
+
+- `DomainScheduler(urls, max_per_domain, delay, lookahead, max_buffered_per_domain)` - Hand out target URLs in round-robin across their domains, within each domain's budget.
+"""
+
+import asyncio
+import sqlite3
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, List, Tuple
+
+from ural import get_hostname
+
+from minall.enrichment.utils import get_host_domain
+
+# Maximum number of requests in flight to the same domain
+MAX_PER_DOMAIN = 4
+# Minimum delay, in seconds, between the start of two requests to the same domain
+DOMAIN_DELAY = 0.5
+# Maximum number of target URLs read ahead and waiting in the domains' queues
+LOOKAHEAD = 10_000
+# Maximum number of target URLs waiting in a domain's queue, beyond which they are spilled to disk
+MAX_BUFFERED_PER_DOMAIN = 100
+
+
+class DomainScheduler:
+    """Class to hand out target URLs in round-robin across their domains, within each domain's budget.
+
+    The scheduler is meant to be shared by coroutines of the same event loop, each taking a URL with `get()` and reporting its request with `done()`.
+
+    Examples:
+        >>> scheduler = DomainScheduler(
+        ...     urls=["https://a.com/1", "https://a.com/2", "https://b.com/1"],
+        ...     max_per_domain=1,
+        ...     delay=0,
+        ... )
+        >>> asyncio.run(scheduler.get()), asyncio.run(scheduler.get())
+        ('https://a.com/1', 'https://b.com/1')
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        max_per_domain: int = MAX_PER_DOMAIN,
+        delay: float = DOMAIN_DELAY,
+        lookahead: int = LOOKAHEAD,
+        max_buffered_per_domain: int = MAX_BUFFERED_PER_DOMAIN,
+    ) -> None:
+        """Set up the domains' queues and budgets.
+
+        Args:
+            urls (Iterable[str]): Target URLs.
+            max_per_domain (int, optional): Maximum number of requests in flight to the same domain. Defaults to MAX_PER_DOMAIN.
+            delay (float, optional): Minimum delay, in seconds, between the start of two requests to the same domain. Defaults to DOMAIN_DELAY.
+            lookahead (int, optional): Maximum number of target URLs read ahead into memory. Defaults to LOOKAHEAD.
+            max_buffered_per_domain (int, optional): Maximum number of target URLs waiting in memory for the same domain. Defaults to MAX_BUFFERED_PER_DOMAIN.
+        """
+        self.urls = iter(urls)
+        self.max_per_domain = max_per_domain
+        self.delay = delay
+        self.lookahead = lookahead
+        self.max_buffered_per_domain = max(max_buffered_per_domain, 1)
+        self.exhausted = False
+        self.buffered = 0
+        # Queues of the domains with waiting URLs, in order of rotation
+        self.queues: Dict[str, Deque[str]] = {}
+        self.rotation: Deque[str] = deque()
+        # Number of each domain's URLs spilled to disk, all behind its queue
+        self.spilled: Counter = Counter()
+        self._spill: sqlite3.Connection | None = None
+        # Budgets of the domains with waiting URLs or requests in flight
+        self.in_flight: Counter = Counter()
+        self.next_start: Dict[str, float] = {}
+        self.changed = asyncio.Event()
+
+    @staticmethod
+    def domain(url: str) -> str:
+        """Name the domain whose budget a URL's request counts against.
+
+        Args:
+            url (str): Target URL.
+
+        Returns:
+            str: Domain name or, if it cannot be parsed, hostname.
+        """
+        hostname = get_hostname(url) or ""
+        return get_host_domain(hostname) or hostname
+
+    @property
+    def spill(self) -> sqlite3.Connection:
+        """Temporary SQLite database of the URLs spilled from full queues, created on first use."""
+        if self._spill is None:
+            # An empty path opens a private database on disk, deleted when it is closed
+            self._spill = sqlite3.connect("", isolation_level=None)
+            self._spill.execute("PRAGMA journal_mode = OFF")
+            self._spill.execute("PRAGMA synchronous = OFF")
+            self._spill.execute(
+                "CREATE TABLE spill(seq INTEGER PRIMARY KEY, domain TEXT, url TEXT)"
+            )
+            self._spill.execute("CREATE INDEX spill_domain_idx ON spill(domain, seq)")
+        return self._spill
+
+    def _fill(self) -> None:
+        """Read target URLs ahead into their domains' queues, up to the lookahead, spilling the URLs of full queues to disk.
+
+        So that a call does not hold up the event loop, it reads at most as many URLs as the lookahead.
+        """
+        spilled: List[Tuple[str, str]] = []
+        read = 0
+        while (
+            not self.exhausted
+            and self.buffered < self.lookahead
+            and read < self.lookahead
+        ):
+            try:
+                url = next(self.urls)
+            except StopIteration:
+                self.exhausted = True
+                break
+            read += 1
+            domain = self.domain(url)
+            if domain not in self.queues:
+                self.queues[domain] = deque()
+                self.rotation.append(domain)
+            queue = self.queues[domain]
+            if self.spilled[domain] or len(queue) >= self.max_buffered_per_domain:
+                spilled.append((domain, url))
+                self.spilled[domain] += 1
+                continue
+            queue.append(url)
+            self.buffered += 1
+        if spilled:
+            self.spill.executemany(
+                "INSERT INTO spill(domain, url) VALUES (?, ?)", spilled
+            )
+
+    def _unspill(self, domain: str) -> None:
+        """Read a domain's spilled URLs back into its queue, in order, up to the domain's maximum.
+
+        Args:
+            domain (str): Domain name.
+        """
+        rows = self.spill.execute(
+            "SELECT seq, url FROM spill WHERE domain = ? ORDER BY seq LIMIT ?",
+            (domain, self.max_buffered_per_domain),
+        ).fetchall()
+        self.spill.execute(
+            "DELETE FROM spill WHERE domain = ? AND seq <= ?", (domain, rows[-1][0])
+        )
+        self.queues[domain].extend(url for _, url in rows)
+        self.buffered += len(rows)
+        self.spilled[domain] -= len(rows)
+        if not self.spilled[domain]:
+            del self.spilled[domain]
+
+    def _pop(self, now: float) -> str | None:
+        """Take the next URL in the rotation whose domain is within its budget.
+
+        Args:
+            now (float): Current time of the monotonic clock.
+
+        Returns:
+            str | None: Target URL, or None if every domain with waiting URLs is out of budget.
+        """
+        for _ in range(len(self.rotation)):
+            domain = self.rotation[0]
+            self.rotation.rotate(-1)
+            if self.in_flight[domain] >= self.max_per_domain:
+                continue
+            if self.next_start.get(domain, 0) > now:
+                continue
+            queue = self.queues[domain]
+            url = queue.popleft()
+            self.buffered -= 1
+            if not queue:
+                if self.spilled[domain]:
+                    self._unspill(domain)
+                else:
+                    del self.queues[domain]
+                    self.rotation.remove(domain)
+            self.in_flight[domain] += 1
+            self.next_start[domain] = now + self.delay
+            return url
+        return None
+
+    def _wait_time(self, now: float) -> float | None:
+        """Time until the delay of a domain within its concurrency budget passes.
+
+        Args:
+            now (float): Current time of the monotonic clock.
+
+        Returns:
+            float | None: Seconds to wait, or None if every domain with waiting URLs is at its maximum number of requests in flight.
+        """
+        waits = [
+            self.next_start.get(domain, 0) - now
+            for domain in self.rotation
+            if self.in_flight[domain] < self.max_per_domain
+        ]
+        return max(min(waits), 0) if waits else None
+
+    async def get(self) -> str | None:
+        """Wait for, and take, the next target URL whose domain is within its budget.
+
+        Returns:
+            str | None: Target URL, or None if every target URL was handed out.
+        """
+        while True:
+            self._fill()
+            now = time.monotonic()
+            url = self._pop(now)
+            if url is not None:
+                return url
+            if not self.rotation and self.exhausted:
+                return None
+            if not self.exhausted and self.buffered < self.lookahead:
+                # Read further, past the domains that are out of budget, letting the other coroutines run in between
+                await asyncio.sleep(0)
+                continue
+            # Wait for a request to finish or for a domain's delay to pass
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait(), timeout=self._wait_time(now)
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def done(self, url: str) -> None:
+        """Report that the request of a target URL taken with `get()` is finished.
+
+        Args:
+            url (str): Target URL.
+        """
+        domain = self.domain(url)
+        self.in_flight[domain] -= 1
+        if not self.in_flight[domain]:
+            del self.in_flight[domain]
+            # Forget the domain's delay once it has passed and no URL is waiting
+            if (
+                domain not in self.queues
+                and self.next_start[domain] <= time.monotonic()
+            ):
+                del self.next_start[domain]
+        self.changed.set()
+
+    def close(self) -> None:
+        """Delete the temporary database of spilled URLs, if any."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
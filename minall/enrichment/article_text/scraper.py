@@ -1,6 +1,6 @@
 # minall/enrichment/article_text/scraper.py
 
-"""Class and helper function for scraping HTML.
+"""Class and helper functions for scraping HTML.
 
 This module's `Scraper` class enhances minet's `request()` and `extract()` methods by providing additional support for unexpected HTML encodings.
 
@@ -11,6 +11,8 @@ This module's `Scraper` class enhances minet's `request()` and `extract()` metho
 5. Gives the encoding to bs4's `BeautifulSoup` to parse the HTML.
 6. Gives the `BeautifulSoup` result to minet's `extract()` method in order to return minet's `TrafilaturaResult` object.
 
+Steps 1 to 3, which wait on the network, are the `Scraper.fetch()` method, which can store the valid responses in a persistent HTTP cache. Steps 4 to 6, which are CPU-bound, are the `parse_html()` function, which can run in a separate process.
+
 """
 
 import logging
@@ -20,8 +22,10 @@ from bs4 import BeautifulSoup, UnicodeDammit  # type: ignore
 from minet.extraction import TrafilaturaResult, extract
 from minet.web import Response, request
 from rich.progress import Progress
+from urllib3 import PoolManager
 
 from minall.enrichment import logger
+from minall.utils.http_cache import HTTPCache
 
 
 class Scraper:
@@ -37,15 +41,26 @@ class Scraper:
     """
 
     def __init__(
-        self, progress: Progress | None = None, total: int | None = None
+        self,
+        progress: Progress | None = None,
+        total: int | None = None,
+        pool_manager: PoolManager | None = None,
+        timeout: float | None = None,
+        cache: HTTPCache | None = None,
     ) -> None:
         """If provided the context of a rich progress bar, save it to the class instance and add the task 'Scraping webpage'.
 
         Args:
             progress (Progress | None, optional): Context of a rich progress bar instance. Defaults to None.
             total (int | None, optional): Total number of items treated during progress context. Defaults to None.
+            pool_manager (PoolManager | None, optional): Pool of HTTP connections shared by the requests. If None, minet's default pool. Defaults to None.
+            timeout (float | None, optional): Timeout, in seconds, of each request. If None, minet's default timeout. Defaults to None.
+            cache (HTTPCache | None, optional): Persistent cache of the responses. If None, every URL is requested. Defaults to None.
         """
         self.progress = progress
+        self.pool_manager = pool_manager
+        self.timeout = timeout
+        self.cache = cache
         if progress:
             self.progress = progress
             t = progress.add_task(
@@ -53,38 +68,97 @@ class Scraper:
             )
             self.task_id = t
 
-    def __call__(self, url: str) -> Tuple[str, TrafilaturaResult | None]:
-        """Requests and scrapes HTML, returning minet's Trafilatura Result object.
+    def advance(self) -> None:
+        """If provided the context of a rich progress bar, advance the task 'Scraping webpage'."""
+        if self.progress:
+            self.progress.advance(self.task_id)
+
+    def fetch(self, url: str) -> str | None:
+        """Requests a URL and, if the response is valid for scraping, returns its HTML.
+
+        If the scraper has a cache, a fresh cached response is returned without any request, and a stale one is revalidated with a conditional request. If the cache is offline, no request is made.
 
         Args:
             url (str): Target URL.
 
         Returns:
-            Tuple[str, TrafilaturaResult | None]: The target URL and, if scraping was successful, minet's Trafilatura Result object.
+            str | None: If the request was successful, the response's HTML.
         """
-        if self.progress:
-            self.progress.advance(self.task_id)
-        result = None
-        response = None
+        cache = self.cache
+        cached = cache.get(url) if cache else None
+        if cache and cached and cache.is_fresh(cached):
+            return cached.text()
+        if cache and cache.offline:
+            return None
 
-        # Request URL's HTML
         try:
-            response = request(url)
+            response = request(
+                url,
+                pool_manager=self.pool_manager,
+                timeout=self.timeout,
+                headers=cached.validators() if cached else None,
+            )
         except Exception as e:
             logging.error(e)
+            return None
+
+        # The server confirmed the cached response is still valid
+        if cache and cached and response.status == 304:
+            cache.revalidate(url)
+            return cached.text()
+
+        if good_response(response):
+            if cache:
+                cache.put(url, response)
+            return response.text()
+        return None
+
+    def parse(self, text: str | None) -> TrafilaturaResult | None:
+        """Scrapes a response's HTML, returning minet's Trafilatura Result object.
+
+        Args:
+            text (str | None): HTML returned from the `fetch()` method.
+
+        Returns:
+            TrafilaturaResult | None: If scraping was successful, minet's Trafilatura Result object.
+        """
+        if text:
+            return parse_html(text)
+        return None
+
+    def __call__(self, url: str) -> Tuple[str, TrafilaturaResult | None]:
+        """Requests and scrapes HTML, returning minet's Trafilatura Result object.
+
+        Args:
+            url (str): Target URL.
+
+        Returns:
+            Tuple[str, TrafilaturaResult | None]: The target URL and, if scraping was successful, minet's Trafilatura Result object.
+        """
+        self.advance()
+        return url, self.parse(self.fetch(url))
+
+
+def parse_html(text: str) -> TrafilaturaResult | None:
+    """Parses HTML and extracts its main content, returning minet's Trafilatura Result object.
+
+    Because the parsing and extraction are CPU-bound, this function is defined at the module's top level so that it can run in a separate process.
 
-        # Parse requested HTML
-        if response and good_response(response):
-            text = response.text()
-            try:
-                # Avoid input conversion error, deriving from inside Trafilatura's lxml dependency
-                encoding = UnicodeDammit(text, "html.parser").declared_html_encoding
-                soup = BeautifulSoup(text, features="lxml", from_encoding=encoding)
-                text = soup.decode(formatter="html")
-                result = extract(text)
-            except Exception as e:
-                logger.exception(e)
-        return url, result
+    Args:
+        text (str): HTML of a web page.
+
+    Returns:
+        TrafilaturaResult | None: If scraping was successful, minet's Trafilatura Result object.
+    """
+    try:
+        # Avoid input conversion error, deriving from inside Trafilatura's lxml dependency
+        encoding = UnicodeDammit(text, "html.parser").declared_html_encoding
+        soup = BeautifulSoup(text, features="lxml", from_encoding=encoding)
+        text = soup.decode(formatter="html")
+        return extract(text)
+    except Exception as e:
+        logger.exception(e)
+    return None
 
 
 def good_response(response: Response) -> Response | None:
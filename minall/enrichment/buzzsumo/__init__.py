@@ -5,9 +5,10 @@
 Modules exported by this package:
 
 - `normalizer`: Dataclass to normlalize minet's Buzzsumo result object.
-- `contexts`: Context manager for client's CSV writers, multi-threader, and progress bar.
+- `contexts`: Context manager for client's result sinks, multi-threader, and progress bar.
 - `get_data`: Function that runs all of the Buzzsumo enrichment process.
-- `client`: Wrapper for minet's Buzzsumo API client that normalizes minet's result.
+- `client`: Wrapper for minet's Buzzsumo API clients that balances calls across tokens and normalizes minet's result.
+- `exceptions`: Exceptions raised during data collection from Buzzsumo API.
 """
 
 from minall.enrichment.buzzsumo.get_data import get_buzzsumo_data
@@ -1,19 +1,69 @@
 # minall/enrichment/buzzsumo/client.py
 
 """Module containing a wrapper for minet's Buzzsumo API client.
+
+The wrapper can balance its calls across several Buzzsumo tokens. Each token's calls are spaced out by the process-wide token bucket of the token, and each call goes to the token that is free the soonest among those with quota left. The Buzzsumo API reports, with each response, the calls left to the token for the month; the wrapper records them, and the calls it makes, in a `QuotaLedger`, so that a later run knows which tokens are spent. When a response does not report them, the calls left are estimated from the last report and the calls made since. A token is set aside before its monthly quota is used up, and when every token is set aside, the wrapper raises `QuotaExhausted`.
+
+So that every call made is counted, the wrapper calls minet's client without minet's retries and retries the failed calls itself. A URL whose calls all fail, or which the API rejects, is logged and skipped.
 """
 
-from minet.buzzsumo.client import BuzzSumoAPIClient
+import logging
+import threading
+import time
+from typing import Dict, List, Set
+
+from minet.buzzsumo.client import BuzzSumoAPIClient, construct_url
+from minet.buzzsumo.exceptions import (
+    BuzzSumoBadRequestError,
+    BuzzSumoInvalidTokenError,
+    BuzzSumoOutageError,
+    BuzzSumoRateLimitedError,
+)
+from minet.buzzsumo.types import BuzzsumoArticle
 
+from minall.enrichment.buzzsumo.exceptions import QuotaExhausted
 from minall.enrichment.buzzsumo.normalizer import (
     BEGINDATE,
     ENDDATE,
     NormalizedBuzzsumoResult,
 )
+from minall.utils.api_cache import APICache
+from minall.utils.exceptions import CacheMiss
+from minall.utils.quota import QuotaLedger, current_month
+from minall.utils.rate_limit import shared_bucket
+
+# Name of the service in the quota ledger
+SERVICE = "buzzsumo"
+# Calls per minute allowed to a token, as minet's client allows 10 calls per 12 seconds
+RATE_LIMIT = 50
+# Calls of each token's monthly quota left unspent
+QUOTA_RESERVE = 100
+# Number of attempts at a URL's call
+MAX_ATTEMPTS = 5
+# Delay, in seconds, before retrying a call after the API's error, doubled at each attempt
+RETRY_DELAY = 1
+# Response header of the calls left to the token for the month
+REMAINING_HEADER = "X-RateLimit-Month-Remaining"
+
+
+def send_request(client: BuzzSumoAPIClient, api_url: str):
+    """Make a single call with minet's Buzzsumo API client, within the client's rate limit but without its retries.
+
+    Args:
+        client (BuzzSumoAPIClient): Minet's client.
+        api_url (str): URL of the API's endpoint, with its parameters.
+
+    Returns:
+        Tuple: Response and its decoded JSON data.
+    """
+    # Minet's request method is rate-limited, then wrapped in a retrying decorator that hides its calls
+    return BuzzSumoAPIClient.request.__wrapped__(client, api_url)
 
 
 class BuzzsumoClient:
-    """Wrapper for minet's Buzzsumo API client.
+    """Wrapper for minet's Buzzsumo API clients, one per token.
+
+    The wrapper can be shared by several threads.
 
     Examples:
         >>> import os
@@ -23,33 +73,170 @@ class BuzzsumoClient:
         NormalizedBuzzsumoResult(url='https://archive.fosdem.org/2020/schedule/event/open_research_web_mining/', work_type='Article', domain='fosdem.org', twitter_share=0, facebook_share=0, title='FOSDEM 2020 - Empowering social scientists with web mining tools', date_published=datetime.datetime(2024, 1, 4, 15, 48, 1), pinterest_share=0, creator_name=None, creator_identifier=None, duration=None, facebook_comment=0, youtube_watch=None, youtube_like=None, youtube_comment=None, tiktok_share=None, tiktok_comment=None, reddit_engagement=0)
     """
 
-    def __init__(self, token: str) -> None:
-        """Creates an instance of mient's BuzzsumoAPIClient and sets values for the Buzzsumo API's requried begin-date and end-date parameters.
+    def __init__(
+        self,
+        token: str | List[str],
+        cache: APICache | None = None,
+        ledger: QuotaLedger | None = None,
+    ) -> None:
+        """Creates an instance of mient's BuzzsumoAPIClient per token and sets values for the Buzzsumo API's requried begin-date and end-date parameters.
 
         Examples:
             >>> wrapper = BuzzsumoClient(token="<TOKEN>")
             >>> type(wrapper)
             <class 'minall.enrichment.buzzsumo.client.BuzzsumoClient'>
-            >>> type(wrapper.client)
+            >>> type(wrapper.clients[0])
             <class 'minet.buzzsumo.client.BuzzSumoAPIClient'>
 
         Args:
-            token (str): Buzzsumo API token.
+            token (str | List[str]): Buzzsumo API token, or list of tokens.
+            cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
+            ledger (QuotaLedger | None, optional): Persistent ledger of the calls made and left per token. If None, the calls are only counted during the run. Defaults to None.
         """
-        self.client = BuzzSumoAPIClient(token=token)
+        tokens = [token] if isinstance(token, str) else list(dict.fromkeys(token))
+        self.clients = [BuzzSumoAPIClient(token=t) for t in tokens]
+        self.buckets = [shared_bucket(t, rate=RATE_LIMIT) for t in tokens]
+        self.ledger = ledger if ledger else QuotaLedger(database=None)
+        self.lock = threading.Lock()
+        self.month = current_month()
+        # Tokens the API rejected as invalid
+        self.invalid: Set[int] = set()
+        # Calls left to each token for the month, None until the API reports them
+        self.remaining: List[int | None] = [
+            self.ledger.remaining(SERVICE, t, period=self.month) for t in tokens
+        ]
+        self.cache = cache
         self.begin = BEGINDATE
         self.end = ENDDATE
 
-    def __call__(self, url: str) -> NormalizedBuzzsumoResult:
+    def pick(self) -> int:
+        """Choose the token that is free the soonest among those with quota left.
+
+        Raises:
+            QuotaExhausted: Every valid token spent its monthly quota.
+
+        Returns:
+            int: Index of the token's client.
+        """
+        with self.lock:
+            month = current_month()
+            if month != self.month:
+                self.month = month
+                self.remaining = [None] * len(self.clients)
+            available = [
+                i
+                for i, remaining in enumerate(self.remaining)
+                if i not in self.invalid
+                and (remaining is None or remaining > QUOTA_RESERVE)
+            ]
+            if not available:
+                raise QuotaExhausted(month=self.month)
+            i = min(available, key=lambda i: self.buckets[i].delay)
+            if self.remaining[i] is not None:
+                self.remaining[i] -= 1  # type: ignore
+            return i
+
+    def __call__(self, url: str) -> NormalizedBuzzsumoResult | None:
         """Executes mient's Buzzsumo API client on a URL and returns normalized data.
 
+        If the API's calls fail, the error is logged and the URL is returned without data.
+
         Args:
             url (str): Target URL.
 
+        Raises:
+            QuotaExhausted: Every valid token spent its monthly quota.
+
         Returns:
-            NormalizedBuzzsumoResult: Dataclass that normalizes minet's Buzzsumo result.
+            NormalizedBuzzsumoResult | None: Dataclass that normalizes minet's Buzzsumo result, None if the cache is offline and misses the URL.
         """
-        result = self.client.exact_url(
-            search_url=url, begin_timestamp=self.begin, end_timestamp=self.end
-        )
+        result = None
+        try:
+            if self.cache:
+                payload = self.cache.fetch(
+                    "buzzsumo", url, call=lambda: self.exact_url_payload(url)
+                )
+            else:
+                payload = self.exact_url_payload(url)
+            if payload:
+                result = BuzzsumoArticle.from_payload(payload)
+        except QuotaExhausted:
+            raise
+        except CacheMiss:
+            return None
+        except Exception as e:
+            logging.exception(e)
         return NormalizedBuzzsumoResult.from_payload(url, result)
+
+    def exact_url_payload(self, url: str) -> Dict | None:
+        """Search a URL in the Buzzsumo database and return the API's raw payload, as minet's `exact_url()` method does before parsing it.
+
+        Args:
+            url (str): Target URL.
+
+        Raises:
+            QuotaExhausted: Every valid token spent its monthly quota.
+            BuzzSumoInvalidQueryError: The API rejected the URL.
+            BuzzSumoError: Every attempt failed, with the last attempt's error.
+
+        Returns:
+            Dict | None: If the URL was found, the raw payload of the Buzzsumo article.
+        """
+        error: Exception | None = None
+        for attempt in range(MAX_ATTEMPTS):
+            i = self.pick()
+            client, bucket = self.clients[i], self.buckets[i]
+            api_url = (
+                construct_url(
+                    "/search/articles.json",
+                    token=client.token,
+                    q=url,
+                    begin_timestamp=self.begin,
+                    end_timestamp=self.end,
+                )
+                + "&exact_url=True"
+            )
+            bucket.acquire()
+            try:
+                response, data = send_request(client, api_url)
+            except BuzzSumoRateLimitedError as e:
+                # Slow the token down and try the token free the soonest
+                bucket.penalize()
+                error = e
+                continue
+            except BuzzSumoInvalidTokenError as e:
+                with self.lock:
+                    self.invalid.add(i)
+                logging.error(
+                    "The Buzzsumo API rejected token #%d as invalid; it is set aside.",
+                    i + 1,
+                )
+                error = e
+                continue
+            except (BuzzSumoOutageError, BuzzSumoBadRequestError) as e:
+                time.sleep(RETRY_DELAY * 2**attempt)
+                error = e
+                continue
+            finally:
+                self.ledger.spend(SERVICE, client.token, period=self.month, units=1)
+            bucket.reward()
+            self.report_remaining(i, response.headers.get(REMAINING_HEADER))
+            if isinstance(data.get("results"), list) and len(data["results"]) == 1:
+                return data["results"][0]
+            return None
+        raise error  # type: ignore
+
+    def report_remaining(self, i: int, remaining: str | None) -> None:
+        """Record the calls the API reports are left to a token for the month.
+
+        Args:
+            i (int): Index of the token's client.
+            remaining (str | None): Value of the response's header, if any.
+        """
+        if remaining is None or not remaining.strip().isdigit():
+            return
+        with self.lock:
+            self.remaining[i] = int(remaining)
+        self.ledger.report_remaining(
+            SERVICE, self.clients[i].token, period=self.month, remaining=int(remaining)
+        )
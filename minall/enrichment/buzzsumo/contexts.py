@@ -1,58 +1,54 @@
 # minall/enrichment/buzzsumo/contexts.py
 
-"""Module containing contexts for Buzzsumo data collection's CSV writer, progress bar, and multi-threader.
+"""Module containing contexts for Buzzsumo data collection's result sink, progress bar, and multi-threader.
 """
 
-import csv
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple
 
-from rich.progress import (
-    MofNCompleteColumn,
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
+from rich.progress import Progress
 
 from minall.tables.links import LinksConstants
+from minall.tables.sink import ResultSink, open_sink
+from minall.utils.progress_bar import start_progress_bar, stop_progress_bar
 
 
 class WriterContext:
-    def __init__(self, links_file: Path):
-        """Set up class for iteratively writing normalized Buzzsumo results to CSV.
+    def __init__(self, links_file: Path | ResultSink):
+        """Set up class for iteratively pushing normalized Buzzsumo results to a sink.
 
         Args:
-            links_file (Path): Path to the links table CSV file.
+            links_file (Path | ResultSink): Sink for the links table, or path to the links table CSV file.
         """
         self.links_file = links_file
 
-    def __enter__(self) -> csv.DictWriter:
-        """Start the CSV writer's context.
+    def __enter__(self) -> ResultSink:
+        """Start the result sink's context.
 
         Returns:
-            csv.DictWriter: Context variable for writing CSV rows.
+            ResultSink: Context variable for pushing results.
         """
-        # Set up links file writer
-        self.links_file_obj = open(self.links_file, mode="w")
-        self.links_file_writer = csv.DictWriter(
-            self.links_file_obj, fieldnames=LinksConstants.col_names
+        # Set up links result sink
+        self.links_file_writer = open_sink(
+            self.links_file, fieldnames=LinksConstants.col_names
         )
-        self.links_file_writer.writeheader()
 
         return self.links_file_writer
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stops the writer's context variable."""
-        if self.links_file_obj:
-            self.links_file_obj.close()
+        self.links_file_writer.close()
 
 
 class GeneratorContext:
-    def __init__(self) -> None:
-        """Set up class for Buzzsumo client wrapper's contexts."""
-        pass
+    def __init__(self, max_workers: int | None = None) -> None:
+        """Set up class for Buzzsumo client wrapper's contexts.
+
+        Args:
+            max_workers (int | None, optional): Number of threads calling the Buzzsumo API. If None, the executor's default. Defaults to None.
+        """
+        self.max_workers = max_workers
 
     def __enter__(self) -> Tuple[Progress, ThreadPoolExecutor]:
         """Start the wrapper's context variables.
@@ -60,19 +56,13 @@ class GeneratorContext:
         Returns:
             Tuple[Progress, ThreadPoolExecutor]: Context variables.
         """
-        self.progress_bar = Progress(
-            TextColumn("[progress.description]{task.description}"),
-            SpinnerColumn(),
-            MofNCompleteColumn(),
-            TimeElapsedColumn(),
-        )
-        self.progress_bar.start()
+        self.progress_bar = start_progress_bar()
 
-        self.executor = ThreadPoolExecutor()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
 
         return self.progress_bar, self.executor
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stop the Buzzsumo client wrapper's context variables."""
-        self.progress_bar.stop()
+        stop_progress_bar()
         self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,16 @@
+# minall/enrichment/buzzsumo/exceptions.py
+
+"""Exceptions raised during data collection from Buzzsumo API.
+
+This module contains exceptions raised during data collection from Buzzsumo API. The module contains the following exception:
+
+- `QuotaExhausted` - Every Buzzsumo API token spent its monthly quota.
+"""
+
+
+class QuotaExhausted(Exception):
+    def __init__(self, month: str) -> None:
+        message = "Every Buzzsumo API token spent its quota for the month {month}. The remaining links can be enriched by resuming the run with another token or once the quota is renewed.".format(
+            month=month
+        )
+        super().__init__(message)
@@ -3,36 +3,78 @@
 """Module containing a function that runs all of the Buzzsumo enrichment process.
 """
 
+import logging
 from pathlib import Path
 from typing import Generator, List
 
 from minall.enrichment.buzzsumo.client import BuzzsumoClient
 from minall.enrichment.buzzsumo.contexts import GeneratorContext, WriterContext
+from minall.enrichment.buzzsumo.exceptions import QuotaExhausted
 from minall.enrichment.buzzsumo.normalizer import NormalizedBuzzsumoResult
+from minall.tables.sink import ResultSink
+from minall.utils.api_cache import APICache
+from minall.utils.concurrency import IN_FLIGHT_PER_WORKER, bounded_map
+from minall.utils.quota import QuotaLedger
 
+# Number of threads calling Buzzsumo per token
+WORKERS_PER_TOKEN = 4
 
-def get_buzzsumo_data(data: List[str], token: str, outfile: Path):
-    """Main function for writing Buzzsumo API results to a CSV file.
+
+def get_buzzsumo_data(
+    data: List[str],
+    token: str | List[str],
+    outfile: Path | ResultSink,
+    cache: APICache | None = None,
+    ledger: QuotaLedger | None = None,
+):
+    """Main function for pushing Buzzsumo API results to a result sink, reporting for each URL whether Buzzsumo found it.
+
+    The calls are spread across the API tokens, within each token's monthly quota. If every token spends its quota, the URLs enriched so far are kept and the others are left for a resumed run.
 
     Args:
         data (List[str]): List of URLs.
-        token (str): Token for Buzzsumo API.
-        outfile (Path): Path to CSV file in which to write results.
+        token (str | List[str]): Token, or list of tokens, for Buzzsumo API.
+        outfile (Path | ResultSink): Sink for results, or path to CSV file in which to write them.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
+        ledger (QuotaLedger | None, optional): Persistent ledger of the calls made and left per token. Defaults to None.
     """
     with WriterContext(links_file=outfile) as writer:
-        # Save results to memory, trigger Global Interpreter Lock (GIL)
-        for result in yield_buzzsumo_data(token, data):
-            writer.writerow(result.as_csv_dict_row())
+        try:
+            # Save results to memory, trigger Global Interpreter Lock (GIL)
+            for result in yield_buzzsumo_data(token, data, cache=cache, ledger=ledger):
+                # The offline cache missed the URL, which Buzzsumo was not asked about
+                if result is None:
+                    continue
+                writer.writerow(result)
+                # Buzzsumo results only have a domain if the URL was found
+                writer.mark(result.url, succeeded=result.domain is not None)
+        except QuotaExhausted as e:
+            logging.warning(e)
 
 
 def yield_buzzsumo_data(
-    token: str, data: List[str]
-) -> Generator[NormalizedBuzzsumoResult, None, None]:
-    client = BuzzsumoClient(token=token)
+    token: str | List[str],
+    data: List[str],
+    cache: APICache | None = None,
+    ledger: QuotaLedger | None = None,
+) -> Generator[NormalizedBuzzsumoResult | None, None, None]:
+    client = BuzzsumoClient(token=token, cache=cache, ledger=ledger)
+    max_workers = WORKERS_PER_TOKEN * len(client.clients)
 
-    with GeneratorContext() as context:
+    with GeneratorContext(max_workers=max_workers) as context:
         progress, executor = context
         t = progress.add_task("[green]Calling Buzzsumo API", total=len(data))
-        for result in executor.map(client, data):
-            progress.advance(t)
-            yield result
+        try:
+            # Results carry their URL, so they are yielded as soon as they complete
+            for result in bounded_map(
+                executor,
+                client,
+                data,
+                max_in_flight=IN_FLIGHT_PER_WORKER * max_workers,
+                ordered=False,
+            ):
+                progress.advance(t)
+                yield result
+        except QuotaExhausted as e:
+            progress.console.print(f"[bold red]{e}")
+            raise
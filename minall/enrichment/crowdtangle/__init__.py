@@ -5,7 +5,7 @@
 Modules exported by this package:
 
 - `normalizer`: Dataclass to normlalize minet's CrowdTangle result object.
-- `contexts`: Context manager for client's CSV writers, multi-threader, and progress bar.
+- `contexts`: Context manager for client's result sinks, multi-threader, and progress bar.
 - `get_data`: Function that runs all of the CrowdTangle enrichment process.
 - `client`: Wrapper for minet's CrowdTangle API client that normalizes minet's result.
 - `exceptions`: 
@@ -1,16 +1,26 @@
 # minall/enrichment/crowdtangle/client.py
 
 """Module contains a client and helper functions for collecting data from CrowdTangle.
+
+The client can spread its requests across several CrowdTangle tokens. Each token's requests are spaced out by the process-wide token bucket of the token, so that the sustained throughput matches the tokens' combined rate limits. A request refused for exceeding a token's rate limit slows the token's bucket down and is retried with the token that is free the soonest.
 """
 
 import logging
-from typing import Tuple
+from typing import Any, List, Tuple
 
 from minet.crowdtangle.client import CrowdTangleAPIClient
+from minet.crowdtangle.exceptions import CrowdTangleRateLimitExceeded
 from minet.crowdtangle.types import CrowdTanglePost
 from minet.facebook import post_id_from_url
 from ural.facebook import parse_facebook_url
 
+from minall.utils.api_cache import APICache
+from minall.utils.exceptions import CacheMiss
+from minall.utils.rate_limit import shared_bucket
+
+# Number of attempts at a request refused for exceeding the tokens' rate limits
+MAX_ATTEMPTS = 5
+
 
 def parse_rate_limit(rate_limit: int | str | None) -> int:
     """Set default or convert rate limit string to integer.
@@ -66,31 +76,77 @@ def adhoc_post_id_parser(url: str) -> str | None:
 
 
 class CTClient:
-    """Wrapper for minet's CrowdTangle API client with helper function for parsing Facebook post ID."""
+    """Wrapper for minet's CrowdTangle API clients, one per token, with helper function for parsing Facebook post ID.
 
-    def __init__(self, token: str, rate_limit: int) -> None:
-        """Create instance of minet's CrowdTangle API client.
+    The client can be shared by several threads.
+    """
+
+    def __init__(
+        self, token: str | List[str], rate_limit: int, cache: APICache | None = None
+    ) -> None:
+        """Create an instance of minet's CrowdTangle API client for each token.
 
         Args:
-            token (str): CrowdTangle API token.
-            rate_limit (int): CrowdTangle API rate limit.
+            token (str | List[str]): CrowdTangle API token, or list of tokens.
+            rate_limit (int): CrowdTangle API rate limit, per token and minute.
+            cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
         """
-        self.client = CrowdTangleAPIClient(token=token, rate_limit=rate_limit)
+        tokens = [token] if isinstance(token, str) else list(dict.fromkeys(token))
+        self.clients = [
+            CrowdTangleAPIClient(token=t, rate_limit=rate_limit) for t in tokens
+        ]
+        self.buckets = [shared_bucket(t, rate=rate_limit) for t in tokens]
+        self.cache = cache
+
+    def request_post(self, post_id: str) -> Any:
+        """Request a post's raw payload with the token that is free the soonest.
 
-    def __call__(self, url: str) -> Tuple[str, CrowdTanglePost | None]:
+        Args:
+            post_id (str): ID of the Facebook post.
+
+        Raises:
+            CrowdTangleRateLimitExceeded: The API refused every attempt for exceeding the tokens' rate limits.
+
+        Returns:
+            Any: Raw payload of the API's response.
+        """
+        for _ in range(MAX_ATTEMPTS):
+            i = min(range(len(self.buckets)), key=lambda i: self.buckets[i].delay)
+            self.buckets[i].acquire()
+            try:
+                payload = self.clients[i].post(post_id=post_id, raw=True)
+            except CrowdTangleRateLimitExceeded:
+                self.buckets[i].penalize()
+                continue
+            self.buckets[i].reward()
+            return payload
+        raise CrowdTangleRateLimitExceeded
+
+    def __call__(self, url: str) -> Tuple[str, CrowdTanglePost | None] | None:
         """Execute collection of CrowdTangle data from parsed Facebook post ID.
 
         Args:
             url (str): Target Facebook URL.
 
         Returns:
-            Tuple[str, CrowdTanglePost | None]: Target URL and, if successful, minet's CrowdTanglePost result object.
+            Tuple[str, CrowdTanglePost | None] | None: Target URL and, if successful, minet's CrowdTanglePost result object. None if the cache is offline and misses the post.
         """
         post_id = adhoc_post_id_parser(url)
         post = None
         if post_id:
             try:
-                post = self.client.post(post_id=post_id)
+                if self.cache:
+                    payload = self.cache.fetch(
+                        "crowdtangle",
+                        post_id,
+                        call=lambda: self.request_post(post_id),
+                    )
+                else:
+                    payload = self.request_post(post_id)
+                if payload:
+                    post = CrowdTanglePost.from_payload(payload)
+            except CacheMiss:
+                return None
             except Exception as e:
                 logging.exception(e)
         return url, post
@@ -1,63 +1,52 @@
 # minall/enrichment/crowdtangle/contexts.py
 
-"""Context manager for CrowdTangle's CSV writers, multi-threader, and progress bar.
+"""Context manager for CrowdTangle's result sinks and progress bar.
 """
 
-import csv
 from pathlib import Path
 from typing import Tuple
 
-from rich.progress import (
-    MofNCompleteColumn,
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
+from rich.progress import Progress
 
 from minall.tables.links import LinksConstants
 from minall.tables.shared_content import ShareContentConstants
+from minall.tables.sink import ResultSink, open_sink
+from minall.utils.progress_bar import start_progress_bar, stop_progress_bar
 
 
 class ContextManager:
-    def __init__(self, links_file: Path, shared_content_file: Path):
+    def __init__(
+        self,
+        links_file: Path | ResultSink,
+        shared_content_file: Path | ResultSink,
+    ):
         """Set up class for scraper's contexts.
 
         Args:
-            links_file (Path): Path to CSV file for post metadata.
-            shared_content_file (Path): Path to CSV file for posts' shared content metadata.
+            links_file (Path | ResultSink): Sink, or path to CSV file, for post metadata.
+            shared_content_file (Path | ResultSink): Sink, or path to CSV file, for posts' shared content metadata.
         """
         self.links_file = links_file
         self.shared_content_file = shared_content_file
 
-    def __enter__(self) -> Tuple[csv.DictWriter, csv.DictWriter, Progress]:
+    def __enter__(self) -> Tuple[ResultSink, ResultSink, Progress]:
         """Start the module's context variables.
 
         Returns:
-            Tuple[csv.DictWriter, csv.DictWriter, Progress]: CSV writer for post metadata, CSV writer for shared content metadata, rich progress bar.
+            Tuple[ResultSink, ResultSink, Progress]: Result sink for post metadata, result sink for shared content metadata, rich progress bar.
         """
-        # Set up links file writer
-        self.links_file_obj = open(self.links_file, mode="w")
-        self.links_file_writer = csv.DictWriter(
-            self.links_file_obj, fieldnames=LinksConstants.col_names
+        # Set up links result sink
+        self.links_file_writer = open_sink(
+            self.links_file, fieldnames=LinksConstants.col_names
         )
-        self.links_file_writer.writeheader()
 
-        # Set up shared_content file writer
-        self.shared_content_obj = open(self.shared_content_file, mode="w")
-        self.shared_content_writer = csv.DictWriter(
-            self.shared_content_obj, fieldnames=ShareContentConstants.col_names
+        # Set up shared_content result sink
+        self.shared_content_writer = open_sink(
+            self.shared_content_file, fieldnames=ShareContentConstants.col_names
         )
-        self.shared_content_writer.writeheader()
 
         # Set up progress bar
-        self.progress_bar = Progress(
-            TextColumn("[progress.description]{task.description}"),
-            SpinnerColumn(),
-            MofNCompleteColumn(),
-            TimeElapsedColumn(),
-        )
-        self.progress_bar.start()
+        self.progress_bar = start_progress_bar()
 
         return (
             self.links_file_writer,
@@ -67,8 +56,6 @@ class ContextManager:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stop the scraper's context variables."""
-        if self.shared_content_obj:
-            self.shared_content_obj.close()
-        if self.links_file_obj:
-            self.links_file_obj.close()
-        self.progress_bar.stop()
+        self.shared_content_writer.close()
+        self.links_file_writer.close()
+        stop_progress_bar()
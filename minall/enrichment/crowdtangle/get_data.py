@@ -13,23 +13,31 @@ from minall.enrichment.crowdtangle.normalizer import (
     parse_facebook_post,
     parse_shared_content,
 )
+from minall.tables.sink import ResultSink
+from minall.utils.api_cache import APICache
+from minall.utils.concurrency import IN_FLIGHT_PER_WORKER, bounded_map
+
+# Number of threads querying CrowdTangle per token
+WORKERS_PER_TOKEN = 4
 
 
 def get_facebook_post_data(
     data: List[str],
-    token: str,
+    token: str | List[str],
     rate_limit: int | str | None,
-    links_outfile: Path,
-    shared_content_outfile: Path,
+    links_outfile: Path | ResultSink,
+    shared_content_outfile: Path | ResultSink,
+    cache: APICache | None = None,
 ):
-    """Function to collect, normalize, and write data from CrowdTangle.
+    """Function to collect, normalize, and push data from CrowdTangle to result sinks.
 
     Args:
         data (List[str]): Set of target Facebook URLs.
-        token (str): CrowdTangle API token.
-        rate_limit (int | str | None): CrowdTangle API rate limit.
-        links_outfile (Path): Path to CSV file for Facebook post metadata.
-        shared_content_outfile (Path): Path to CSV for shared content metadata.
+        token (str | List[str]): CrowdTangle API token, or list of tokens.
+        rate_limit (int | str | None): CrowdTangle API rate limit, per token.
+        links_outfile (Path | ResultSink): Sink, or path to CSV file, for Facebook post metadata.
+        shared_content_outfile (Path | ResultSink): Sink, or path to CSV file, for shared content metadata.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
     """
 
     rate_limit = parse_rate_limit(rate_limit)
@@ -41,29 +49,45 @@ def get_facebook_post_data(
             description="[bold blue]Querying Facebook posts", total=len(data)
         )
         for url, response in yield_facebook_data(
-            data=data, token=token, rate_limit=rate_limit
+            data=data, token=token, rate_limit=rate_limit, cache=cache
         ):
             progress.advance(t)
             formatted_post = parse_facebook_post(url=url, result=response)
             links_writer.writerow(formatted_post)
             for formatted_media in parse_shared_content(url=url, result=response):
                 shared_content_writer.writerow(formatted_media)
+            links_writer.mark(url, succeeded=response is not None)
 
 
 def yield_facebook_data(
-    data: List[str], token: str, rate_limit: int
+    data: List[str],
+    token: str | List[str],
+    rate_limit: int,
+    cache: APICache | None = None,
 ) -> Generator[Tuple[str, Any], None, None]:
     """Streams target Facebook URLs to multi-threading context and yields minet's results.
 
+    The URLs whose posts the offline cache misses are not yielded, as CrowdTangle was not asked about them.
+
     Args:
         data (List[str]): Set of target Facebook URLs.
-        token (str): CrowdTangle API token.
-        rate_limit (int): CrowdTangle API rate limit.
+        token (str | List[str]): CrowdTangle API token, or list of tokens.
+        rate_limit (int): CrowdTangle API rate limit, per token.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
 
     Yields:
         Generator[Tuple[str, CrowdTanglePost | None], None, None]: Target Facebook URL and, if available, result of minet's CrowdTangle API client.
     """
-    client = CTClient(token=token, rate_limit=rate_limit)
-    with ThreadPoolExecutor() as executor:
-        for url, response in executor.map(client, data):
-            yield url, response
+    client = CTClient(token=token, rate_limit=rate_limit, cache=cache)
+    max_workers = WORKERS_PER_TOKEN * len(client.clients)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Results carry their URL, so they are yielded as soon as they complete
+        for item in bounded_map(
+            executor,
+            client,
+            data,
+            max_in_flight=IN_FLIGHT_PER_WORKER * max_workers,
+            ordered=False,
+        ):
+            if item is not None:
+                yield item
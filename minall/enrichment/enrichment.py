@@ -2,20 +2,29 @@
 
 """Class for data collection and coalescing.
 
-With the class `Enrichment`, this module manages the data collection process.
+With the class `Enrichment`, this module manages the data collection process. The sources of the enrichment run at the same time, each in its own thread and over its own subset of URLs, with the concurrency of its own client. Their results are staged apart and, once every source is done, coalesced into the SQL tables in the order of precedence declared in `minall.enrichment.precedence`. Each source stages its results in small batches, each committed together with the source's reports on its URLs, so that the enrichment's progress is checkpointed in the database as it goes.
 """
 
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List
+
 from minall.enrichment.article_text import get_article_text
 from minall.enrichment.buzzsumo import get_buzzsumo_data
 from minall.enrichment.crowdtangle import get_facebook_post_data
 from minall.enrichment.other_social_media import add_type_data
+from minall.enrichment.precedence import SourcePrecedence
 from minall.enrichment.twitter import get_twitter_data
-from minall.enrichment.utils import FilteredLinks, apply_domain
+from minall.enrichment.utils import DOMAIN_UPDATE_QUERY, FilteredLinks, yield_domains
 from minall.enrichment.youtube import get_youtube_data
+from minall.tables.base import BaseTable
+from minall.tables.enrichment_state import EnrichmentStateTable
 from minall.tables.links import LinksTable
 from minall.tables.shared_content import SharedContentTable
-from minall.utils.database import SQLiteWrapper
+from minall.tables.sink import TableSink
+from minall.utils.api_cache import APICache
+from minall.utils.http_cache import HTTPCache
 from minall.utils.parse_config import APIKeys
+from minall.utils.quota import QuotaLedger
 
 bar = "\n===============\n"
 
@@ -26,112 +35,202 @@ class Enrichment:
         links_table: LinksTable,
         shared_content_table: SharedContentTable,
         keys: APIKeys,
+        state: EnrichmentStateTable | None = None,
+        precedence: SourcePrecedence | None = None,
+        http_cache: HTTPCache | None = None,
+        api_cache: APICache | None = None,
+        offline: bool = False,
+        quota_ledger: QuotaLedger | None = None,
     ) -> None:
         """From given API keys and URL data set, filter URLs by domain and initialize data enrichment class.
 
+        If given a table of the enrichment's state, each source is only called on the URLs it is due to enrich, and the source's outcome for each URL is recorded in the table when the results are coalesced.
+
+        In offline mode, the sources only read the data stored in their caches and the sources without a cache are skipped, so that the enrichment makes no network access.
+
         Args:
             links_table (BaseTable): BaseTable class instance of SQL table for URL dataset.
             shared_content_table (BaseTable): BaseTable class instance of SQL table for shared content related to URLs in dataset.
             keys (APIKeys): APIKeys class instance of minet API client configurations.
+            state (EnrichmentStateTable | None, optional): SQL table of the enrichment's state, per URL and source. Defaults to None.
+            precedence (SourcePrecedence | None, optional): Precedence of the sources when their results are coalesced. If None, the default precedence. Defaults to None.
+            http_cache (HTTPCache | None, optional): Persistent cache of the scraped pages' responses. Defaults to None.
+            api_cache (APICache | None, optional): Persistent cache of the Buzzsumo, CrowdTangle, and YouTube APIs' payloads. Defaults to None.
+            offline (bool, optional): Whether to only read the caches, without any network access. Defaults to False.
+            quota_ledger (QuotaLedger | None, optional): Persistent ledger of the quota units spent per YouTube API key and per Buzzsumo token. Defaults to None.
         """
 
         self.links_table = links_table
         self.shared_content_table = shared_content_table
         self.keys = keys
-        self.filtered_links = FilteredLinks(self.links_table)
+        self.state = state
+        self.precedence = precedence if precedence else SourcePrecedence()
+        self.http_cache = http_cache
+        self.api_cache = api_cache
+        self.offline = offline
+        self.quota_ledger = quota_ledger
+        self.filtered_links = FilteredLinks(self.links_table, state=self.state)
+
+    def links_sink(
+        self, source: str, dependents: List[TableSink] | None = None
+    ) -> TableSink:
+        """Create a sink that stages the source's results for the 'links' table and its reports for the enrichment's state, if any.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+            dependents (List[TableSink] | None, optional): Sinks of the source's other results, flushed before its reports are staged. Defaults to None.
+
+        Returns:
+            TableSink: Sink for the 'links' table.
+        """
+        return TableSink(
+            self.links_table,
+            source=source,
+            state=self.state,
+            merge=False,
+            dependents=dependents,
+        )
+
+    def shared_content_sink(self, source: str) -> TableSink:
+        """Create a sink that stages the source's results for the 'shared_content' table.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "twitter".
+
+        Returns:
+            TableSink: Sink for the 'shared_content' table.
+        """
+        return TableSink(self.shared_content_table, source=source, merge=False)
 
     def buzzsumo(self):
         """For all URLs, collect data from Buzzsumo and coalesce in the database's 'links' table."""
 
-        if self.keys.buzzsumo_token:
+        if self.offline and not self.api_cache:
+            return
+        data = self.filtered_links.to_enrich("buzzsumo")
+        if self.keys.buzzsumo_token and data:
             get_buzzsumo_data(
-                data=self.filtered_links.all_links,
+                data=data,
                 token=self.keys.buzzsumo_token,
-                outfile=self.links_table.outfile,
+                outfile=self.links_sink("buzzsumo"),
+                cache=self.api_cache,
+                ledger=self.quota_ledger,
             )
-            self.links_table.update_from_csv(datafile=self.links_table.outfile)
 
     def scraper(self):
         """For select URLs, collect data via scraping and coalesce in the database's 'links' table."""
 
-        # In multiple threads, scrape HTML data and write to a CSV file
-        get_article_text(
-            data=self.filtered_links.to_scrape, outfile=self.links_table.outfile
-        )
-        # Coalesce the results in the CSV file to the links table
-        self.links_table.update_from_csv(datafile=self.links_table.outfile)
+        if self.offline and not self.http_cache:
+            return
+        data = self.filtered_links.to_enrich("scraper")
+        if data:
+            # In multiple threads, scrape HTML data and coalesce it in the links table
+            get_article_text(
+                data=data, outfile=self.links_sink("scraper"), cache=self.http_cache
+            )
 
     def other_social_media(self):
         """For select URLs, update the 'work_type' column in the database's 'links' table with the value 'SocialMediaPosting'."""
         # Assign default type to social media post
-        add_type_data(
-            data=self.filtered_links.other_social, outfile=self.links_table.outfile
-        )
-        # Coalesce the results in the CSV file to the links table
-        self.links_table.update_from_csv(datafile=self.links_table.outfile)
+        if len(self.filtered_links.other_social) > 0:
+            add_type_data(
+                data=self.filtered_links.other_social,
+                outfile=TableSink(self.links_table, source="other_social", merge=False),
+            )
 
     def twitter(self):
         """For Twitter URLs, scrape data from site and coalesce in teh database's 'links' and 'shared_content' tables."""
-        get_twitter_data(
-            data=self.filtered_links.twitter,
-            links_outfile=self.links_table.outfile,
-            shared_content_outfile=self.shared_content_table.outfile,
-        )
-        # Coalesce the results in the CSV files to the links and shared content tables
-        self.links_table.update_from_csv(datafile=self.links_table.outfile)
-        self.shared_content_table.update_from_csv(
-            datafile=self.shared_content_table.outfile
-        )
+        # Scraped tweets are not cached
+        if self.offline:
+            return
+        data = self.filtered_links.to_enrich("twitter")
+        if data:
+            shared_content_sink = self.shared_content_sink("twitter")
+            get_twitter_data(
+                data=data,
+                links_outfile=self.links_sink(
+                    "twitter", dependents=[shared_content_sink]
+                ),
+                shared_content_outfile=shared_content_sink,
+            )
 
     def facebook(self):
         """For Facebook URLs, collect data from CrowdTangle and coalesce in the database's 'links' and 'shared_content' tables."""
-        if self.keys.crowdtangle_token:
+        if self.offline and not self.api_cache:
+            return
+        data = self.filtered_links.to_enrich("crowdtangle")
+        if self.keys.crowdtangle_token and data:
+            shared_content_sink = self.shared_content_sink("crowdtangle")
             get_facebook_post_data(
-                data=self.filtered_links.facebook,
+                data=data,
                 token=self.keys.crowdtangle_token,
                 rate_limit=self.keys.crowdtangle_rate_limit,
-                links_outfile=self.links_table.outfile,
-                shared_content_outfile=self.shared_content_table.outfile,
-            )
-            # Coalesce the results in the CSV files to the links and shared content tables
-            self.links_table.update_from_csv(datafile=self.links_table.outfile)
-            self.shared_content_table.update_from_csv(
-                datafile=self.shared_content_table.outfile
+                links_outfile=self.links_sink(
+                    "crowdtangle", dependents=[shared_content_sink]
+                ),
+                shared_content_outfile=shared_content_sink,
+                cache=self.api_cache,
             )
 
     def youtube(self):
         """For YouTube URLs, collect data from YouTube API and coalesce in the database's 'links' table."""
-        if self.keys.youtube_key:
-            # In single thread, collect YouTube API data and write to a CSV file
+        if self.offline and not self.api_cache:
+            return
+        data = self.filtered_links.to_enrich("youtube")
+        if self.keys.youtube_key and data:
+            # Collect YouTube API data, spread across the keys, and coalesce it in the links table
             get_youtube_data(
-                data=self.filtered_links.youtube,
+                data=data,
                 keys=self.keys.youtube_key,
-                outfile=self.links_table.outfile,
+                outfile=self.links_sink("youtube"),
+                cache=self.api_cache,
+                ledger=self.quota_ledger,
             )
-            # Coalesce the results in the CSV file to the links table
-            self.links_table.update_from_csv(datafile=self.links_table.outfile)
+
+    def merge(self):
+        """Coalesce the results staged by the sources into the SQL tables, in order of precedence, then record the sources' reports in the enrichment's state."""
+        tables: List[BaseTable] = [self.links_table, self.shared_content_table]
+        for table in tables:
+            table.merge_sources(
+                groups=self.precedence.groups(columns=table.dtype_dict.keys())
+            )
+        if self.state is not None:
+            for source in self.precedence.default:
+                self.state.merge_staged(source=source)
 
     def __call__(self, buzzsumo_only: bool):
-        executor = SQLiteWrapper(connection=self.links_table.conn)
-        # apply domain to all urls
-        for link in self.filtered_links.all_links:
-            query, domain = apply_domain(link)
-            if query and domain:
-                self.links_table.conn
-                executor(query=query)
-
-        # Must collect Buzzsumo data first because, when platform-specific data (below)
-        # is not None, we want to replace the Buzzsumo data with the latter
-        self.buzzsumo()
+        # apply domain to all urls, in a single transaction
+        self.links_table.executemany(
+            query=DOMAIN_UPDATE_QUERY,
+            rows=yield_domains(self.filtered_links.all_links),
+        )
 
+        stages = [self.buzzsumo]
+        sources = ["buzzsumo"]
         if not buzzsumo_only:
-            if len(self.filtered_links.youtube) > 0:
-                self.youtube()
-            if len(self.filtered_links.twitter) > 0:
-                self.twitter()
-            if len(self.filtered_links.facebook) > 0:
-                self.facebook()
-            if len(self.filtered_links.other_social) > 0:
-                self.other_social_media()
-            if len(self.filtered_links.to_scrape) > 0:
-                self.scraper()
+            stages += [
+                self.youtube,
+                self.twitter,
+                self.facebook,
+                self.other_social_media,
+                self.scraper,
+            ]
+            sources += ["youtube", "twitter", "crowdtangle", "scraper"]
+
+        # Select the URLs due for each source before the sources start writing
+        # to the shared connection
+        for source in sources:
+            self.filtered_links.to_enrich(source)
+
+        # Run the sources at the same time, each staging its own results
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            futures = [executor.submit(stage) for stage in stages]
+            wait(futures)
+
+        # Platform-specific data must replace Buzzsumo data, so the staged results
+        # are coalesced once all sources are done, in order of precedence
+        self.merge()
+
+        # Raise the first error of a source, if any, once the others' results are saved
+        for future in futures:
+            future.result()
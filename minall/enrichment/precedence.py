@@ -0,0 +1,133 @@
+# minall/enrichment/precedence.py
+
+"""Precedence of the enrichment's sources when their data is coalesced.
+
+When several sources return a value for the same column of the same target URL, the value of the source with the highest precedence is kept. By default, the sources rank from lowest to highest precedence in the order of `DEFAULT_PRECEDENCE`, so that platform-specific data replaces Buzzsumo's data. The precedence can be overriden per column of the 'links' and 'shared_content' tables.
+
+This module contains the following class:
+
+- `SourcePrecedence(default, columns)` - Declares the precedence of the sources, by default and per column.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from minall.tables.links import LinksConstants
+from minall.tables.shared_content import ShareContentConstants
+
+# Sources of the enrichment, from lowest to highest precedence
+DEFAULT_PRECEDENCE = [
+    "buzzsumo",
+    "youtube",
+    "twitter",
+    "crowdtangle",
+    "other_social",
+    "scraper",
+]
+# Columns of the tables into which the sources' data is coalesced
+PRECEDENCE_COLUMNS = list(
+    dict.fromkeys([*LinksConstants.col_names, *ShareContentConstants.col_names])
+)
+
+
+@dataclass
+class SourcePrecedence:
+    """Dataclass to declare the precedence of the enrichment's sources, by default and per column.
+
+    A column's declaration lists sources from highest to lowest precedence, i.e. `{"title": ["youtube", "scraper"]}` for "youtube > scraper for title". The declared sources swap places among the ranks they hold in the default precedence, while the other sources keep theirs.
+
+    Examples:
+        >>> precedence = SourcePrecedence(columns={"title": ["buzzsumo", "scraper"]})
+        >>> precedence.order("title")
+        ['scraper', 'youtube', 'twitter', 'crowdtangle', 'other_social', 'buzzsumo']
+
+    Attributes:
+        default (List[str]): Sources from lowest to highest precedence. Default = DEFAULT_PRECEDENCE.
+        columns (Dict[str, List[str]]): Key-value pairs of column names and sources, from highest to lowest precedence.
+    """
+
+    default: List[str] = field(default_factory=lambda: list(DEFAULT_PRECEDENCE))
+    columns: Dict[str, List[str]] = field(default_factory=dict)
+
+    def order(self, column: str) -> List[str]:
+        """Sources from lowest to highest precedence for a column.
+
+        Args:
+            column (str): Column name.
+
+        Raises:
+            ValueError: The column's declaration names a source not in the default precedence.
+
+        Returns:
+            List[str]: Source names.
+        """
+        declared = self.columns.get(column)
+        if not declared:
+            return list(self.default)
+        unknown = set(declared) - set(self.default)
+        if unknown:
+            raise ValueError(
+                f"Unknown sources in precedence of '{column}': {', '.join(unknown)}"
+            )
+        order = list(self.default)
+        ranks = sorted(order.index(source) for source in declared)
+        for rank, source in zip(ranks, reversed(declared)):
+            order[rank] = source
+        return order
+
+    def groups(self, columns: Iterable[str]) -> List[Tuple[List[str], List[str]]]:
+        """Group columns that share the same order of sources, as expected by `BaseTable.merge_sources()`.
+
+        Examples:
+            >>> precedence = SourcePrecedence(default=["buzzsumo", "scraper"], columns={"title": ["buzzsumo", "scraper"]})
+            >>> precedence.groups(["url", "title", "domain"])
+            [(['buzzsumo', 'scraper'], ['url', 'domain']), (['scraper', 'buzzsumo'], ['title'])]
+
+        Args:
+            columns (Iterable[str]): Column names.
+
+        Returns:
+            List[Tuple[List[str], List[str]]]: Pairs of sources, from lowest to highest precedence, and columns.
+        """
+        groups: Dict[Tuple[str, ...], List[str]] = {}
+        for column in columns:
+            groups.setdefault(tuple(self.order(column)), []).append(column)
+        return [(list(order), cols) for order, cols in groups.items()]
+
+    @classmethod
+    def parse(
+        cls, declaration: str, columns: Iterable[str] = PRECEDENCE_COLUMNS
+    ) -> "SourcePrecedence":
+        """Parse per-column precedence from a string.
+
+        Examples:
+            >>> SourcePrecedence.parse("title=youtube>buzzsumo,work_type=scraper>buzzsumo").columns
+            {'title': ['youtube', 'buzzsumo'], 'work_type': ['scraper', 'buzzsumo']}
+            >>> SourcePrecedence.parse("titel=youtube>buzzsumo")
+            Traceback (most recent call last):
+            ...
+            ValueError: Unknown column in source precedence: 'titel'
+
+        Args:
+            declaration (str): Comma-separated pairs of column and sources, from highest to lowest precedence and separated by ">", i.e. "title=youtube>buzzsumo".
+            columns (Iterable[str], optional): Columns whose precedence can be declared. Defaults to PRECEDENCE_COLUMNS.
+
+        Raises:
+            ValueError: The declaration is malformed or names an unknown column or source.
+
+        Returns:
+            SourcePrecedence: Precedence of the sources.
+        """
+        known = set(columns)
+        precedence = cls()
+        for pair in declaration.split(","):
+            column, _, sources = pair.partition("=")
+            column = column.strip()
+            declared = [s.strip() for s in sources.split(">") if s.strip()]
+            if not column or len(declared) < 2:
+                raise ValueError(f"Invalid source precedence: '{pair}'")
+            if column not in known:
+                raise ValueError(f"Unknown column in source precedence: '{column}'")
+            precedence.columns[column] = declared
+            precedence.order(column)
+        return precedence
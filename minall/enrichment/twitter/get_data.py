@@ -9,19 +9,20 @@ from typing import List
 from minall.enrichment.crowdtangle.contexts import ContextManager
 from minall.enrichment.twitter.normalizer import NormalizedTweet, parse_shared_content
 from minall.enrichment.twitter.scraper import TweetScraper
+from minall.tables.sink import ResultSink
 
 
 def get_twitter_data(
     data: List[str],
-    links_outfile: Path,
-    shared_content_outfile: Path,
+    links_outfile: Path | ResultSink,
+    shared_content_outfile: Path | ResultSink,
 ) -> None:
-    """Transforms a set of Twitter URLs into collected Tweet metadata, written to CSV files.
+    """Transforms a set of Twitter URLs into collected Tweet metadata, pushed to result sinks.
 
     Args:
         data (List[str]): Set of Twitter ULRs.
-        links_outfile (Path): Path to CSV file for Tweet metadata.
-        shared_content_outfile (Path): Path to CSV file for metadata about links in Tweets.
+        links_outfile (Path | ResultSink): Sink, or path to CSV file, for Tweet metadata.
+        shared_content_outfile (Path | ResultSink): Sink, or path to CSV file, for metadata about links in Tweets.
     """
     with ContextManager(links_outfile, shared_content_outfile) as contexts:
         links_writer, shared_content_writer, progress = contexts
@@ -29,16 +30,14 @@ def get_twitter_data(
         t = progress.add_task(description="[bold blue]Querying Tweets", total=len(data))
         scraper = TweetScraper()
 
-        for url in data:
-            url, tweet = scraper(url)
+        for url, tweet in scraper.map(data):
             formatted_tweet = NormalizedTweet.from_payload(url=url, tweet=tweet)
-            links_writer.writerow(formatted_tweet.as_csv_dict_row())
+            links_writer.writerow(formatted_tweet)
 
             # Write the shared content data
             for shared_link in parse_shared_content(url=url, tweet=tweet):
                 if shared_link:
-                    shared_content_writer.writerow(
-                        shared_link.as_csv_dict_row()
-                    )
+                    shared_content_writer.writerow(shared_link)
+            links_writer.mark(url, succeeded=tweet is not None)
 
             progress.advance(t)
@@ -1,12 +1,22 @@
 # minall/enrichments/twitter/scraper.py
 
-"""Module contains TweetScraper wrapper for setting up and calling the minet TweetGuestAPIScraper"""
+"""Module contains TweetScraper wrapper for setting up and calling the minet TweetGuestAPIScraper.
 
-from typing import Dict, Tuple
+Minet's scraper is rate-limited to one call every 2 seconds, and each call is a full round-trip to Twitter's API. So that tweets are scraped concurrently, the wrapper keeps a pool of scraper sessions, each with its own guest token and rate limit, which a bounded pool of threads check out one call at a time. When Twitter answers a session with a rate-limit response, the session drops its guest token and backs off exponentially before retrying, while the other sessions keep scraping.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from typing import Dict, Generator, Iterable, Tuple
 
 from minet.twitter import TwitterGuestAPIScraper
 from ural.twitter import TwitterTweet, parse_twitter_url
 
+from minall.utils.concurrency import IN_FLIGHT_PER_WORKER, bounded_map
+
+# Number of scraper sessions, each with its own guest token, scraping at the same time
+SESSIONS = 16
+
 
 class TweetScraper:
     """Wrapper for running minet's Tweet Guest API Scraper.
@@ -25,13 +35,19 @@ class TweetScraper:
         '2022-07-25T16:29:00'
     """
 
-    def __init__(self) -> None:
-        """Set up minet's Twitter Guest API Scraper"""
+    def __init__(self, sessions: int = SESSIONS) -> None:
+        """Set up a pool of minet's Twitter Guest API Scrapers.
 
-        self.scraper = TwitterGuestAPIScraper()
+        Args:
+            sessions (int, optional): Number of scraper sessions. Defaults to SESSIONS.
+        """
+        self.n_sessions = sessions
+        self.sessions: Queue[TwitterGuestAPIScraper] = Queue()
+        for _ in range(sessions):
+            self.sessions.put(TwitterGuestAPIScraper())
 
     def __call__(self, url: str) -> Tuple[str, Dict | None]:
-        """If the URL is of a Tweet and the ID can be parsed, scrape and return data.
+        """If the URL is of a Tweet and the ID can be parsed, scrape and return data with the first free session.
 
         Args:
             url (str): URL of Tweet.
@@ -44,8 +60,32 @@ class TweetScraper:
         if isinstance(parsed_url, TwitterTweet):
             tweet_id = getattr(parsed_url, "id")
             if tweet_id is not None:
+                # Minet's session retries rate-limited calls with an exponential backoff
+                session = self.sessions.get()
                 try:
-                    result = self.scraper.tweet(tweet_id)
+                    result = session.tweet(tweet_id)
                 except Exception:
                     pass
+                finally:
+                    self.sessions.put(session)
         return url, result
+
+    def map(
+        self, urls: Iterable[str]
+    ) -> Generator[Tuple[str, Dict | None], None, None]:
+        """Scrape the Tweets concurrently, with one thread per session, yielding the results as soon as they complete.
+
+        Args:
+            urls (Iterable[str]): URLs of Tweets.
+
+        Yields:
+            Generator[Tuple[str, Dict | None], None, None]: If data could be scraped, the target URL and the data; otherwise the unsuccessful URL and None.
+        """
+        with ThreadPoolExecutor(max_workers=self.n_sessions) as executor:
+            yield from bounded_map(
+                executor,
+                self,
+                urls,
+                max_in_flight=IN_FLIGHT_PER_WORKER * self.n_sessions,
+                ordered=False,
+            )
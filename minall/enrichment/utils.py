@@ -5,11 +5,14 @@
 This module provides the following class and functions:
 
 - `get_domain(url)` - Parse domain from URL string.
-- `apply_domain(url)` - Generate SQL query to insert domain into table.
-- `FilteredLinks(table)` - From SQL table, select subsets of URLs based on domain name.
+- `get_host_domain(hostname)` - Parse domain from hostname, memoizing the result.
+- `yield_domains(urls)` - Generate the values of a parameterized SQL query that updates the domain of URLs in a table.
+- `classify_host(hostname)` - Name the subsets of URLs to which a hostname's URLs belong, memoizing the result.
+- `FilteredLinks(table, state)` - From SQL table, sort URLs into subsets based on domain name and, optionally, on whether each source is due to enrich them.
 """
 
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, Generator, Iterable, List, Tuple
 
 import ural
 from ural.facebook import is_facebook_url
@@ -17,63 +20,176 @@ from ural.twitter import is_twitter_url
 from ural.youtube import YOUTUBE_DOMAINS  # type: ignore
 from ural.youtube import is_youtube_url
 
+from minall.tables.enrichment_state import EnrichmentStateTable
 from minall.tables.links import LinksConstants, LinksTable
 
+# Parameterized SQL query to update the domain of a URL in the 'links' SQLite table
+DOMAIN_UPDATE_QUERY = f"UPDATE {LinksConstants.table_name} SET domain = ? WHERE {LinksConstants.primary_key} = ?"
 
-def get_domain(url: str) -> str | None:
-    """Parse the domain name of a given URL string.
+# Number of hostnames whose domain name, and subsets of URLs, are memoized
+DOMAIN_CACHE_SIZE = 100_000
+
+# Domains of the social media platforms, whose URLs are not scraped
+SOCIAL_MEDIA_DOMAINS = frozenset(
+    [
+        "facebook.com",
+        "youtube.com",
+        "tiktok.com",
+        "instagram.com",
+        "twitter.com",
+        "snapchat.com",
+    ]
+)
+
+# Names of the subsets of URLs selected by `FilteredLinks`
+PARTITIONS = ("twitter", "youtube", "facebook", "other_social", "to_scrape")
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def get_host_domain(hostname: str) -> str | None:
+    """Parse the domain name of a given hostname. The result is memoized, so that the URLs of a same host are only parsed once.
 
     Examples:
-        >>> get_domain(url="https://www.youtube.com/channel/MkDocs")
+        >>> get_host_domain(hostname="www.youtube.com")
         'youtube.com'
 
     Args:
-        url (str): URL string.
+        hostname (str): Hostname of a URL.
 
     Returns:
         str | None: If successfully parsed, domain name.
     """
 
-    domain_name = ural.get_domain_name(url)
+    domain_name = ural.get_domain_name(hostname)
     if domain_name in YOUTUBE_DOMAINS:
         domain_name = "youtube.com"
     return domain_name
 
 
-def apply_domain(url: str) -> Tuple[str | None, str | None]:
-    """Compose SQL query to update the domain column of a URL's row in the 'links' SQLite table.
+def get_domain(url: str) -> str | None:
+    """Parse the domain name of a given URL string.
 
     Examples:
-        >>> apply_domain(url="https://www.youtube.com/channel/MkDocs")
-        ("UPDATE links SET domain = 'youtube.com' WHERE url = 'https://www.youtube.com/channel/MkDocs'", 'youtube.com')
+        >>> get_domain(url="https://www.youtube.com/channel/MkDocs")
+        'youtube.com'
 
     Args:
         url (str): URL string.
 
     Returns:
-        Tuple[str | None, str | None]: If domain was parsed, a tuple containing the SQL query and domain name.
+        str | None: If successfully parsed, domain name.
     """
 
-    query = None
-    domain = get_domain(url)
-    if domain:
-        query = f"UPDATE {LinksConstants.table_name} SET domain = '{domain}' WHERE {LinksConstants.primary_key} = '{url}'"
-    return query, domain
+    hostname = ural.get_hostname(url)
+    if not hostname:
+        return None
+    return get_host_domain(hostname)
 
 
-class FilteredLinks:
-    """Selects all URLs from SQL table and returns subsets."""
+def yield_domains(urls: Iterable[str]) -> Generator[Tuple[str, str], None, None]:
+    """For the URLs whose domain can be parsed, generate the values of the SQL query `DOMAIN_UPDATE_QUERY`.
+
+    Examples:
+        >>> list(yield_domains(urls=["https://www.youtube.com/channel/MkDocs", "bad url"]))
+        [('youtube.com', 'https://www.youtube.com/channel/MkDocs')]
+
+    Args:
+        urls (Iterable[str]): URL strings.
+
+    Yields:
+        Generator[Tuple[str, str], None, None]: Domain name and URL.
+    """
+    for url in urls:
+        domain = get_domain(url)
+        if domain:
+            yield domain, url
+
 
-    def __init__(self, table: LinksTable) -> None:
-        """Select and store all URLs from a target SQL table.
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def classify_host(hostname: str) -> Tuple[str, ...]:
+    """Name the subsets of URLs, among `PARTITIONS`, to which the URLs of a hostname belong. The result is memoized, so that the URLs of a same host are only classified once.
+
+    Examples:
+        >>> classify_host(hostname="www.youtube.com")
+        ('youtube', 'other_social')
+        >>> classify_host(hostname="github.com")
+        ('to_scrape',)
+
+    Args:
+        hostname (str): Hostname of a URL.
+
+    Returns:
+        Tuple[str, ...]: Names of the subsets of URLs.
+    """
+    # The platforms' URL tests only depend on the URL's hostname
+    url = "https://" + hostname
+    partitions = []
+    if is_twitter_url(url=url):
+        partitions.append("twitter")
+    if is_youtube_url(url=url):
+        partitions.append("youtube")
+    if is_facebook_url(url=url):
+        partitions.append("facebook")
+    if get_host_domain(hostname) in SOCIAL_MEDIA_DOMAINS:
+        partitions.append("other_social")
+    else:
+        partitions.append("to_scrape")
+    return tuple(partitions)
+
+
+class FilteredLinks:
+    """Selects all URLs from SQL table and sorts them, in a single pass, into subsets."""
+
+    # Subset of URLs on which each source of the enrichment is called
+    SOURCE_SUBSETS = {
+        "buzzsumo": "all_links",
+        "youtube": "youtube",
+        "twitter": "twitter",
+        "crowdtangle": "facebook",
+        "scraper": "to_scrape",
+    }
+
+    def __init__(
+        self, table: LinksTable, state: EnrichmentStateTable | None = None
+    ) -> None:
+        """Select and store all URLs from a target SQL table, then sort them into subsets, each URL being parsed once.
 
         Args:
             table (BaseTable): Target SQL table.
+            state (EnrichmentStateTable | None, optional): SQL table of the enrichment's state, per URL and source. If None, no URL is excluded. Defaults to None.
         """
+        self.state = state
+        self.table_name = table.name
+        self.selections: Dict[str, List[str]] = {}
         cursor = table.conn.cursor()
         self.all_links = [
             row[0] for row in cursor.execute(f"SELECT url FROM {table.name}").fetchall()
         ]
+        self.partitions: Dict[str, List[str]] = {name: [] for name in PARTITIONS}
+        for url in self.all_links:
+            hostname = ural.get_hostname(url)
+            for name in classify_host(hostname) if hostname else ("to_scrape",):
+                self.partitions[name].append(url)
+
+    def to_enrich(self, source: str) -> List[str]:
+        """List of URLs on which the source is due to be called. The selection is made once per source, then reused.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+
+        Raises:
+            KeyError: The source is not one of `FilteredLinks.SOURCE_SUBSETS`.
+
+        Returns:
+            List[str]: List of URL strings.
+        """
+        if source not in self.selections:
+            urls = getattr(self, self.SOURCE_SUBSETS[source])
+            if self.state is not None:
+                due = self.state.select_due(source=source, links_table=self.table_name)
+                urls = [url for url in urls if url in due]
+            self.selections[source] = urls
+        return self.selections[source]
 
     @property
     def twitter(self) -> List[str]:
@@ -82,7 +198,7 @@ class FilteredLinks:
         Returns:
             List[str]: List of URL strings.
         """
-        return [url for url in self.all_links if is_twitter_url(url=url)]
+        return self.partitions["twitter"]
 
     @property
     def youtube(self) -> List[str]:
@@ -91,7 +207,7 @@ class FilteredLinks:
         Returns:
             List[str]: List of URL strings.
         """
-        return [url for url in self.all_links if is_youtube_url(url=url)]
+        return self.partitions["youtube"]
 
     @property
     def facebook(self) -> List[str]:
@@ -100,7 +216,7 @@ class FilteredLinks:
         Returns:
             List[str]: List of URL strings.
         """
-        return [url for url in self.all_links if is_facebook_url(url=url)]
+        return self.partitions["facebook"]
 
     @property
     def other_social(self) -> List[str]:
@@ -109,19 +225,7 @@ class FilteredLinks:
         Returns:
             List[str]: List of URL strings.
         """
-        return [
-            url
-            for url in self.all_links
-            if get_domain(url=url)
-            in [
-                "facebook.com",
-                "youtube.com",
-                "tiktok.com",
-                "instagram.com",
-                "twitter.com",
-                "snapchat.com",
-            ]
-        ]
+        return self.partitions["other_social"]
 
     @property
     def to_scrape(self) -> List[str]:
@@ -130,16 +234,4 @@ class FilteredLinks:
         Returns:
             List[str]: List of URL strings.
         """
-        return [
-            url
-            for url in self.all_links
-            if get_domain(url=url)
-            not in [
-                "facebook.com",
-                "youtube.com",
-                "tiktok.com",
-                "instagram.com",
-                "twitter.com",
-                "snapchat.com",
-            ]
-        ]
+        return self.partitions["to_scrape"]
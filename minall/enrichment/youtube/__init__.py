@@ -5,8 +5,10 @@
 Modules exported by this package:
 
 - `normalizer`: Dataclass to normlalize minet's YouTube result objects.
-- `context`: Context manager for client's CSV writer and progress bar.
+- `context`: Context manager for client's result sink and progress bar.
+- `exceptions`: Exceptions raised during data collection from YouTube API.
 - `get_data`: Function that runs all of the YouTube enrichment process.
+- `key_pool`: Class that spreads the API requests across keys, within each key's daily quota.
 """
 
 from minall.enrichment.youtube.get_data import get_youtube_data
@@ -1,20 +1,15 @@
 # minall/enrichment/youtube/context.py
 
-"""Module containing contexts for YouTube data collection's CSV writer and progress bar.
+"""Module containing contexts for YouTube data collection's result sink and progress bar.
 """
 
-import csv
 from pathlib import Path
 
-from rich.progress import (
-    MofNCompleteColumn,
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
+from rich.progress import Progress
 
 from minall.tables.links import LinksConstants
+from minall.tables.sink import ResultSink, open_sink
+from minall.utils.progress_bar import start_progress_bar, stop_progress_bar
 
 
 class ProgressBar:
@@ -30,47 +25,38 @@ class ProgressBar:
             Progress: Context variable for rich progress bar.
         """
 
-        self.progress_bar = Progress(
-            TextColumn("[progress.description]{task.description}"),
-            SpinnerColumn(),
-            MofNCompleteColumn(),
-            TimeElapsedColumn(),
-        )
-        self.progress_bar.start()
+        self.progress_bar = start_progress_bar()
         return self.progress_bar
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stops the progress bar's context variable."""
-        self.progress_bar.stop()
+        stop_progress_bar()
 
 
 class Writer:
-    """Context for writing YouTube links metadata to CSV of 'links' SQL table."""
+    """Context for pushing YouTube links metadata to a result sink of 'links' SQL table."""
 
-    def __init__(self, links_file: Path):
-        """Set up class for iteratively writing normalized YouTube results to CSV.
+    def __init__(self, links_file: Path | ResultSink):
+        """Set up class for iteratively pushing normalized YouTube results to a sink.
 
         Args:
-            links_file (Path): Path to the links table CSV file.
+            links_file (Path | ResultSink): Sink for the links table, or path to the links table CSV file.
         """
         self.links_file = links_file
 
-    def __enter__(self) -> csv.DictWriter:
-        """Start the CSV writer's context.
+    def __enter__(self) -> ResultSink:
+        """Start the result sink's context.
 
         Returns:
-            csv.DictWriter: Context variable for writing CSV rows.
+            ResultSink: Context variable for pushing results.
         """
 
-        self.links_file_obj = open(self.links_file, mode="w")
-        self.links_file_writer = csv.DictWriter(
-            self.links_file_obj, fieldnames=LinksConstants.col_names
+        self.links_file_writer = open_sink(
+            self.links_file, fieldnames=LinksConstants.col_names
         )
-        self.links_file_writer.writeheader()
 
         return self.links_file_writer
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Stops the writer's context variable."""
-        if self.links_file_obj:
-            self.links_file_obj.close()
+        self.links_file_writer.close()
@@ -0,0 +1,16 @@
+# minall/enrichment/youtube/exceptions.py
+
+"""Exceptions raised during data collection from YouTube API.
+
+This module contains exceptions raised during data collection from YouTube API. The module contains the following exception:
+
+- `QuotaExhausted` - Every YouTube API key spent its daily quota.
+"""
+
+
+class QuotaExhausted(Exception):
+    def __init__(self, day: str) -> None:
+        message = "Every YouTube API key spent its quota for the day {day} (Pacific time). The remaining links can be enriched by resuming the run after midnight Pacific time.".format(
+            day=day
+        )
+        super().__init__(message)
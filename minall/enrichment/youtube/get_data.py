@@ -3,70 +3,177 @@
 """Module contains function to manage process of collecting and normalizing data about YouTube web content.
 """
 
+import logging
 from pathlib import Path
+from typing import Dict, Iterable, List, Set
 
 from minet.youtube.client import YouTubeAPIClient
+from minet.youtube.types import YouTubeChannel, YouTubeVideo
 from ural.youtube import YoutubeShort, YoutubeVideo
 
 from minall.enrichment.youtube.context import ProgressBar, Writer
+from minall.enrichment.youtube.exceptions import QuotaExhausted
+from minall.enrichment.youtube.key_pool import KeyPool
 from minall.enrichment.youtube.normalizer import ParsedLink, normalize
+from minall.tables.sink import ResultSink
+from minall.utils.api_cache import APICache
+from minall.utils.quota import QuotaLedger
 
+CHANNEL_URL = "https://www.youtube.com/channel/"
 
-def get_youtube_data(data: list[str], keys: list[str], outfile: Path) -> None:
-    """Collects and writes metadata about target YouTube videos and channels to a CSV file that will be inserted into 'links' SQL table.
+# Number of links whose results are pushed to the sink at once; their videos
+# and channels are sent to the API in full batches of 50 IDs per request
+LINK_CHUNK_SIZE = 1_000
+
+
+def query_videos(
+    client: KeyPool | YouTubeAPIClient,
+    video_ids: Iterable[str],
+    cache: APICache | None = None,
+) -> Dict[str, YouTubeVideo | None]:
+    """Query YouTube videos, reading the raw payloads the cache has and querying the others in batches of 50 IDs per request.
 
     Args:
-        data (list[str]): Set of target YouTube URLs.
-        keys (list[str]): Set of keys for YouTube API.
-        outfile (Path): Path to CSV file for 'links' SQL table.
+        client (KeyPool | YouTubeAPIClient): Pool of YouTube API keys, or minet's YouTube API client.
+        video_ids (Iterable[str]): IDs of the YouTube videos.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
+
+    Returns:
+        Dict[str, YouTubeVideo | None]: Key-value pairs of video ID and, if found, minet's YouTube video result.
     """
-    # Sort the URLs into channels and videos
-    parsed_links = [ParsedLink(url) for url in data]
-    n_videos = len(
-        [
-            i
-            for i in parsed_links
-            if isinstance(i.type, YoutubeVideo) or isinstance(i.type, YoutubeShort)
-        ]
-    )
-
-    client = YouTubeAPIClient(key=keys)
-
-    # Mutate the parsed_links array by adding video data
-    with ProgressBar() as progress:
-        t = progress.add_task(
-            description="[bold red]Querying YouTube videos", total=n_videos
-        )
-        for pl in parsed_links:
-            if isinstance(pl.type, YoutubeVideo) or isinstance(pl.type, YoutubeShort):
-                for _, result in client.videos(videos=[pl.video_id]):
-                    setattr(pl, "video_result", result)
-                    setattr(pl, "channel_id", getattr(result, "channel_id") if result is not None else None)
-                    progress.advance(t)
-
-    # Get a unique set of channels from video and channel data
-    channel_set = set()
-    for pl in parsed_links:
-        if pl.channel_id:
-            channel_set.add("https://www.youtube.com/channel/" + pl.channel_id)
 
-    # Create an index of unique channels and their collected metadata
-    channel_index = {}
-    with ProgressBar() as progress:
-        t = progress.add_task(
-            description="[bold red]Querying YouTube channels", total=len(channel_set)
+    def call(ids):
+        return client.videos(videos=ids, raw=True)
+
+    if cache:
+        payloads = cache.fetch_many("youtube_video", video_ids, call=call)
+    else:
+        payloads = dict(call(list(dict.fromkeys(video_ids))))
+    return {
+        video_id: YouTubeVideo.from_payload(payload) if payload else None
+        for video_id, payload in payloads.items()
+    }
+
+
+def query_channels(
+    client: KeyPool | YouTubeAPIClient,
+    channel_ids: Iterable[str],
+    cache: APICache | None = None,
+) -> Dict[str, YouTubeChannel | None]:
+    """Query YouTube channels, reading the raw payloads the cache has and querying the others in batches.
+
+    Args:
+        client (KeyPool | YouTubeAPIClient): Pool of YouTube API keys, or minet's YouTube API client.
+        channel_ids (Iterable[str]): IDs of the YouTube channels.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
+
+    Returns:
+        Dict[str, YouTubeChannel | None]: Key-value pairs of channel ID and, if found, minet's YouTube channel result.
+    """
+
+    def call(ids):
+        return client.channels(
+            channels_target=ids, key=lambda id: CHANNEL_URL + id, raw=True
         )
-        for channel_url, result in client.channels(channels_target=channel_set):
-            channel_id = channel_url.split("/")[-1]
-            channel_index.update({channel_id: result})
-            progress.advance(t)
 
-    # Again mutate the parsed_links array by adding channel data
+    if cache:
+        payloads = cache.fetch_many("youtube_channel", channel_ids, call=call)
+    else:
+        payloads = dict(call(list(channel_ids)))
+    return {
+        channel_id: YouTubeChannel.from_payload(payload) if payload else None
+        for channel_id, payload in payloads.items()
+    }
+
+
+def enrich_links(
+    client: KeyPool | YouTubeAPIClient,
+    parsed_links: List[ParsedLink],
+    cache: APICache | None = None,
+) -> Set[str]:
+    """Mutate the parsed links by adding their video and channel data, querying each video and channel once.
+
+    Args:
+        client (KeyPool | YouTubeAPIClient): Pool of YouTube API keys, or minet's YouTube API client.
+        parsed_links (List[ParsedLink]): Parsed target YouTube URLs.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
+
+    Returns:
+        Set[str]: Target URLs whose video, or channel if the URL is a channel's, the offline cache missed. Empty if the cache is not offline.
+    """
+    offline = cache is not None and cache.offline
+    missed: Set[str] = set()
+    # Query each video once, however many links point to it
+    video_links = [
+        pl
+        for pl in parsed_links
+        if isinstance(pl.type, YoutubeVideo) or isinstance(pl.type, YoutubeShort)
+    ]
+    video_ids = list(dict.fromkeys(pl.video_id for pl in video_links))
+    video_index = query_videos(client, video_ids=video_ids, cache=cache)
+    for pl in video_links:
+        # The offline cache leaves out the videos it misses
+        if offline and pl.video_id not in video_index:
+            missed.add(pl.link_id)
+        result = video_index.get(pl.video_id)
+        pl.video_result = result
+        pl.channel_id = result.channel_id if result is not None else None
+
+    # Create an index of unique channels from video and channel data
+    channel_set = {pl.channel_id for pl in parsed_links if pl.channel_id}
+    channel_index = query_channels(client, channel_ids=channel_set, cache=cache)
     for pl in parsed_links:
         if pl.channel_id:
             pl.channel_result = channel_index.get(pl.channel_id)
+            # A channel's link misses if its channel does, a video's link if its video does
+            if offline and pl.video_id is None and pl.channel_id not in channel_index:
+                missed.add(pl.link_id)
+    return missed
+
+
+def get_youtube_data(
+    data: list[str],
+    keys: list[str],
+    outfile: Path | ResultSink,
+    cache: APICache | None = None,
+    ledger: QuotaLedger | None = None,
+) -> None:
+    """Collects and pushes metadata about target YouTube videos and channels to a result sink for the 'links' SQL table.
+
+    The links are enriched in chunks, whose results are pushed to the sink before the next chunk is queried. The requests are spread across the API keys, within each key's daily quota. In offline mode, the links whose data the cache misses are neither pushed nor reported. If every key spends its quota, the links enriched so far are kept and the others are left for a resumed run.
 
-    with Writer(links_file=outfile) as writer:
-        for pl in parsed_links:
-            normalized_result = normalize(pl)
-            writer.writerow(normalized_result)
+    Args:
+        data (list[str]): Set of target YouTube URLs.
+        keys (list[str]): Set of keys for YouTube API.
+        outfile (Path | ResultSink): Sink, or path to CSV file, for 'links' SQL table.
+        cache (APICache | None, optional): Persistent cache of the API's raw payloads. Defaults to None.
+        ledger (QuotaLedger | None, optional): Persistent ledger of the quota units spent per key. Defaults to None.
+    """
+    # Sort the URLs into channels and videos
+    parsed_links = [ParsedLink(url) for url in data]
+
+    client = KeyPool(keys=keys, ledger=ledger)
+
+    with ProgressBar() as progress, Writer(links_file=outfile) as writer:
+        t = progress.add_task(
+            description="[bold red]Querying YouTube links", total=len(parsed_links)
+        )
+        for i in range(0, len(parsed_links), LINK_CHUNK_SIZE):
+            chunk = parsed_links[i : i + LINK_CHUNK_SIZE]
+            try:
+                missed = enrich_links(client, parsed_links=chunk, cache=cache)
+            except QuotaExhausted as e:
+                logging.warning(e)
+                progress.console.print(f"[bold red]{e}")
+                break
+            for pl in chunk:
+                # The API was not asked about the links the offline cache missed
+                if pl.link_id in missed:
+                    continue
+                writer.writerow(normalize(pl))
+                writer.mark(
+                    pl.link_id,
+                    succeeded=pl.video_result is not None
+                    or pl.channel_result is not None,
+                )
+            progress.advance(t, advance=len(chunk))
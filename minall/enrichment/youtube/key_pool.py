@@ -0,0 +1,209 @@
+# minall/enrichment/youtube/key_pool.py
+
+"""Quota-aware pool of YouTube API keys.
+
+Each YouTube API key is granted a daily quota of units, and every call to the videos or channels endpoints costs one unit, whatever the number of IDs it queries. Rather than draining one key until the API refuses it, the pool gives each of its keys a client of its own and spreads the requests across them, sending the batches of IDs concurrently, each with the key that has the most units left. The units spent are recorded in a `QuotaLedger`, so that a key's spending in previous runs of the same day counts against its quota. A key is set aside before its quota is used up, keeping a reserve for the requests the ledger does not know of, or as soon as the API refuses it.
+
+When every key is set aside, the pool raises `QuotaExhausted`, so that the enrichment can stop and be resumed the next day.
+
+This module contains the following class:
+
+- `KeyPool(keys, ledger, daily_quota, reserve)` - Spread the YouTube API requests across keys, within each key's daily quota.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from minet.youtube.client import YouTubeAPIClient
+from minet.youtube.constants import (
+    YOUTUBE_API_MAX_CHANNELS_PER_CALL,
+    YOUTUBE_API_MAX_VIDEOS_PER_CALL,
+)
+from minet.youtube.exceptions import YouTubeAPILimitReached
+
+from minall.enrichment.youtube.exceptions import QuotaExhausted
+from minall.utils.quota import QuotaLedger, pacific_day
+
+# Name of the service in the quota ledger
+SERVICE = "youtube"
+# Units granted to each key per day
+DAILY_QUOTA = 10_000
+# Units of each key left unspent, for the requests the ledger does not know of
+QUOTA_RESERVE = 100
+# Units spent by one call to the videos or channels endpoint
+REQUEST_COST = 1
+
+
+class KeyPool:
+    """Class to spread the YouTube API requests across keys, within each key's daily quota.
+
+    The pool can replace minet's `YouTubeAPIClient` to query videos and channels.
+
+    Examples:
+        >>> pool = KeyPool(keys=["key1", "key2"], daily_quota=200, reserve=100)
+        >>> pool.acquire()
+        'key1'
+        >>> pool.acquire()
+        'key2'
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        ledger: QuotaLedger | None = None,
+        daily_quota: int = DAILY_QUOTA,
+        reserve: int = QUOTA_RESERVE,
+    ) -> None:
+        """Create a client per key and read the units each key already spent today from the ledger.
+
+        Args:
+            keys (List[str]): YouTube API keys.
+            ledger (QuotaLedger | None, optional): Persistent ledger of the units spent. If None, the units are only counted during the run. Defaults to None.
+            daily_quota (int, optional): Units granted to each key per day. Defaults to DAILY_QUOTA.
+            reserve (int, optional): Units of each key left unspent. Defaults to QUOTA_RESERVE.
+        """
+        self.keys = list(dict.fromkeys(keys))
+        self.ledger = ledger if ledger else QuotaLedger(database=None)
+        self.daily_quota = daily_quota
+        self.reserve = reserve
+        # Without sleeping, a client raises as soon as the API refuses its key
+        self.clients = {
+            key: YouTubeAPIClient(key=key, sleep=False) for key in self.keys
+        }
+        self.lock = threading.Lock()
+        self.day = ""
+        self.remaining: Dict[str, int] = {}
+        self._start_day()
+
+    def _start_day(self) -> None:
+        """If the day changed in Pacific time, reset the keys' remaining units from the ledger."""
+        day = pacific_day()
+        if day == self.day:
+            return
+        self.day = day
+        self.remaining = {
+            key: self.daily_quota
+            - self.reserve
+            - self.ledger.spent(SERVICE, key, period=day)
+            for key in self.keys
+        }
+
+    def acquire(self, units: int = REQUEST_COST) -> str:
+        """Take the key with the most units left, reserving the units of a request.
+
+        Args:
+            units (int, optional): Units spent by the request. Defaults to REQUEST_COST.
+
+        Raises:
+            QuotaExhausted: No key has enough units left.
+
+        Returns:
+            str: YouTube API key.
+        """
+        with self.lock:
+            self._start_day()
+            key = max(self.keys, key=lambda k: self.remaining[k])
+            if self.remaining[key] < units:
+                raise QuotaExhausted(day=self.day)
+            self.remaining[key] -= units
+            return key
+
+    def exhaust(self, key: str) -> None:
+        """Set a key aside for the rest of the day, after the API refused it.
+
+        Args:
+            key (str): YouTube API key.
+        """
+        with self.lock:
+            self.remaining[key] = 0
+        self.ledger.exhaust(SERVICE, key, period=self.day, quota=self.daily_quota)
+
+    def request(self, call: Callable[[YouTubeAPIClient], Iterable]) -> List:
+        """Send a request with the key that has the most units left, switching keys if the API refuses it.
+
+        Args:
+            call (Callable[[YouTubeAPIClient], Iterable]): Function that sends the request with a client and returns its results.
+
+        Raises:
+            QuotaExhausted: No key has enough units left.
+
+        Returns:
+            List: Results of the request.
+        """
+        while True:
+            key = self.acquire()
+            try:
+                results = list(call(self.clients[key]))
+            except YouTubeAPILimitReached:
+                self.exhaust(key)
+                continue
+            finally:
+                # The API counts the request against the key's quota, even if it fails
+                self.ledger.spend(SERVICE, key, period=self.day, units=REQUEST_COST)
+            return results
+
+    def _map(
+        self,
+        items: Iterable[Any],
+        size: int,
+        call: Callable[[YouTubeAPIClient, List[Any]], Iterable],
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Send the batches of items concurrently, one thread per key, yielding the results in order.
+
+        Args:
+            items (Iterable[Any]): Targets of the requests.
+            size (int): Maximum number of targets per request.
+            call (Callable[[YouTubeAPIClient, List[Any]], Iterable]): Function that sends a batch of targets with a client and returns its results.
+
+        Yields:
+            Iterator[Tuple[Any, Any]]: Pairs of target and result.
+        """
+        items = list(items)
+        batches = [items[i : i + size] for i in range(0, len(items), size)]
+        with ThreadPoolExecutor(max_workers=len(self.keys)) as executor:
+            for results in executor.map(
+                lambda batch: self.request(lambda client: call(client, batch)),
+                batches,
+            ):
+                yield from results
+
+    def videos(
+        self, videos: Iterable[Any], raw: bool = False
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Query YouTube videos, like minet's `YouTubeAPIClient.videos()`.
+
+        Args:
+            videos (Iterable[Any]): Video IDs or URLs.
+            raw (bool, optional): Whether to return the API's raw payloads. Defaults to False.
+
+        Yields:
+            Iterator[Tuple[Any, Any]]: Pairs of target and, if found, video result.
+        """
+        return self._map(
+            videos,
+            size=YOUTUBE_API_MAX_VIDEOS_PER_CALL,
+            call=lambda client, batch: client.videos(batch, raw=raw),
+        )
+
+    def channels(
+        self,
+        channels_target: Iterable[Any],
+        key: Callable[[Any], str] | None = None,
+        raw: bool = False,
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Query YouTube channels, like minet's `YouTubeAPIClient.channels()`.
+
+        Args:
+            channels_target (Iterable[Any]): Channel targets.
+            key (Callable[[Any], str] | None, optional): Function that turns a target into a channel ID or URL. Defaults to None.
+            raw (bool, optional): Whether to return the API's raw payloads. Defaults to False.
+
+        Yields:
+            Iterator[Tuple[Any, Any]]: Pairs of target and, if found, channel result.
+        """
+        return self._map(
+            channels_target,
+            size=YOUTUBE_API_MAX_CHANNELS_PER_CALL,
+            call=lambda client, batch: client.channels(batch, key=key, raw=raw),
+        )
@@ -6,19 +6,36 @@ With the class `Minall`, this module manages the entire workflow.
 
 The class contains the following methods:
 
-- `__init__(database, config, output_dir, links_file, url_col, shared_content_file, buzzsumo_only)` - Intialize SQLite database and out-file paths.
+- `__init__(database, config, output_dir, links_file, url_col, shared_content_file, buzzsumo_only, compression, export_format, incremental, refresh, db_profile, precedence, http_cache, http_cache_ttl, api_cache, api_cache_ttl, cache_only, resume, quota_ledger)` - Intialize SQLite database and out-file paths.
+- `analyze()` - Gather statistics on the SQL tables and describe the query plans of the enrichment's selection of URLs.
 - `collect_and_coalesce()` - Collect new data and coalesce with existing data in relevant SQL tables.
-- `export()` - Write enriched SQL tables to CSV out-files.
+- `export()` - Write enriched SQL tables to CSV or Parquet out-files.
+- `to_arrow()` - Read enriched SQL tables into in-memory Arrow tables.
 """
 
+from datetime import timedelta
 from pathlib import Path
-from typing import Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 from minall.enrichment.enrichment import Enrichment
+from minall.enrichment.precedence import SourcePrecedence
+from minall.enrichment.utils import FilteredLinks
+from minall.tables.base import COMPRESSION_SUFFIXES
+from minall.tables.enrichment_state import EnrichmentStateTable
 from minall.tables.links import LinksTable
 from minall.tables.shared_content import SharedContentTable
-from minall.utils.database import connect_to_database
+from minall.utils.api_cache import APICache
+from minall.utils.database import (
+    connect_to_database,
+    explain_query_plan,
+    ingesting,
+)
+from minall.utils.http_cache import DEFAULT_TTL, HTTPCache
 from minall.utils.parse_config import APIKeys
+from minall.utils.quota import QuotaLedger
+
+if TYPE_CHECKING:
+    import pyarrow as pa
 
 
 class Minall:
@@ -33,6 +50,19 @@ class Minall:
         url_col: str,
         shared_content_file: Path | str | None = None,
         buzzsumo_only: bool = False,
+        compression: str | None = None,
+        export_format: str = "csv",
+        incremental: bool = False,
+        refresh: Dict[str, timedelta | None] | None = None,
+        db_profile: str | None = None,
+        precedence: SourcePrecedence | None = None,
+        http_cache: str | None = None,
+        http_cache_ttl: timedelta | None = DEFAULT_TTL,
+        api_cache: str | None = None,
+        api_cache_ttl: Dict[str, timedelta | None] | None = None,
+        cache_only: bool = False,
+        resume: bool = False,
+        quota_ledger: str | None = None,
     ) -> None:
         """Intialize SQLite database and out-file paths.
 
@@ -58,10 +88,29 @@ class Minall:
             url_col (str): Name of URL column in URLs file.
             shared_content_file (str | None): Path name to CSV file of shared content related to URLs.
             buzzsumo_only (bool, optional): Whether to only run Buzzsumo enrichment. Defaults to False.
+            compression (str | None, optional): Compression of the exported files, either "gzip" or "zstd". Defaults to None.
+            export_format (str, optional): Format of the exported files, either "csv" or "parquet". Defaults to "csv".
+            incremental (bool, optional): Whether to keep the tables of an existing database, merging the in-files' rows into them, and to only call each source on the URLs it is due to enrich. Requires a database file. Defaults to False.
+            refresh (Dict[str, timedelta | None] | None, optional): In incremental mode, maximum age, per source, of the data collected in previous runs, i.e. {"buzzsumo": timedelta(days=7)}. Sources not in the policy never refresh their data, and only retry the URLs for which they returned no data, after a delay that doubles with each retry (see `minall.tables.enrichment_state.RETRY_AFTER`). Defaults to None.
+            db_profile (str | None, optional): Performance profile of the SQLite connection, either "bulk" or "safe" (see `minall.utils.database.DATABASE_PROFILES`). If None, SQLite's default settings are used. Defaults to None.
+            precedence (SourcePrecedence | None, optional): Precedence of the enrichment's sources, by default and per column, when their data is coalesced. If None, platform-specific data replaces Buzzsumo's data (see `minall.enrichment.precedence.DEFAULT_PRECEDENCE`). Defaults to None.
+            http_cache (str | None, optional): Path to the SQLite database of the scraped pages' responses, which a later run reuses instead of downloading the pages again. If None, the pages are not cached. Defaults to None.
+            http_cache_ttl (timedelta | None, optional): Time-to-live of the cached responses, after which they are revalidated. If None, the responses never expire. Defaults to DEFAULT_TTL.
+            api_cache (str | None, optional): Path to the SQLite database of the Buzzsumo, CrowdTangle, and YouTube APIs' raw payloads, which a later run reuses instead of querying the APIs again. If None, the payloads are not cached. Defaults to None.
+            api_cache_ttl (Dict[str, timedelta | None] | None, optional): Time-to-live, per source, of the cached payloads, i.e. {"buzzsumo": timedelta(days=1)}. Sources not in the policy keep their payloads for 7 days (see `minall.utils.api_cache.DEFAULT_API_TTL`). Defaults to None.
+            cache_only (bool, optional): Whether to normalize the data stored in the caches again, without any network access. Sources without a cache are skipped. Defaults to False.
+            resume (bool, optional): Whether to resume an interrupted enrichment of the database. The sources' results and reports are checkpointed in the database as they are collected, and the enrichment continues from each source's last checkpoint. Implies incremental mode. Defaults to False.
+            quota_ledger (str | None, optional): Path to the SQLite database of the quota units spent per YouTube API key and day, and per Buzzsumo token and month, so that a later run in the same period knows how much quota is left. If None, the units are only counted during the run. Defaults to None.
+
+        Raises:
+            ValueError: The cache-only mode is requested without any cache.
+            ValueError: The resume mode is requested without a database file.
+            ValueError: The incremental mode is requested without a database file.
+            ValueError: A refresh policy is given outside incremental mode, or declares an unknown source.
         """
 
         # Connect to the SQLite database
-        self.connection = connect_to_database(database=database)
+        self.connection = connect_to_database(database=database, profile=db_profile)
 
         # Parse API keys from config file / dict
         self.keys = APIKeys(config=config)
@@ -69,6 +118,50 @@ class Minall:
         # Store Buzzsumo-only flag
         self.buzzsumo_only = buzzsumo_only
 
+        # Store precedence of the sources
+        self.precedence = precedence
+
+        # Open the persistent caches of the scraped pages and API payloads, if any
+        if cache_only and not (http_cache or api_cache):
+            raise ValueError("The cache-only mode requires an HTTP or API cache.")
+        self.cache_only = cache_only
+        self.http_cache = None
+        if http_cache:
+            self.http_cache = HTTPCache(
+                database=http_cache, ttl=http_cache_ttl, offline=cache_only
+            )
+        self.api_cache = None
+        if api_cache:
+            self.api_cache = APICache(
+                database=api_cache, ttl=api_cache_ttl, offline=cache_only
+            )
+
+        # Open the persistent ledger of the APIs' quota, if any
+        self.quota_ledger = QuotaLedger(database=quota_ledger) if quota_ledger else None
+
+        # Store compression and format of the exported files
+        self.compression = compression
+        self.export_format = export_format
+
+        # Store incremental flag; in incremental mode, existing tables are not dropped
+        if resume and not database:
+            raise ValueError("The resume mode requires a database file.")
+        if incremental and not database:
+            raise ValueError("The incremental mode requires a database file.")
+        incremental = incremental or resume
+        if refresh and not incremental:
+            raise ValueError("The refresh policy requires the incremental mode.")
+        if refresh:
+            unknown = set(refresh) - set(FilteredLinks.SOURCE_SUBSETS)
+            if unknown:
+                raise ValueError(
+                    "Unknown sources in refresh policy: {}.".format(
+                        ", ".join(sorted(unknown))
+                    )
+                )
+        self.incremental = incremental
+        self.resume = resume
+
         # Set paths to output directory and out-files
         if not isinstance(output_dir, Path):
             output_dir = Path(output_dir)
@@ -78,23 +171,62 @@ class Minall:
         self.links_file = self.output_dir.joinpath("links.csv")
         self.shared_contents_file = self.output_dir.joinpath("shared_content.csv")
 
-        # Input original data into the database
-        if not isinstance(links_file, Path):
-            links_file = Path(links_file)
-        self.links_table = LinksTable(
-            conn=self.connection,
-            infile=links_file,
-            url_col=url_col,
-            outfile=self.links_file,
-        )
+        # Input original data into the database, with the profile's ingest settings
+        with ingesting(self.connection):
+            if not isinstance(links_file, Path):
+                links_file = Path(links_file)
+            self.links_table = LinksTable(
+                conn=self.connection,
+                infile=links_file,
+                url_col=url_col,
+                outfile=self.links_file,
+                drop=not incremental,
+                durable_staging=resume,
+            )
 
-        if isinstance(shared_content_file, str):
-            shared_content_file = Path(shared_content_file)
-        self.shared_content_table = SharedContentTable(
-            conn=self.connection,
-            infile=shared_content_file,
-            outfile=self.shared_contents_file,
-        )
+            if isinstance(shared_content_file, str):
+                shared_content_file = Path(shared_content_file)
+            self.shared_content_table = SharedContentTable(
+                conn=self.connection,
+                infile=shared_content_file,
+                outfile=self.shared_contents_file,
+                drop=not incremental,
+                durable_staging=resume,
+            )
+
+        # In incremental mode, record when and how each source enriched each URL;
+        # in resume mode, the staged results and reports outlive an interrupted run
+        self.state_table = None
+        if incremental:
+            self.state_table = EnrichmentStateTable(
+                conn=self.connection,
+                outfile=self.output_dir.joinpath("enrichment_state.csv"),
+                drop=False,
+                refresh=refresh,
+                durable_staging=resume,
+            )
+
+    def analyze(self) -> Dict[str, List[str]]:
+        """Gather statistics on the SQL tables and describe the query plans of the enrichment's selection of URLs.
+
+        SQLite's `ANALYZE` command stores statistics about the tables' indexes, which the query planner uses to choose between them. The returned query plans show, for the selection of all target URLs and, in incremental mode, for each source's selection of the URLs it is due to enrich, whether SQLite scans a table or searches it with an index.
+
+        Returns:
+            Dict[str, List[str]]: Key-value pairs of the selection's name and the steps of its query plan.
+        """
+        with self.connection:
+            self.connection.execute("ANALYZE")
+
+        queries = {"links": (f"SELECT url FROM {self.links_table.name}", ())}
+        if self.state_table is not None:
+            for source in FilteredLinks.SOURCE_SUBSETS:
+                queries[source] = self.state_table.due_query(
+                    source=source, links_table=self.links_table.name
+                )
+        return {
+            name: explain_query_plan(self.connection, query, values)
+            for name, (query, values) in queries.items()
+        }
 
     def collect_and_coalesce(self):
         """Collect new data and coalesce with existing data in relevant SQL tables.
@@ -107,17 +239,55 @@ class Minall:
             links_table=self.links_table,
             shared_content_table=self.shared_content_table,
             keys=self.keys,
+            state=self.state_table,
+            precedence=self.precedence,
+            http_cache=self.http_cache,
+            api_cache=self.api_cache,
+            offline=self.cache_only,
+            quota_ledger=self.quota_ledger,
         )
         enricher(buzzsumo_only=self.buzzsumo_only)
 
     def export(self) -> Tuple[Path, Path]:
-        """Write enriched SQL tables to CSV out-files.
+        """Write enriched SQL tables to CSV or Parquet out-files.
+
+        This method simply exports to CSV files both of the `Minall` class instance's SQL tables, `self.links_table` and `self.shared_content_table`. The class that manages the SQL tables (`minall.tables.base.BaseTable`), stores each table's out-file path as an instance variable. The parent directory for both out-files was declared during `Minall`'s `__init__()` method via the parameter `output_dir`, from which the out-file paths were subsequently derived. If a compression was declared, the compression's extension is appended to both out-files' names, i.e. "links.csv.gz".
+
+        If the export format is "parquet", the tables are instead written to Parquet files ("links.parquet" and "shared_content.parquet"), with the column types declared for the tables and the compression, if declared, as the Parquet codec. The Parquet export requires the optional `pyarrow` package.
+
+        Returns:
+            Tuple[Path, Path]: Paths to links and shared content out-files.
+        """
+        if self.export_format == "parquet":
+            links_file = self.links_file.with_suffix(".parquet")
+            shared_contents_file = self.shared_contents_file.with_suffix(".parquet")
+            self.links_table.export_parquet(
+                outfile=links_file, compression=self.compression
+            )
+            self.shared_content_table.export_parquet(
+                outfile=shared_contents_file, compression=self.compression
+            )
+            return links_file, shared_contents_file
+
+        suffix = (
+            COMPRESSION_SUFFIXES.get(self.compression, "") if self.compression else ""
+        )
+        links_file = self.links_file.with_name(self.links_file.name + suffix)
+        shared_contents_file = self.shared_contents_file.with_name(
+            self.shared_contents_file.name + suffix
+        )
+        self.links_table.export(outfile=links_file, compression=self.compression)
+        self.shared_content_table.export(
+            outfile=shared_contents_file, compression=self.compression
+        )
+        return links_file, shared_contents_file
+
+    def to_arrow(self) -> Tuple["pa.Table", "pa.Table"]:
+        """Read enriched SQL tables into in-memory Arrow tables, without writing any file.
 
-        This method simply exports to CSV files both of the `Minall` class instance's SQL tables, `self.links_table` and `self.shared_content_table`. The class that manages the SQL tables (`minall.tables.base.BaseTable`), stores each table's out-file path as an instance variable. The parent directory for both out-files was declared during `Minall`'s `__init__()` method via the parameter `output_dir`, from which the out-file paths were subsequently derived.
+        The tables are read from SQLite in record batches, with the column types declared for the tables, i.e. INTEGER engagement counts. Requires the optional `pyarrow` package.
 
         Returns:
-            Tuple[Path, Path]: Paths to links and shared content CSV files.
+            Tuple[pa.Table, pa.Table]: Arrow tables of the links and shared content SQL tables.
         """
-        self.links_table.export()
-        self.shared_content_table.export()
-        return self.links_file, self.shared_contents_file
+        return self.links_table.to_arrow(), self.shared_content_table.to_arrow()
@@ -6,25 +6,151 @@ This module contains the class `BaseTable` that manages the SQLite database's ta
 """
 
 import csv
+import gzip
+import logging
+import time
+from itertools import islice
 from pathlib import Path
 from sqlite3 import Connection
-from typing import Dict, Iterable, List, Tuple
+from types import ModuleType
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from minall.tables.exceptions import UnknownCompression
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Number of rows sent to, or fetched from, the database per call to `executemany` / `fetchmany`
+BATCH_SIZE = 10_000
+
+# Size in bytes of the buffer used to write an exported table
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# File extensions of the supported export compressions
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def open_outfile(outfile: Path, compression: str | None = None) -> TextIO:
+    """Open a text file for writing, optionally compressed with gzip or zstd.
+
+    Compressing with zstd requires the optional `zstandard` package.
+
+    Args:
+        outfile (Path): Path to out-file.
+        compression (str | None, optional): Either "gzip", "zstd", or None for no compression. Defaults to None.
+
+    Raises:
+        UnknownCompression: The compression is not supported.
+        ModuleNotFoundError: The `zstandard` package is not installed.
+
+    Returns:
+        TextIO: Opened file object.
+    """
+    if compression is None:
+        return open(outfile, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+    elif compression == "gzip":
+        return gzip.open(outfile, "wt", encoding="utf-8")  # type: ignore
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ModuleNotFoundError as e:
+            raise ModuleNotFoundError(
+                "Install the 'zstandard' package to export zstd-compressed files."
+            ) from e
+        return zstandard.open(outfile, "wt", encoding="utf-8")  # type: ignore
+    else:
+        raise UnknownCompression(compression=compression)
+
+
+def load_pyarrow() -> ModuleType:
+    """Import the optional `pyarrow` package, which is required for Arrow and Parquet outputs.
+
+    Raises:
+        ModuleNotFoundError: The `pyarrow` package is not installed.
+
+    Returns:
+        ModuleType: The `pyarrow` module.
+    """
+    try:
+        import pyarrow
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError(
+            "Install the 'pyarrow' package to export Arrow tables or Parquet files."
+        ) from e
+    return pyarrow
+
+
+def yield_batches(rows: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable of rows into lists of at most `size` rows.
+
+    Examples:
+        >>> list(yield_batches(range(5), size=2))
+        [[0, 1], [2, 3], [4]]
+
+    Args:
+        rows (Iterable): Stream of rows.
+        size (int): Maximum number of rows per batch.
+
+    Yields:
+        Iterator[List]: Batch of rows.
+    """
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def report_throughput(action: str, table: str, n_rows: int, start: float) -> None:
+    """Log how many rows a bulk operation treated and at what rate.
+
+    Args:
+        action (str): Name of the bulk operation, i.e. "Upserted".
+        table (str): Name of the table.
+        n_rows (int): Number of rows treated.
+        start (float): Value of `time.perf_counter()` when the operation started.
+    """
+    elapsed = time.perf_counter() - start
+    rate = n_rows / elapsed if elapsed > 0 else float(n_rows)
+    logging.info(
+        f"{action} {n_rows} rows in table '{table}' in {elapsed:.2f}s ({rate:.0f} rows/sec)"
+    )
 
 
 class BaseTable:
     """Base class for SQLite tables."""
 
     def __init__(
-        self, name: str, pk: List[str], conn: Connection, dtypes: Dict, outfile: Path
+        self,
+        name: str,
+        pk: List[str],
+        conn: Connection,
+        dtypes: Dict,
+        outfile: Path,
+        drop: bool = True,
+        durable_staging: bool = False,
     ) -> None:
         """Create the SQL table with the given columns and data types.
 
+        If the table already exists and is not dropped, it is kept with its rows and any given column it lacks is added to it.
+
+        By default, the staging tables are temporary and lost with the connection. If they are durable, they are stored in the database's main schema, so that rows staged before a crash can still be merged by a resumed run.
+
         Args:
             name (str): Table name.
             pk (List[str]): List of primary keys.
             conn (Connection): SQLite connection.
             dtypes (Dict): Key-value pairs of column names and data types.
             outfile (Path): Path to CSV file where the table will be exported.
+            drop (bool, optional): Whether to drop an existing table with the same name. Defaults to True.
+            durable_staging (bool, optional): Whether to store the staging tables in the database's main schema, rather than in its temporary schema. Defaults to False.
         """
         self.conn = conn
         self.name = name
@@ -32,16 +158,51 @@ class BaseTable:
         self.pk_str = ",".join(pk)
         self.dtype_dict = dtypes
         self.outfile = outfile
+        self.staging_schema = "main" if durable_staging else "temp"
+        self._staging_queries: Dict[Tuple[Tuple[str, ...], str | None], str] = {}
+        # Staging tables created, and whose columns were checked, by this instance
+        self._created_staging: Set[str] = set()
 
         # Create the table
-        self.execute(query=f"DROP TABLE IF EXISTS {self.name}")
+        if drop:
+            self.execute(query=f"DROP TABLE IF EXISTS {self.name}")
         self.execute(query=self.create_query)
+        if not drop:
+            self.dtype_dict = self._add_missing_columns()
+
+    def _add_missing_columns(self) -> Dict:
+        """Add to the existing table the declared columns it lacks.
+
+        Returns:
+            Dict: Key-value pairs of all the table's column names and data types, in the table's order.
+        """
+        cursor = self.conn.cursor()
+        existing = {
+            t[1]: t[2]
+            for t in cursor.execute(
+                "SELECT * FROM pragma_table_info('{}');".format(self.name)
+            ).fetchall()
+        }
+        for col, dtype in self.dtype_dict.items():
+            if col not in existing:
+                self.execute(query=f"ALTER TABLE {self.name} ADD COLUMN {col} {dtype}")
+                existing[col] = dtype
+        return {col: self.dtype_dict.get(col, dtype) for col, dtype in existing.items()}
 
-    def export(self, outfile: Path | None = None):
+    def export(
+        self,
+        outfile: Path | None = None,
+        compression: str | None = None,
+        batch_size: int = BATCH_SIZE,
+    ):
         """Write the SQL table to a CSV file.
 
+        The rows are streamed from the cursor in batches of `batch_size`, so that memory stays constant whatever the size of the table.
+
         Args:
             outfile (Path | None, optional): Path to out-file. Defaults to None.
+            compression (str | None, optional): Either "gzip", "zstd", or None for no compression. Defaults to None.
+            batch_size (int, optional): Number of rows per call to `fetchmany`. Defaults to BATCH_SIZE.
         """
         if not outfile:
             outfile = self.outfile
@@ -52,45 +213,407 @@ class BaseTable:
                 "SELECT * FROM pragma_table_info('{}');".format(self.name)
             ).fetchall()
         ]
-        rows = cursor.execute(f"SELECT * FROM {self.name}").fetchall()
-        with open(outfile, "w") as f:
+        cursor.execute(f"SELECT * FROM {self.name}")
+        with open_outfile(outfile, compression=compression) as f:
             writer = csv.writer(f)
             writer.writerow(headers)
-            for row in rows:
-                writer.writerow(row)
+            while rows := cursor.fetchmany(batch_size):
+                writer.writerows(rows)
+
+    def export_parquet(
+        self,
+        outfile: Path | None = None,
+        compression: str | None = None,
+        batch_size: int = BATCH_SIZE,
+    ):
+        """Write the SQL table to a Parquet file, with the column types declared for the table.
+
+        The record batches are written as they are read from the cursor, so that memory stays constant whatever the size of the table. Requires the optional `pyarrow` package.
+
+        Args:
+            outfile (Path | None, optional): Path to out-file. Defaults to the table's out-file, with the extension ".parquet".
+            compression (str | None, optional): Parquet compression codec, i.e. "gzip" or "zstd". Defaults to None, which uses pyarrow's default codec.
+            batch_size (int, optional): Number of rows per record batch. Defaults to BATCH_SIZE.
+        """
+        load_pyarrow()
+        import pyarrow.parquet as pq
+
+        if not outfile:
+            outfile = self.outfile.with_suffix(".parquet")
+        options = {"compression": compression} if compression else {}
+        with pq.ParquetWriter(outfile, schema=self.arrow_schema, **options) as writer:
+            for batch in self.yield_record_batches(batch_size=batch_size):
+                writer.write_batch(batch)
+
+    def to_arrow(self, batch_size: int = BATCH_SIZE) -> "pa.Table":
+        """Read the SQL table into an in-memory Arrow table, with the column types declared for the table.
+
+        Requires the optional `pyarrow` package.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> columns_n_datatypes = {"url": "TEXT", "facebook_share": "INTEGER"}
+            >>> table = BaseTable(name="test", pk=["url"], conn=connect_to_database(), dtypes=columns_n_datatypes, outfile=Path("test.csv"))
+            >>> _ = table.bulk_upsert(cols=["url", "facebook_share"], rows=[("https://github.com/medialab/minall", "12")])
+            >>> table.to_arrow().to_pylist()
+            [{'url': 'https://github.com/medialab/minall', 'facebook_share': 12}]
+
+        Args:
+            batch_size (int, optional): Number of rows per record batch. Defaults to BATCH_SIZE.
+
+        Returns:
+            pa.Table: Arrow table.
+        """
+        pa = load_pyarrow()
+        return pa.Table.from_batches(
+            self.yield_record_batches(batch_size=batch_size), schema=self.arrow_schema
+        )
 
-    def update_from_csv(self, datafile: Path):
+    def yield_record_batches(
+        self, batch_size: int = BATCH_SIZE
+    ) -> Iterator["pa.RecordBatch"]:
+        """Stream the SQL table from the cursor as Arrow record batches.
+
+        Values that are not integers in a column declared as INTEGER, which SQLite's type affinity could not convert, are read as null, with a warning of how many there are per column; real numbers are truncated.
+
+        Args:
+            batch_size (int, optional): Number of rows per record batch. Defaults to BATCH_SIZE.
+
+        Yields:
+            Iterator[pa.RecordBatch]: Record batch of at most `batch_size` rows.
+        """
+        pa = load_pyarrow()
+        schema = self.arrow_schema
+        selection = ", ".join(
+            f"CASE typeof({field.name}) WHEN 'integer' THEN {field.name} WHEN 'real' THEN CAST({field.name} AS INTEGER) END"
+            if pa.types.is_integer(field.type)
+            else field.name
+            for field in schema
+        )
+        integer_columns = [
+            field.name for field in schema if pa.types.is_integer(field.type)
+        ]
+        cursor = self.conn.cursor()
+        if integer_columns:
+            counts = cursor.execute(
+                "SELECT {} FROM {}".format(
+                    ", ".join(
+                        f"COALESCE(SUM(typeof({col}) NOT IN ('integer', 'real', 'null')), 0)"
+                        for col in integer_columns
+                    ),
+                    self.name,
+                )
+            ).fetchone()
+            for col, n in zip(integer_columns, counts):
+                if n:
+                    logging.warning(
+                        "%d values of the INTEGER column '%s' of table '%s' are not integers and are exported as null.",
+                        n,
+                        col,
+                        self.name,
+                    )
+        cursor.execute(f"SELECT {selection} FROM {self.name}")
+        while rows := cursor.fetchmany(batch_size):
+            columns = list(zip(*rows))
+            yield pa.RecordBatch.from_arrays(
+                [
+                    pa.array(values, type=field.type)
+                    for values, field in zip(columns, schema)
+                ],
+                schema=schema,
+            )
+
+    @property
+    def arrow_schema(self) -> "pa.Schema":
+        """Arrow schema of the SQL table, mapping INTEGER columns to 64-bit integers and all other columns to strings.
+
+        Returns:
+            pa.Schema: Arrow schema.
+        """
+        pa = load_pyarrow()
+        return pa.schema(
+            [
+                (col, pa.int64() if dtype.startswith("INTEGER") else pa.string())
+                for col, dtype in self.dtype_dict.items()
+            ]
+        )
+
+    def ingest(
+        self, cols: List[str], rows: Iterable[List], batch_size: int = BATCH_SIZE
+    ) -> int:
+        """Stream in-file rows into the table, ignoring rows whose primary key is already in the table.
+
+        The rows are inserted in batches of `batch_size`, inside a single transaction.
+
+        Args:
+            cols (List[str]): Columns of the rows.
+            rows (Iterable[List]): Rows of values, ordered like the columns.
+            batch_size (int, optional): Number of rows per call to `executemany`. Defaults to BATCH_SIZE.
+
+        Returns:
+            int: Number of rows read from the stream.
+        """
+        start = time.perf_counter()
+        query = "INSERT OR IGNORE INTO {table}({cols}) VALUES ({placeholder})".format(
+            table=self.name,
+            cols=", ".join(cols),
+            placeholder=", ".join(["?" for _ in cols]),
+        )
+        n_rows = self.executemany(query=query, rows=rows, batch_size=batch_size)
+        report_throughput("Ingested", self.name, n_rows, start)
+        return n_rows
+
+    def update_from_csv(self, datafile: Path, batch_size: int = BATCH_SIZE) -> int:
         """Reading from a CSV file, update the table rows.
 
+        The CSV rows are streamed in batches of `batch_size` into the table's staging table, which is then merged into the table with a single upsert statement. Empty strings are replaced with None so that the coalesce statement keeps the table's existing values.
+
         Args:
             datafile (Path): Path to file with new data.
+            batch_size (int, optional): Number of rows per call to `executemany`. Defaults to BATCH_SIZE.
+
+        Returns:
+            int: Number of rows read from the CSV file.
         """
+        start = time.perf_counter()
         with open(datafile) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                placeholder = ", ".join(["?" for _ in range(len(row.items()))])
-                cols_in_csv = ", ".join(row.keys())
-                # Replace empty strings in values set with None
-                values = []
-                for v in row.values():
-                    if v == "":
-                        values.append(None)
-                    else:
-                        values.append(v)
-                coalesce_stmt = self.coalesce_statement(row.keys())
-                query = """
-                INSERT INTO {table}({cols_in_csv})
-                VALUES ({placeholder})
-                ON CONFLICT ({pk})
-                DO UPDATE SET {coalesce_stmt}
-                """.format(
-                    table=self.name,
-                    cols_in_csv=cols_in_csv,
-                    placeholder=placeholder,
-                    pk=self.pk_str,
-                    coalesce_stmt=coalesce_stmt,
-                )
-                self.execute(query=query, values=tuple(values))
+            reader = csv.reader(f)
+            headers = next(reader, None)
+            if not headers:
+                return 0
+            width = len(headers)
+            # Replace empty strings in values set with None, padding short rows
+            rows = (
+                tuple(v if v != "" else None for v in row[:width])
+                + (None,) * (width - len(row))
+                for row in reader
+                if row
+            )
+            n_rows = self.bulk_upsert(cols=headers, rows=rows, batch_size=batch_size)
+        report_throughput("Upserted", self.name, n_rows, start)
+        return n_rows
+
+    def bulk_upsert(
+        self, cols: Iterable[str], rows: Iterable[Tuple], batch_size: int = BATCH_SIZE
+    ) -> int:
+        """Stage rows and immediately merge them into the table.
+
+        Args:
+            cols (Iterable[str]): Columns of the rows.
+            rows (Iterable[Tuple]): Rows of values, ordered like the columns.
+            batch_size (int, optional): Number of rows per call to `executemany`. Defaults to BATCH_SIZE.
+
+        Returns:
+            int: Number of staged rows.
+        """
+        n_rows = self.stage(cols=cols, rows=rows, batch_size=batch_size)
+        self.merge_staged()
+        return n_rows
+
+    def stage(
+        self,
+        cols: Iterable[str],
+        rows: Iterable[Tuple],
+        batch_size: int = BATCH_SIZE,
+        source: str | None = None,
+    ) -> int:
+        """Bulk-load rows into the table's staging table, without touching the table itself.
+
+        Rows can be staged over several calls, with different sets of columns, before being merged together with `merge_staged()`. If a source is given, the rows are loaded into a staging table of their own, so that the rows of several sources can be merged in order of precedence with `merge_sources()`.
+
+        Args:
+            cols (Iterable[str]): Columns of the rows.
+            rows (Iterable[Tuple]): Rows of values, ordered like the columns.
+            batch_size (int, optional): Number of rows per call to `executemany`. Defaults to BATCH_SIZE.
+            source (str | None, optional): Name of the source of the rows, i.e. "buzzsumo". Defaults to None.
+
+        Returns:
+            int: Number of staged rows.
+        """
+        self.create_staging(source=source)
+        return self.executemany(
+            query=self.staging_query(cols=cols, source=source),
+            rows=rows,
+            batch_size=batch_size,
+        )
+
+    def merge_staged(self, source: str | None = None) -> None:
+        """Coalesce all the staged rows into the table with one set-based upsert, then empty the staging table.
+
+        Args:
+            source (str | None, optional): Name of the source whose staged rows are merged. Defaults to None.
+        """
+        self.create_staging(source=source)
+        cursor = self.conn.cursor()
+        # The connection's context commits the transaction, or rolls it back on error
+        with self.conn:
+            cursor.execute(self.merge_query(source=source))
+            cursor.execute(f"DELETE FROM {self.staging_name(source=source)}")
+
+    def merge_sources(self, groups: Iterable[Tuple[List[str], List[str]]]) -> None:
+        """In a single transaction, coalesce the rows staged by several sources into the table, in order of precedence, then empty their staging tables.
+
+        Each group pairs a list of sources, from lowest to highest precedence, with the columns to which that precedence applies. For each group, the sources' rows are merged one after the other, so that a source's non-empty values replace those of the sources merged before it.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> table = BaseTable(name="test", pk=["url"], conn=connect_to_database(), dtypes={"url": "TEXT", "title": "TEXT", "domain": "TEXT"}, outfile=Path("test.csv"))
+            >>> _ = table.stage(cols=["url", "title", "domain"], rows=[("a", "Scraped", "a.com")], source="scraper")
+            >>> _ = table.stage(cols=["url", "title", "domain"], rows=[("a", "Buzzsumo", "b.com")], source="buzzsumo")
+            >>> table.merge_sources(groups=[(["buzzsumo", "scraper"], ["domain"]), (["scraper", "buzzsumo"], ["title"])])
+            >>> table.select_from("*")
+            [('a', 'Buzzsumo', 'a.com')]
+
+        Args:
+            groups (Iterable[Tuple[List[str], List[str]]]): Pairs of sources, from lowest to highest precedence, and columns.
+        """
+        groups = list(groups)
+        sources = {source for order, _ in groups for source in order}
+        for source in sources:
+            self.create_staging(source=source)
+        cursor = self.conn.cursor()
+        # The connection's context commits the transaction, or rolls it back on error
+        with self.conn:
+            for order, cols in groups:
+                for source in order:
+                    cursor.execute(self.merge_query(source=source, cols=cols))
+            for source in sources:
+                cursor.execute(f"DELETE FROM {self.staging_name(source=source)}")
+
+    def staging_name(self, source: str | None = None) -> str:
+        """Name of the table in which new rows are loaded before being merged.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> table = BaseTable(name="test", pk=["url"], conn=connect_to_database(), dtypes={"url": "TEXT"}, outfile=Path("test.csv"))
+            >>> table.staging_name(source="buzzsumo")
+            'temp.staging_test_buzzsumo'
+
+        Args:
+            source (str | None, optional): Name of the source whose rows are staged. Defaults to None.
+
+        Returns:
+            str: Qualified name of the staging table.
+        """
+        if source:
+            return f"{self.staging_schema}.staging_{self.name}_{source}"
+        return f"{self.staging_schema}.staging_{self.name}"
+
+    def create_staging(self, source: str | None = None) -> None:
+        """Create the staging table, if it does not exist.
+
+        A durable staging table left by an interrupted run was created with the columns the table had then. So that a resumed run can stage the columns its in-file added to the table, the staging table's missing columns are added to it. The check is made once per staging table and instance.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> conn = connect_to_database()
+            >>> table = BaseTable(name="test", pk=["url"], conn=conn, dtypes={"url": "TEXT"}, outfile=Path("test.csv"), durable_staging=True)
+            >>> table.create_staging(source="buzzsumo")
+            >>> table = BaseTable(name="test", pk=["url"], conn=conn, dtypes={"url": "TEXT", "domain": "TEXT"}, outfile=Path("test.csv"), drop=False, durable_staging=True)
+            >>> table.create_staging(source="buzzsumo")
+            >>> [row[1] for row in conn.execute("PRAGMA main.table_info(staging_test_buzzsumo)")]
+            ['url', 'domain']
+
+        Args:
+            source (str | None, optional): Name of the source whose rows are staged. Defaults to None.
+        """
+        staging = self.staging_name(source=source)
+        if staging in self._created_staging:
+            return
+        self.execute(query=self.create_staging_query(source=source))
+        if self.staging_schema == "main":
+            schema, name = staging.split(".", 1)
+            cursor = self.conn.cursor()
+            existing = {
+                t[1]
+                for t in cursor.execute(
+                    f"PRAGMA {schema}.table_info('{name}')"
+                ).fetchall()
+            }
+            for col in self.dtype_dict:
+                if col not in existing:
+                    self.execute(query=f"ALTER TABLE {staging} ADD COLUMN {col}")
+        self._created_staging.add(staging)
+
+    def create_staging_query(self, source: str | None = None) -> str:
+        """SQL statement to create the staging table.
+
+        The staging table has the same columns as the table but no declared types, so that values keep their original storage class until they are merged, and no constraints, so that the same primary key can be staged several times.
+
+        Args:
+            source (str | None, optional): Name of the source whose rows are staged. Defaults to None.
+
+        Returns:
+            str: SQL statement.
+        """
+        return "CREATE TABLE IF NOT EXISTS {staging}({cols})".format(
+            staging=self.staging_name(source=source),
+            cols=", ".join(self.dtype_dict.keys()),
+        )
+
+    def staging_query(self, cols: Iterable[str], source: str | None = None) -> str:
+        """Compose, or recover from cache, the SQL statement to insert rows with the given columns into the staging table.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> columns_n_datatypes = {"url": "TEXT", "domain": "TEXT"}
+            >>> table = BaseTable(name="test", pk=["url"], conn=connect_to_database(), dtypes=columns_n_datatypes, outfile=Path("test.csv"))
+            >>> table.staging_query(cols=["url", "domain"])
+            'INSERT INTO temp.staging_test(url, domain) VALUES (?, ?)'
+
+        Args:
+            cols (Iterable[str]): Row columns.
+            source (str | None, optional): Name of the source whose rows are staged. Defaults to None.
+
+        Returns:
+            str: SQL statement.
+        """
+        key = (tuple(cols), source)
+        if key not in self._staging_queries:
+            self._staging_queries[
+                key
+            ] = "INSERT INTO {staging}({cols}) VALUES ({placeholder})".format(
+                staging=self.staging_name(source=source),
+                cols=", ".join(key[0]),
+                placeholder=", ".join(["?" for _ in key[0]]),
+            )
+        return self._staging_queries[key]
+
+    def merge_query(
+        self, source: str | None = None, cols: Iterable[str] | None = None
+    ) -> str:
+        """SQL statement to coalesce the staging table's rows into the table.
+
+        The staged rows are read in the order they were loaded, so that when a primary key was staged several times, each row is coalesced over the previous one, like consecutive upserts would be. The `WHERE true` clause lifts the parsing ambiguity between the SELECT statement's join constraint and the upsert's ON CONFLICT clause.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> columns_n_datatypes = {"url": "TEXT", "domain": "TEXT"}
+            >>> table = BaseTable(name="test", pk=["url"], conn=connect_to_database(), dtypes=columns_n_datatypes, outfile=Path("test.csv"))
+            >>> print(table.merge_query())
+            INSERT INTO test(url, domain) SELECT url, domain FROM temp.staging_test WHERE true ORDER BY rowid ON CONFLICT (url) DO UPDATE SET domain=COALESCE(excluded.domain, domain)
+
+        Args:
+            source (str | None, optional): Name of the source whose staged rows are merged. Defaults to None.
+            cols (Iterable[str] | None, optional): Columns to merge, besides the primary key. If None, all the table's columns. Defaults to None.
+
+        Returns:
+            str: SQL statement.
+        """
+        if cols is None:
+            cols = self.dtype_dict.keys()
+        cols = self.pk_list + [c for c in cols if c not in self.pk_list]
+        coalesce_stmt = self.coalesce_statement(cols)
+        return (
+            "INSERT INTO {table}({cols}) SELECT {cols} FROM {staging} WHERE true ORDER BY rowid "
+            "ON CONFLICT ({pk}) DO {update}".format(
+                table=self.name,
+                cols=", ".join(cols),
+                staging=self.staging_name(source=source),
+                pk=self.pk_str,
+                update=f"UPDATE SET {coalesce_stmt}" if coalesce_stmt else "NOTHING",
+            )
+        )
 
     def coalesce_statement(self, cols: Iterable[str]) -> str:
         """Compose SQL coalesce statement from columns to be updated.
@@ -164,6 +687,35 @@ class BaseTable:
             print("\n\n", query, "\n\n")
             raise e
 
+    def executemany(
+        self, query: str, rows: Iterable[Tuple], batch_size: int = BATCH_SIZE
+    ) -> int:
+        """Stream rows to a parameterized query in batches, committing them in a single transaction.
+
+        Args:
+            query (str): SQL statement with placeholders (?).
+            rows (Iterable[Tuple]): Values to be inserted in the query's placeholders.
+            batch_size (int, optional): Number of rows per call to `executemany`. Defaults to BATCH_SIZE.
+
+        Raises:
+            e: SQLite Exception.
+
+        Returns:
+            int: Number of rows sent to the query.
+        """
+        n_rows = 0
+        cursor = self.conn.cursor()
+        try:
+            # The connection's context commits the transaction, or rolls it back on error
+            with self.conn:
+                for batch in yield_batches(rows, batch_size):
+                    cursor.executemany(query, batch)
+                    n_rows += len(batch)
+        except Exception as e:
+            print("\n\n", query, "\n\n")
+            raise e
+        return n_rows
+
     def select_from(self, cols: str, filter: str | None = None) -> List:
         """Function to select rows from the SQL table.
 
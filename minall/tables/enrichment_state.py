@@ -0,0 +1,304 @@
+# minall/tables/enrichment_state.py
+
+import re
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlite3 import Connection
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from minall.tables.base import BaseTable
+
+# Units of the durations in a refresh policy, i.e. "7d"
+REFRESH_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+REFRESH_NEVER = "never"
+# Delay before a source is called again on a URL for which it returned no data,
+# doubled with each consecutive call that returns no data
+RETRY_AFTER = timedelta(days=1)
+# Maximum delay before a source is called again on a URL for which it returned no data
+MAX_RETRY_AFTER = timedelta(days=30)
+
+
+@dataclass
+class EnrichmentStateConstants:
+    """Dataclass to manage 'enrichment_state' table.
+
+    This dataclass manages the 'enrichment_state' table's required column names and their data types. The table records, for each target URL in the 'links' table and each source of the enrichment, when the source was last called on the URL, whether it returned data, and how many consecutive calls returned no data. The composite primary key starts with the source so that the URLs due for one source can be selected with the primary key's index.
+
+    Attributes:
+        table_name (str): Name of the table. Default = "enrichment_state".
+        primary_key (str): Text string of composite primary key. Default = "source,url".
+        pk_list (list): List of composite primary key columns. Default = ["source", "url"].
+        dtypes (dict): Key-value pairs of column names and SQLite data type descriptions.
+        col_names (list): List of column names.
+    """
+
+    table_name = "enrichment_state"
+    primary_key = "source,url"
+    pk_list = ["source", "url"]
+    dtypes = {
+        "source": "TEXT",
+        "url": "TEXT",
+        "fetched_at": "TEXT",
+        "succeeded": "INTEGER",
+        "failures": "INTEGER",
+    }
+    col_names = dtypes.keys()
+
+
+def parse_max_age(age: str) -> timedelta | None:
+    """Parse the maximum age of collected data.
+
+    Examples:
+        >>> parse_max_age("12h")
+        datetime.timedelta(seconds=43200)
+        >>> parse_max_age("never") is None
+        True
+
+    Args:
+        age (str): A number followed by a unit (m, h, d, w), or "never" if the data never expires.
+
+    Raises:
+        ValueError: The age is malformed.
+
+    Returns:
+        timedelta | None: Maximum age, None if the data never expires.
+    """
+    age = age.strip().lower()
+    if age == REFRESH_NEVER:
+        return None
+    match = re.fullmatch(r"(\d+)([{}])".format("".join(REFRESH_UNITS)), age)
+    if not match:
+        raise ValueError(f"Invalid age: '{age}'")
+    return timedelta(**{REFRESH_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def parse_refresh_policy(
+    policy: str, sources: Iterable[str] | None = None
+) -> Dict[str, timedelta | None]:
+    """Parse the maximum age, per source, of the data collected in previous runs.
+
+    Examples:
+        >>> parse_refresh_policy("buzzsumo=7d,scraper=never")
+        {'buzzsumo': datetime.timedelta(days=7), 'scraper': None}
+
+    Args:
+        policy (str): Comma-separated pairs of source and maximum age, i.e. "buzzsumo=7d". The age is a number followed by a unit (m, h, d, w), or "never" if the data is never refreshed.
+        sources (Iterable[str] | None, optional): Names of the sources the policy can declare. If None, any name. Defaults to None.
+
+    Raises:
+        ValueError: The policy is malformed or declares an unknown source.
+
+    Returns:
+        Dict[str, timedelta | None]: Key-value pairs of source and maximum age, None if the data is never refreshed.
+    """
+    refresh = {}
+    for pair in policy.split(","):
+        source, _, age = pair.strip().partition("=")
+        if not source.strip():
+            raise ValueError(f"Invalid refresh policy: '{pair}'")
+        try:
+            refresh[source.strip()] = parse_max_age(age)
+        except ValueError:
+            raise ValueError(f"Invalid refresh policy: '{pair}'")
+    if sources is not None:
+        unknown = set(refresh) - set(sources)
+        if unknown:
+            raise ValueError(
+                "Unknown sources in refresh policy: {}. Sources: {}.".format(
+                    ", ".join(sorted(unknown)), ", ".join(sources)
+                )
+            )
+    return refresh
+
+
+class EnrichmentStateTable(BaseTable):
+    """Class for creating, updating, and reading SQL table that records which sources already enriched which target URLs."""
+
+    dtypes = EnrichmentStateConstants.dtypes
+    name = EnrichmentStateConstants.table_name
+    pk_list = EnrichmentStateConstants.pk_list
+
+    def __init__(
+        self,
+        conn: Connection,
+        outfile: Path,
+        drop: bool = True,
+        refresh: Dict[str, timedelta | None] | None = None,
+        durable_staging: bool = False,
+        retry_after: timedelta = RETRY_AFTER,
+    ):
+        """In database connection, create SQL table.
+
+        A URL for which a source returned no data, whether the URL is unknown to the source or the call failed, is not retried at every run: the source is only called on it again once a delay has passed, which doubles with each consecutive call that returns no data, up to MAX_RETRY_AFTER.
+
+        If the staging tables are durable, the reports staged by an interrupted run serve as each source's checkpoint: a resumed run does not call the source again on the URLs it already reported on.
+
+        Args:
+            conn (Connection): SQLite connection.
+            outfile (Path): Path to CSV file where the table will be exported.
+            drop (bool, optional): Whether to drop an existing 'enrichment_state' table. Defaults to True.
+            refresh (Dict[str, timedelta | None] | None, optional): Maximum age, per source, of the data collected in previous runs. Sources not in the policy never refresh their data. Defaults to None.
+            durable_staging (bool, optional): Whether to store the staging tables in the database's main schema, so that they survive a crash. Defaults to False.
+            retry_after (timedelta, optional): Delay before a source is called again on a URL after a first call that returned no data. Defaults to RETRY_AFTER.
+        """
+        self.refresh = refresh if refresh else {}
+        self.retry_after = retry_after
+        super().__init__(
+            name=self.name,
+            pk=self.pk_list,
+            dtypes=self.dtypes,
+            conn=conn,
+            outfile=outfile,
+            drop=drop,
+            durable_staging=durable_staging,
+        )
+
+    def mark(
+        self, source: str, outcomes: Iterable[Tuple[str, bool]], merge: bool = True
+    ) -> int:
+        """Record that the source was called on the target URLs and whether it returned data.
+
+        If the records are not merged, they are loaded into the source's staging table until they are merged with `merge_staged(source)`.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> state = EnrichmentStateTable(conn=connect_to_database(), outfile=Path("state.csv"))
+            >>> state.mark(source="buzzsumo", outcomes=[("https://github.com/medialab/minall", True)])
+            1
+            >>> state.select_from("source, url, succeeded")
+            [('buzzsumo', 'https://github.com/medialab/minall', 1)]
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+            outcomes (Iterable[Tuple[str, bool]]): Pairs of target URL and whether the source returned data for it.
+            merge (bool, optional): Whether to merge the records into the table. Defaults to True.
+
+        Returns:
+            int: Number of recorded URLs.
+        """
+        cols, rows = self.records(source=source, outcomes=outcomes)
+        if merge:
+            return self.bulk_upsert(cols=cols, rows=rows)
+        return self.stage(cols=cols, rows=rows, source=source)
+
+    def records(
+        self, source: str, outcomes: Iterable[Tuple[str, bool]]
+    ) -> Tuple[List[str], Iterator[Tuple]]:
+        """Columns and rows of the records of the source's reports, timestamped now.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+            outcomes (Iterable[Tuple[str, bool]]): Pairs of target URL and whether the source returned data for it.
+
+        Returns:
+            Tuple[List[str], Iterator[Tuple]]: Columns and rows of values, ordered like the columns.
+        """
+        fetched_at = datetime.utcnow().isoformat(timespec="seconds")
+        cols = self.pk_list + ["fetched_at", "succeeded", "failures"]
+        rows = (
+            (source, url, fetched_at, int(succeeded), int(not succeeded))
+            for url, succeeded in outcomes
+        )
+        return cols, rows
+
+    def merge_query(
+        self, source: str | None = None, cols: Iterable[str] | None = None
+    ) -> str:
+        """SQL statement to merge the staged reports into the table, counting the consecutive calls that returned no data.
+
+        Unlike the other tables' rows, whose empty values keep the existing ones, a report replaces the previous one, and the count of failures is reset by a success.
+
+        Examples:
+            >>> from minall.utils.database import connect_to_database
+            >>> state = EnrichmentStateTable(conn=connect_to_database(), outfile=Path("state.csv"))
+            >>> for succeeded in (False, False, True, False):
+            ...     _ = state.mark(source="buzzsumo", outcomes=[("https://github.com/medialab/minall", succeeded)])
+            ...     state.select_from("succeeded, failures")
+            [(0, 1)]
+            [(0, 2)]
+            [(1, 0)]
+            [(0, 1)]
+
+        Args:
+            source (str | None, optional): Name of the source whose staged reports are merged. Defaults to None.
+            cols (Iterable[str] | None, optional): Ignored, as reports are merged whole. Defaults to None.
+
+        Returns:
+            str: SQL statement.
+        """
+        cols = ", ".join(self.dtype_dict.keys())
+        return (
+            "INSERT INTO {table}({cols}) SELECT {cols} FROM {staging} WHERE true ORDER BY rowid "
+            "ON CONFLICT ({pk}) DO UPDATE SET fetched_at=excluded.fetched_at, succeeded=excluded.succeeded, "
+            "failures=CASE WHEN excluded.succeeded THEN 0 ELSE COALESCE(failures, 0) + 1 END".format(
+                table=self.name,
+                cols=cols,
+                staging=self.staging_name(source=source),
+                pk=self.pk_str,
+            )
+        )
+
+    def due_query(self, source: str, links_table: str) -> Tuple[str, Tuple]:
+        """SQL statement, and its values, to select the target URLs on which the source is due to be called.
+
+        A URL is due if the source was never called on it, if the source's last calls returned no data and their delay before a retry has passed, or if the data is older than the source's maximum age. If the staging tables are durable, a URL on which the source already reported in an interrupted run, and whose report is still staged, is not due. The statement is only composed, and the database is only read, so that the statement can also be explained without side effects.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+            links_table (str): Name of the SQL table of target URLs.
+
+        Returns:
+            Tuple[str, Tuple]: SQL statement and values of its placeholders.
+        """
+        query = f"""
+        SELECT l.url FROM {links_table} AS l
+        LEFT JOIN {self.name} AS s ON s.source = ? AND s.url = l.url
+        WHERE (s.url IS NULL
+        OR (NOT s.succeeded AND julianday(s.fetched_at) < julianday('now') - MIN(?, ? * (1 << (MIN(COALESCE(s.failures, 1), 31) - 1))))"""
+        day = timedelta(days=1)
+        params: Tuple = (source, MAX_RETRY_AFTER / day, self.retry_after / day)
+        max_age = self.refresh.get(source)
+        if max_age is not None:
+            query += " OR s.fetched_at < ?"
+            cutoff = datetime.utcnow() - max_age
+            params += (cutoff.isoformat(timespec="seconds"),)
+        query += ")"
+        if self.staging_schema == "main" and self._has_staging(source=source):
+            # Resume after the last checkpoint of an interrupted run
+            query += f" AND l.url NOT IN (SELECT url FROM {self.staging_name(source=source)})"
+        return query, params
+
+    def _has_staging(self, source: str) -> bool:
+        """Whether the source's staging table exists in the database's main schema.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+
+        Returns:
+            bool: True if the table exists.
+        """
+        _, name = self.staging_name(source=source).split(".")
+        row = self.conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+            (name,),
+        ).fetchone()
+        return row is not None
+
+    def select_due(self, source: str, links_table: str) -> Set[str]:
+        """Select the target URLs on which the source is due to be called.
+
+        The selection holds the connection's lock, if it has one, so that it does not read the database while another thread writes to it.
+
+        Args:
+            source (str): Name of the enrichment source, i.e. "buzzsumo".
+            links_table (str): Name of the SQL table of target URLs.
+
+        Returns:
+            Set[str]: Set of URL strings.
+        """
+        with getattr(self.conn, "lock", None) or nullcontext():
+            query, params = self.due_query(source=source, links_table=links_table)
+            cursor = self.conn.cursor()
+            return {row[0] for row in cursor.execute(query, params)}
@@ -7,6 +7,7 @@ This module contains exceptions to manage the process of validating a CSV file g
 - `NoCSVHeaders` - The CSV does not have headers.
 - `NoURLColumn` - When building the 'links' table, the declared URL column is not in the CSV file.
 - `NoPrimaryKeyColumns` - When building the 'shared_content' table, either the 'post_url' column or the 'content_url' column are missing from the CSV file.
+- `UnknownCompression` - When exporting a table, the requested compression is not supported.
 
 When creating the 'links' table, the input CSV file must have a column for URLs; the URLs must be cleaned and/or ready to serve as the source for the data collection. The name of the URL column can vary and must be declared.
 
@@ -36,3 +37,11 @@ class NoPrimaryKeyColumns(Exception):
     def __init__(self, col: str) -> None:
         message = f"Required primary key column '{col}' is not a header in the given CSV file."
         super().__init__(message)
+
+
+class UnknownCompression(Exception):
+    """The requested compression for the out-file is not supported."""
+
+    def __init__(self, compression: str) -> None:
+        message = f"The compression '{compression}' is not supported. Choose 'gzip' or 'zstd'."
+        super().__init__(message)
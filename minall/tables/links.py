@@ -1,10 +1,9 @@
 # minall/tables/links.py
 
-import csv
 from dataclasses import dataclass
 from pathlib import Path
 from sqlite3 import Connection
-from typing import Dict
+from typing import Dict, Generator, Iterable, List
 
 import casanova
 
@@ -81,65 +80,90 @@ class LinksTable(BaseTable):
     pk_list = LinksConstants.pk_list
 
     def __init__(
-        self, conn: Connection, infile: Path, outfile: Path, url_col: str | None = None
+        self,
+        conn: Connection,
+        infile: Path,
+        outfile: Path,
+        url_col: str | None = None,
+        drop: bool = True,
+        durable_staging: bool = False,
     ):
         """In database connection, create SQL table and populate with data from target URLs dataset file.
 
+        If the existing table is not dropped, the dataset's rows whose URL is not yet in the table are added to it.
+
         Args:
             conn (Connection): SQLite connection.
             infile (Path): Path to URLs dataset file.
             url_col (str | None, optional): Column name of target URLs. Defaults to None.
+            drop (bool, optional): Whether to drop an existing 'links' table. Defaults to True.
+            durable_staging (bool, optional): Whether to store the staging tables in the database's main schema, so that they survive a crash. Defaults to False.
 
         Raises:
             NoCSVHeaders: Dataset file does not have headers.
             KeyError: User did not define URL column and dataset file does not have default column 'url'.
             NoURLColumn: User-defined URL column not found in dataset file.
         """
-        # Update the table's columns to include all in-file columns
-        self.dtypes = self._parse_infile_columns(
-            infile=infile, url_col=url_col, constant_cols=self.dtypes
-        )
-        # Inherit the parent base class
-        super().__init__(
-            name=self.name,
-            pk=self.pk_list,
-            dtypes=self.dtypes,
-            conn=conn,
-            outfile=outfile,
-        )
-
-        # Insert in-file data
-        with open(infile) as f:
-            reader = csv.DictReader(f)
-
-            # Confirm the in-file is compatible with the table
+        # Read the in-file once, validating its headers before streaming its rows
+        with casanova.reader(infile) as reader:
             headers = reader.fieldnames
-            if not headers:
-                raise NoCSVHeaders()
-            elif len(set(headers).difference(self.dtype_dict.keys())) > 0:
-                raise KeyError()
+
+            # Update the table's columns to include all in-file columns
+            self.dtypes = self._parse_infile_columns(
+                headers=headers, url_col=url_col, constant_cols=self.dtypes
+            )
+            # Inherit the parent base class
+            super().__init__(
+                name=self.name,
+                pk=self.pk_list,
+                dtypes=self.dtypes,
+                conn=conn,
+                outfile=outfile,
+                drop=drop,
+                durable_staging=durable_staging,
+            )
 
             # Insert the in-file data
-            for row in reader:
-                if url_col:
-                    row.update({"url": row[url_col]})
-                placeholder = ", ".join(["?" for _ in range(len(row.items()))])
-                cols, values = ", ".join(row.keys()), tuple(list(row.values()))
-                query = """
-                INSERT OR IGNORE INTO {table}({cols})
-                VALUES ({placeholder})
-                """.format(
-                    table=self.name, cols=cols, placeholder=placeholder
-                )
-                self.execute(query=query, values=values)
+            cols = list(headers)  # type: ignore
+            if url_col and "url" not in cols:
+                cols.append("url")
+            self.ingest(
+                cols=cols, rows=self._yield_rows(reader, cols=cols, url_col=url_col)
+            )
+
+    @staticmethod
+    def _yield_rows(
+        reader: Iterable[List[str]], cols: List[str], url_col: str | None
+    ) -> Generator[List[str | None], None, None]:
+        """Fit the in-file's rows to the table columns, copying the declared URL column into the primary key column.
+
+        Args:
+            reader (Iterable[List[str]]): In-file rows, excluding headers.
+            cols (List[str]): In-file headers, plus the primary key column if it was not among them.
+            url_col (str | None): Column name of target URLs.
+
+        Yields:
+            Generator[List[str | None], None, None]: Row of values, ordered like the columns.
+        """
+        width = len(cols)
+        url_pos = cols.index(url_col) if url_col else None
+        pk_pos = cols.index("url")
+        for row in reader:
+            # Skip blank lines and pad short rows, like csv.DictReader
+            if not row:
+                continue
+            row = row[:width] + [None] * (width - len(row))
+            if url_pos is not None:
+                row[pk_pos] = row[url_pos]
+            yield row
 
     def _parse_infile_columns(
-        self, infile: Path, constant_cols: Dict, url_col: str | None
+        self, headers: List[str] | None, constant_cols: Dict, url_col: str | None
     ) -> Dict:
         """During init method, modify table columns to include in-file's columns.
 
         Args:
-            infile (Path): Path to URLs dataset.
+            headers (List[str] | None): In-file's headers.
             constant_cols (Dict): Key-value pairs of table's standard columns and data types.
             url_col (str | None, optional): Column name of target URLs.
 
@@ -151,8 +175,6 @@ class LinksTable(BaseTable):
         Returns:
             Dict: Key-value pairs of table's column names and data types.
         """
-        with casanova.reader(infile) as reader:
-            headers = reader.headers
         if not headers:
             raise NoCSVHeaders()
         elif not url_col and not "url" in headers:
@@ -1,11 +1,10 @@
 # minall/tables/shared_content.py
 
 
-import csv
 from dataclasses import dataclass
 from pathlib import Path
 from sqlite3 import Connection
-from typing import Dict
+from typing import Dict, List
 
 import casanova
 
@@ -50,73 +49,84 @@ class SharedContentTable(BaseTable):
     name = ShareContentConstants.table_name
     pk_list = ShareContentConstants.pk_list
 
-    def __init__(self, conn: Connection, infile: Path | None, outfile: Path):
+    def __init__(
+        self,
+        conn: Connection,
+        infile: Path | None,
+        outfile: Path,
+        drop: bool = True,
+        durable_staging: bool = False,
+    ):
         """In database connection, create SQL table. If the user provides an existing shared_content.csv file, populate the table with that input.
 
         Args:
             conn (Connection): SQLite connection.
             infile (Path): Path to shared content dataset file.
+            drop (bool, optional): Whether to drop an existing 'shared_content' table. Defaults to True.
+            durable_staging (bool, optional): Whether to store the staging tables in the database's main schema, so that they survive a crash. Defaults to False.
 
         Raises:
             NoCSVHeaders: Dataset file does not have headers.
             NoPrimaryKeyColumns: One or more of the required columns ('post_url', 'content_url') is not in the dataset file.
         """
-        # Update the table's columns to include all in-file columns
-        if infile:
+        if not infile:
+            # Inherit the parent base class
+            super().__init__(
+                name=self.name,
+                pk=self.pk_list,
+                dtypes=self.dtypes,
+                conn=conn,
+                outfile=outfile,
+                drop=drop,
+                durable_staging=durable_staging,
+            )
+            return
+
+        # Read the in-file once, validating its headers before streaming its rows
+        with casanova.reader(infile) as reader:
+            headers = reader.fieldnames
+
+            # Update the table's columns to include all in-file columns
             self.dtypes = self._parse_infile_columns(
-                infile=infile, constant_cols=self.dtypes
+                headers=headers, constant_cols=self.dtypes
+            )
+            # Inherit the parent base class
+            super().__init__(
+                name=self.name,
+                pk=self.pk_list,
+                dtypes=self.dtypes,
+                conn=conn,
+                outfile=outfile,
+                drop=drop,
+                durable_staging=durable_staging,
             )
-        # Inherit the parent base class
-        super().__init__(
-            name=self.name,
-            pk=self.pk_list,
-            dtypes=self.dtypes,
-            conn=conn,
-            outfile=outfile,
-        )
-
-        # Insert in-file data
-        if infile:
-            with open(infile) as f:
-                reader = csv.DictReader(f)
-
-                # Confirm the in-file is compatible with the table
-                headers = reader.fieldnames
-                if not headers:
-                    raise NoCSVHeaders()
-                elif len(set(headers).difference(self.dtype_dict.keys())) > 0:
-                    raise KeyError()
-
-                # Insert the in-file data
-                for row in reader:
-                    placeholder = ", ".join(["?" for _ in range(len(row.items()))])
-                    cols, values = ", ".join(row.keys()), tuple(list(row.values()))
-                    query = """
-                    INSERT OR IGNORE INTO {table}({cols})
-                    VALUES ({placeholder})
-                    """.format(
-                        table=self.name, cols=cols, placeholder=placeholder
-                    )
-                    self.execute(query=query, values=values)
-
-    def _parse_infile_columns(self, infile: Path, constant_cols: Dict) -> Dict:
+
+            # Insert the in-file data
+            cols = list(headers)  # type: ignore
+            width = len(cols)
+            self.ingest(
+                cols=cols,
+                rows=(
+                    row[:width] + [None] * (width - len(row)) for row in reader if row
+                ),
+            )
+
+    def _parse_infile_columns(
+        self, headers: List[str] | None, constant_cols: Dict
+    ) -> Dict:
         """During init method, modify table columns to include in-file's columns.
 
         Args:
-            infile (Path): Path to URLs dataset.
+            headers (List[str] | None): In-file's headers.
             constant_cols (Dict): Key-value pairs of table's standard columns and data types.
-            url_col (str | None, optional): Column name of target URLs.
 
         Raises:
             NoCSVHeaders: The infile does not have headers.
-            KeyError: The infile does not have a recognizable URL column.
-            NoURLColumn: The infile does not have the user-declared URL column.
+            NoPrimaryKeyColumns: The infile does not have one of the composite primary key's columns.
 
         Returns:
             Dict: Key-value pairs of table's column names and data types.
         """
-        with casanova.reader(infile) as reader:
-            headers = reader.headers
         if not headers:
             raise NoCSVHeaders()
         diff = set(self.pk_list).difference(headers)
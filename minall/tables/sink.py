@@ -0,0 +1,249 @@
+# minall/tables/sink.py
+
+"""Destinations for the normalized results of the enrichment.
+
+This module contains the following classes and function:
+
+- `ResultSink` - Abstract base class for destinations to which enrichers push their normalized results, row by row.
+- `TableSink(table, source, state, merge)` - Buffers the results and bulk-upserts them into an SQL table while the collection is running, optionally recording the enrichment's state. Alternatively, stages the results so that they are merged once the collection is over.
+- `CSVSink(outfile, fieldnames)` - Writes the results to a CSV file.
+- `open_sink(target, fieldnames)` - If given a path, opens a `CSVSink`; otherwise returns the given sink.
+
+Enrichers also report, with `mark(url, succeeded)`, whether the source returned data for each target URL, which sinks may record.
+
+Enrichers push either dictionaries, i.e. a CSV dict row, or casanova `TabularRecord` dataclasses, such as `NormalizedBuzzsumoResult`, into a sink. Both are serialized the same way as the CSV files of previous versions of minall.
+"""
+
+import csv
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from casanova import TabularRecord
+
+from minall.tables.base import BaseTable
+from minall.tables.enrichment_state import EnrichmentStateTable
+
+# Number of results buffered by a `TableSink` before they are upserted
+SINK_BATCH_SIZE = 1_000
+
+
+class ResultSink(ABC):
+    """Abstract base class for destinations of normalized enrichment results, which implement `writerow()`."""
+
+    @abstractmethod
+    def writerow(self, row: Dict | TabularRecord) -> None:
+        """Push one normalized result into the sink.
+
+        Args:
+            row (Dict | TabularRecord): CSV dict row or casanova dataclass.
+        """
+
+    def mark(self, url: str, succeeded: bool) -> None:
+        """Report whether the source returned data for a target URL. By default, the report is ignored.
+
+        Args:
+            url (str): Target URL.
+            succeeded (bool): Whether the source returned data for the URL.
+        """
+        pass
+
+    def flush(self) -> None:
+        """Write the results that are still buffered."""
+        pass
+
+    def close(self) -> None:
+        """Flush the sink and release its resources."""
+        self.flush()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def as_dict(row: Dict | TabularRecord) -> Dict:
+        """Serialize a normalized result as a CSV dict row.
+
+        Args:
+            row (Dict | TabularRecord): CSV dict row or casanova dataclass.
+
+        Returns:
+            Dict: CSV dict row.
+        """
+        if isinstance(row, TabularRecord):
+            return row.as_csv_dict_row()
+        return row
+
+
+class TableSink(ResultSink):
+    """Sink that upserts results into an SQL table, in batches, as they arrive.
+
+    Examples:
+        >>> from minall.utils.database import connect_to_database
+        >>> table = BaseTable(name="test", pk=["url"], conn=connect_to_database(), dtypes={"url": "TEXT", "domain": "TEXT"}, outfile=Path("test.csv"))
+        >>> with TableSink(table=table) as sink:
+        ...     sink.writerow({"url": "https://github.com/medialab/minall", "domain": "github.com"})
+        >>> table.select_from("*")
+        [('https://github.com/medialab/minall', 'github.com')]
+    """
+
+    def __init__(
+        self,
+        table: BaseTable,
+        batch_size: int = SINK_BATCH_SIZE,
+        source: str | None = None,
+        state: EnrichmentStateTable | None = None,
+        merge: bool = True,
+        dependents: List["TableSink"] | None = None,
+    ) -> None:
+        """Prepare the buffer of results for the SQL table.
+
+        If the results are not merged, they are loaded into the source's staging table, and the source's reports into the enrichment state's staging table, until they are merged with `BaseTable.merge_sources()` and `BaseTable.merge_staged()`. The sink holds the connection's lock, if it has one, while it writes, so that sinks in several threads can share the connection.
+
+        If the sink records the source's reports, each batch is a checkpoint: it is flushed when enough reports are buffered, and its results and reports are staged in a single transaction, after the results of the dependent sinks. Enrichers must therefore write a URL's results before reporting on it, so that a URL is never recorded as enriched without its results.
+
+        Args:
+            table (BaseTable): Target SQL table.
+            batch_size (int, optional): Number of buffered results that triggers an upsert. Defaults to SINK_BATCH_SIZE.
+            source (str | None, optional): Name of the enrichment source pushing the results, i.e. "buzzsumo". Defaults to None.
+            state (EnrichmentStateTable | None, optional): SQL table in which to record the source's reports, if any. Defaults to None.
+            merge (bool, optional): Whether to merge the results into the table as they are flushed. Defaults to True.
+            dependents (List[TableSink] | None, optional): Sinks of the source's other results, i.e. its shared content, flushed before each batch. Defaults to None.
+        """
+        self.table = table
+        self.batch_size = batch_size
+        self.cols = list(table.dtype_dict.keys())
+        self.buffer: List[Tuple] = []
+        self.source = source
+        self.state = state
+        self.merge = merge
+        self.lock = getattr(table.conn, "lock", None) or nullcontext()
+        self.outcomes: List[Tuple[str, bool]] = []
+        self.dependents = dependents if dependents else []
+
+    def writerow(self, row: Dict | TabularRecord) -> None:
+        """Buffer a result, replacing empty strings with None, and upsert the buffer when it is full, unless the sink waits for the source's reports.
+
+        Args:
+            row (Dict | TabularRecord): CSV dict row or casanova dataclass.
+
+        Raises:
+            ValueError: The result has fields that are not columns of the table.
+        """
+        row = self.as_dict(row)
+        unknown = row.keys() - self.table.dtype_dict.keys()
+        if unknown:
+            raise ValueError(
+                f"Result contains fields not in table '{self.table.name}': {', '.join(unknown)}"
+            )
+        self.buffer.append(
+            tuple(None if row.get(col) == "" else row.get(col) for col in self.cols)
+        )
+        if len(self.buffer) >= self.batch_size and not self.records_state:
+            self.flush()
+
+    def mark(self, url: str, succeeded: bool) -> None:
+        """If the sink records the enrichment's state, buffer the source's report on a target URL.
+
+        Args:
+            url (str): Target URL.
+            succeeded (bool): Whether the source returned data for the URL.
+        """
+        if self.records_state:
+            self.outcomes.append((url, succeeded))
+            if len(self.outcomes) >= self.batch_size:
+                self.flush()
+
+    @property
+    def records_state(self) -> bool:
+        """Whether the sink records the source's reports in the enrichment's state."""
+        return self.state is not None and bool(self.source)
+
+    def flush(self) -> None:
+        """Coalesce, or stage, the buffered results into the SQL table, then record the buffered reports."""
+        with self.lock:
+            for sink in self.dependents:
+                sink.flush()
+            if not self.merge:
+                self._stage()
+                return
+            if self.buffer:
+                self.table.bulk_upsert(cols=self.cols, rows=self.buffer)
+                self.buffer = []
+            if self.outcomes and self.state is not None and self.source:
+                self.state.mark(source=self.source, outcomes=self.outcomes)
+                self.outcomes = []
+
+    def _stage(self) -> None:
+        """In a single transaction, stage the buffered results and reports."""
+        if not self.buffer and not self.outcomes:
+            return
+        self.table.create_staging(source=self.source)
+        if self.outcomes and self.state is not None:
+            self.state.create_staging(source=self.source)
+        cursor = self.table.conn.cursor()
+        # The connection's context commits the transaction, or rolls it back on error
+        with self.table.conn:
+            if self.buffer:
+                cursor.executemany(
+                    self.table.staging_query(cols=self.cols, source=self.source),
+                    self.buffer,
+                )
+            if self.outcomes and self.state is not None and self.source:
+                cols, rows = self.state.records(
+                    source=self.source, outcomes=self.outcomes
+                )
+                cursor.executemany(
+                    self.state.staging_query(cols=cols, source=self.source), rows
+                )
+        self.buffer = []
+        self.outcomes = []
+
+
+class CSVSink(ResultSink):
+    """Sink that writes results to a CSV file."""
+
+    def __init__(self, outfile: Path, fieldnames: Iterable[str]) -> None:
+        """Open the CSV file and write its headers.
+
+        Args:
+            outfile (Path): Path to the CSV file.
+            fieldnames (Iterable[str]): Headers of the CSV file.
+        """
+        self.file_obj = open(outfile, mode="w", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file_obj, fieldnames=fieldnames)
+        self.writer.writeheader()
+
+    def writerow(self, row: Dict | TabularRecord) -> None:
+        """Write a result as a CSV row.
+
+        Args:
+            row (Dict | TabularRecord): CSV dict row or casanova dataclass.
+        """
+        self.writer.writerow(self.as_dict(row))
+
+    def flush(self) -> None:
+        """Flush the CSV file's buffer."""
+        self.file_obj.flush()
+
+    def close(self) -> None:
+        """Close the CSV file."""
+        self.file_obj.close()
+
+
+def open_sink(target: Path | ResultSink, fieldnames: Iterable[str]) -> ResultSink:
+    """Return the given sink or, if given a path, a sink that writes to that CSV file.
+
+    Args:
+        target (Path | ResultSink): Path to a CSV file or result sink.
+        fieldnames (Iterable[str]): Headers of the CSV file, if a path was given.
+
+    Returns:
+        ResultSink: Result sink.
+    """
+    if isinstance(target, ResultSink):
+        return target
+    return CSVSink(outfile=target, fieldnames=fieldnames)
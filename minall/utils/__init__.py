@@ -4,7 +4,13 @@
 
 Modules exported by this package:
 
+- `api_cache`: Class for caching API responses in an SQLite database.
+- `concurrency`: Function for submitting tasks to an executor with a bounded number of tasks in flight.
 - `database`: Class and function to connect to SQLite database.
+- `exceptions`: Exceptions raised by the persistent caches.
+- `http_cache`: Class for caching HTTP responses in an SQLite database.
 - `parse_config`: Class for managing minet API key credentials.
 - `progress_bar`: Context that generates rich progress bar.
+- `quota`: Class for recording the quota spent on APIs in an SQLite database.
+- `rate_limit`: Class for spacing out the requests of an API token, shared by the whole process.
 """
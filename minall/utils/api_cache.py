@@ -0,0 +1,169 @@
+# minall/utils/api_cache.py
+
+"""Persistent cache of API responses, stored in an SQLite database.
+
+The Buzzsumo, CrowdTangle, and YouTube APIs are quota-limited and slow, and projects often enrich overlapping sets of URLs. So that a URL, post, video, or channel already queried in a previous run is not queried again, the APIs' raw payloads are stored on disk, per source and key, with their fetch time. Because the payloads are stored raw, rather than normalized, they can be normalized again after a change to the normalizers. An API's empty response is cached too, as a null payload.
+
+In offline mode, the cache never calls the APIs: it returns every cached payload, however old, and reports the keys it misses, so that the enrichment does not record them as keys on which the API returned no data.
+
+The module contains the following class:
+
+- `APICache(database, ttl, offline)` - Look up and store the raw payloads of API responses, calling the API on the keys the cache misses.
+"""
+
+import json
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from minall.utils.database import connect_to_database
+from minall.utils.exceptions import CacheMiss
+
+# Default time-to-live of the cached payloads of a source
+DEFAULT_API_TTL = timedelta(days=7)
+
+# Names of the sources whose payloads are cached
+API_CACHE_SOURCES = ("buzzsumo", "crowdtangle", "youtube_video", "youtube_channel")
+
+
+class APICache:
+    """Class to look up and store the raw payloads of API responses.
+
+    The cache can be shared by several threads.
+
+    Examples:
+        >>> cache = APICache(database=None)
+        >>> cache.fetch("buzzsumo", "https://example.com", call=lambda: {"title": "Example"})
+        {'title': 'Example'}
+        >>> cache.fetch("buzzsumo", "https://example.com", call=lambda: None)
+        {'title': 'Example'}
+    """
+
+    table = "api_cache"
+
+    def __init__(
+        self,
+        database: str | None,
+        ttl: Dict[str, timedelta | None] | None = None,
+        offline: bool = False,
+    ) -> None:
+        """Connect to the cache's SQLite database and create its table.
+
+        Args:
+            database (str | None): Path to the cache's SQLite database. If None, the cache is kept in memory.
+            ttl (Dict[str, timedelta | None] | None, optional): Time-to-live, per source, of the cached payloads, None if they never expire. Sources not in the policy keep their payloads for DEFAULT_API_TTL. Defaults to None.
+            offline (bool, optional): Whether to only read the cache, without calling the APIs. Defaults to False.
+        """
+        self.ttl = ttl if ttl else {}
+        self.offline = offline
+        self.conn = connect_to_database(database=database)
+        self.lock = self.conn.lock
+        with self.lock, self.conn:
+            if database:
+                self.conn.execute("PRAGMA journal_mode = WAL")
+                self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.execute(
+                f"""
+            CREATE TABLE IF NOT EXISTS {self.table}(
+                source TEXT,
+                key TEXT,
+                payload TEXT,
+                fetched_at REAL,
+                PRIMARY KEY (source, key)
+            )"""
+            )
+
+    def lookup(self, source: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Look up the cached payloads of keys. Outside offline mode, payloads older than the source's time-to-live are ignored.
+
+        Args:
+            source (str): Name of the source, i.e. "buzzsumo".
+            keys (Iterable[str]): Keys of the payloads, i.e. target URLs or IDs.
+
+        Returns:
+            Dict[str, Any]: Key-value pairs of the found keys and their payloads, None if the API's response was empty.
+        """
+        max_age = self.ttl.get(source, DEFAULT_API_TTL)
+        cutoff = 0.0
+        if max_age is not None and not self.offline:
+            cutoff = time.time() - max_age.total_seconds()
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self.lock:
+            # Stay below SQLite's maximum number of variables
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ", ".join("?" * len(batch))
+                for key, payload in self.conn.execute(
+                    f"SELECT key, payload FROM {self.table} WHERE source = ? AND fetched_at >= ? AND key IN ({placeholders})",
+                    (source, cutoff, *batch),
+                ):
+                    found[key] = json.loads(payload)
+        return found
+
+    def store(self, source: str, payloads: Iterable[Tuple[str, Any]]) -> None:
+        """Store the payloads of keys.
+
+        Args:
+            source (str): Name of the source, i.e. "buzzsumo".
+            payloads (Iterable[Tuple[str, Any]]): Pairs of key and JSON-serializable payload, None if the API's response was empty.
+        """
+        now = time.time()
+        rows = [(source, key, json.dumps(payload), now) for key, payload in payloads]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (source, key, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def fetch(self, source: str, key: str, call: Callable[[], Any]) -> Any:
+        """Return the cached payload of a key or, if the cache misses it, call the API and store its payload.
+
+        Args:
+            source (str): Name of the source, i.e. "buzzsumo".
+            key (str): Key of the payload, i.e. a target URL.
+            call (Callable[[], Any]): Function that calls the API and returns the key's raw payload.
+
+        Raises:
+            CacheMiss: The cache is offline and misses the key.
+
+        Returns:
+            Any: Payload, None if the API's response was empty.
+        """
+        found = self.lookup(source, [key])
+        if key in found:
+            return found[key]
+        if self.offline:
+            raise CacheMiss(source=source, key=key)
+        payload = call()
+        self.store(source, [(key, payload)])
+        return payload
+
+    def fetch_many(
+        self,
+        source: str,
+        keys: Iterable[str],
+        call: Callable[[List[str]], Iterable[Tuple[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Return the cached payloads of keys and, for the keys the cache misses, call the API in one go and store its payloads.
+
+        Args:
+            source (str): Name of the source, i.e. "youtube_channel".
+            keys (Iterable[str]): Keys of the payloads, i.e. IDs.
+            call (Callable[[List[str]], Iterable[Tuple[str, Any]]]): Function that calls the API on missed keys and yields pairs of key and raw payload.
+
+        Returns:
+            Dict[str, Any]: Key-value pairs of keys and payloads. If the cache is offline, the keys it misses are absent.
+        """
+        keys = list(keys)
+        found = self.lookup(source, keys)
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and not self.offline:
+            fetched = dict(call(missing))
+            self.store(source, ((key, fetched.get(key)) for key in missing))
+            found.update({key: fetched.get(key) for key in missing})
+        return found
+
+    def close(self) -> None:
+        """Close the connection to the cache's SQLite database."""
+        self.conn.close()
@@ -0,0 +1,78 @@
+# minall/utils/concurrency.py
+
+"""Bounded submission of tasks to an executor.
+
+An executor's `map()` method submits a task for every item up front, so that a list of millions of URLs becomes millions of pending futures, and the results wait in memory for the consumer whenever it falls behind. The function in this module instead keeps a bounded number of tasks in flight and submits the next item only once the consumer takes a result, so that the memory held by the tasks stays flat however many items there are and a slow consumer pauses the workers.
+
+The module contains the following function:
+
+- `bounded_map(executor, func, items, max_in_flight, ordered)` - Apply a function to items in an executor, with a bounded number of tasks in flight, yielding the results.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from itertools import islice
+from typing import Callable, Deque, Generator, Iterable, Set, TypeVar
+
+# Number of tasks in flight per worker, so that each worker has its next task queued
+IN_FLIGHT_PER_WORKER = 2
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    executor: Executor,
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_in_flight: int,
+    ordered: bool = True,
+) -> Generator[R, None, None]:
+    """Apply a function to items in an executor, keeping at most a given number of tasks in flight, and yield the results.
+
+    If the consumer stops early, or a task raises an exception, the tasks not yet started are cancelled.
+
+    Examples:
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> with ThreadPoolExecutor(max_workers=2) as executor:
+        ...     list(bounded_map(executor, lambda x: x * 2, range(5), max_in_flight=2))
+        [0, 2, 4, 6, 8]
+
+    Args:
+        executor (Executor): Executor running the tasks.
+        func (Callable[[T], R]): Function applied to each item.
+        items (Iterable[T]): Items, consumed lazily.
+        max_in_flight (int): Maximum number of tasks submitted and not yet consumed.
+        ordered (bool, optional): Whether to yield the results in the order of the items. If False, the results are yielded as soon as they complete. Defaults to True.
+
+    Yields:
+        Generator[R, None, None]: Result of the function on each item.
+    """
+    items = iter(items)
+    max_in_flight = max(max_in_flight, 1)
+    pending: Deque[Future] | Set[Future] = deque() if ordered else set()
+
+    def submit(n: int) -> None:
+        for item in islice(items, n):
+            future = executor.submit(func, item)
+            if isinstance(pending, deque):
+                pending.append(future)
+            else:
+                pending.add(future)
+
+    try:
+        submit(max_in_flight)
+        while pending:
+            if isinstance(pending, deque):
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+            for future in done:
+                result = future.result()
+                # Refill before yielding, so that the workers stay busy while the consumer works
+                submit(1)
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
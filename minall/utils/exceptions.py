@@ -0,0 +1,16 @@
+# minall/utils/exceptions.py
+
+"""Exceptions raised by the persistent caches.
+
+This module contains exceptions raised by the caches of API responses. The module contains the following exception:
+
+- `CacheMiss` - In offline mode, the cache does not have the payload of a key, and the API is not called.
+"""
+
+
+class CacheMiss(Exception):
+    """The offline cache does not have the payload of a key."""
+
+    def __init__(self, source: str, key: str) -> None:
+        message = f"The offline cache has no '{source}' payload for the key '{key}'."
+        super().__init__(message)
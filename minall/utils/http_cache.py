@@ -0,0 +1,315 @@
+# minall/utils/http_cache.py
+
+"""Persistent cache of HTTP responses, stored in an SQLite database.
+
+So that a repeated or resumed run does not download the same pages again, the scraper's responses are stored on disk, keyed by their normalized URL, with their zlib-compressed body, headers, and fetch time. A cached response younger than the cache's time-to-live is used without any request. An older one is revalidated with a conditional request, which sends its ETag or Last-Modified validators and, if the server answers "304 Not Modified", costs no download. The cache's size is bounded by evicting the least recently used responses. So that cache hits do not each write to the database, a response's last use is only recorded once it is stale by more than a set resolution. A response whose stored body or headers cannot be decoded is treated as a miss and deleted.
+
+In offline mode, the scraper makes no request: it uses every cached response, however old, and skips the URLs the cache misses, which are not reported as failed scrapes.
+
+The module contains the following functions and classes:
+
+- `cache_key(url)` - Normalize a URL into the key of its cached response.
+- `CachedResponse` - Dataclass of a cached HTTP response.
+- `HTTPCache(database, ttl, max_size, offline)` - Store, look up, revalidate, and evict cached HTTP responses.
+"""
+
+import json
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict
+
+from minet.web import Response
+from ural import normalize_url
+
+from minall.utils.database import connect_to_database
+
+# Default time-to-live of the cached responses
+DEFAULT_TTL = timedelta(days=7)
+# Default maximum size, in bytes, of the cached responses' compressed bodies
+DEFAULT_MAX_SIZE = 2 * 1024**3
+# Time, in seconds, after which a cached response's last use is recorded again
+ACCESS_RESOLUTION = 3600
+# Share of the maximum size freed by an eviction, so that evictions are not run at every insert
+EVICTION_MARGIN = 0.1
+
+
+def cache_key(url: str) -> str:
+    """Normalize a URL into the key of its cached response, so that variants of the same URL share the response.
+
+    Examples:
+        >>> cache_key("https://www.LeMonde.fr/article?utm_source=twitter#comments")
+        'lemonde.fr/article'
+
+    Args:
+        url (str): Target URL.
+
+    Returns:
+        str: Normalized URL.
+    """
+    try:
+        return normalize_url(url)
+    except Exception:
+        return url
+
+
+@dataclass
+class CachedResponse:
+    """Dataclass of a cached HTTP response.
+
+    Attributes:
+        url (str): Requested URL.
+        status (int): HTTP status of the response.
+        headers (Dict[str, str]): Key-value pairs of the response's headers.
+        body (bytes): Uncompressed body of the response.
+        encoding (str | None): Encoding of the response's body.
+        fetched_at (float): Time, in seconds since the epoch, when the response was fetched or last revalidated.
+    """
+
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    encoding: str | None = None
+    fetched_at: float = 0.0
+
+    def text(self) -> str:
+        """Decode the response's body.
+
+        Returns:
+            str: Text of the response.
+        """
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    def validators(self) -> Dict[str, str]:
+        """Headers of a conditional request that revalidates the response.
+
+        Examples:
+            >>> CachedResponse(url="https://example.com", status=200, headers={"ETag": '"abc"'}).validators()
+            {'If-None-Match': '"abc"'}
+
+        Returns:
+            Dict[str, str]: Key-value pairs of the request's headers.
+        """
+        headers = {k.lower(): v for k, v in self.headers.items()}
+        validators = {}
+        if "etag" in headers:
+            validators["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            validators["If-Modified-Since"] = headers["last-modified"]
+        return validators
+
+
+class HTTPCache:
+    """Class to store, look up, revalidate, and evict cached HTTP responses.
+
+    The cache can be shared by several threads.
+
+    Examples:
+        >>> cache = HTTPCache(database=None)
+        >>> cache.get("https://example.com") is None
+        True
+    """
+
+    table = "http_cache"
+
+    def __init__(
+        self,
+        database: str | None,
+        ttl: timedelta | None = DEFAULT_TTL,
+        max_size: int = DEFAULT_MAX_SIZE,
+        offline: bool = False,
+    ) -> None:
+        """Connect to the cache's SQLite database and create its table.
+
+        Args:
+            database (str | None): Path to the cache's SQLite database. If None, the cache is kept in memory.
+            ttl (timedelta | None, optional): Time-to-live of the cached responses, after which they are revalidated. If None, the responses never expire. Defaults to DEFAULT_TTL.
+            max_size (int, optional): Maximum size, in bytes, of the cached responses' compressed bodies. Defaults to DEFAULT_MAX_SIZE.
+            offline (bool, optional): Whether to only read the cache, without any request. Defaults to False.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+        self.conn = connect_to_database(database=database)
+        self.lock = self.conn.lock
+        with self.lock, self.conn:
+            if database:
+                self.conn.execute("PRAGMA journal_mode = WAL")
+                self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.execute(
+                f"""
+            CREATE TABLE IF NOT EXISTS {self.table}(
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                encoding TEXT,
+                body BLOB,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL
+            )"""
+            )
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at_idx ON {self.table}(accessed_at)"
+            )
+            self.size = self.conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()[0]
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        """Whether a cached response is younger than the cache's time-to-live.
+
+        Args:
+            cached (CachedResponse): Cached response.
+
+        Returns:
+            bool: True if the response can be used without revalidating it.
+        """
+        if self.ttl is None or self.offline:
+            return True
+        return time.time() - cached.fetched_at < self.ttl.total_seconds()
+
+    def __contains__(self, url: str) -> bool:
+        """Whether the cache has a response for a URL, however old.
+
+        Examples:
+            >>> cache = HTTPCache(database=None)
+            >>> "https://example.com" in cache
+            False
+
+        Args:
+            url (str): Target URL.
+
+        Returns:
+            bool: True if the URL's response is cached.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE key = ?", (cache_key(url),)
+            ).fetchone()
+        return row is not None
+
+    def get(self, url: str) -> CachedResponse | None:
+        """Look up the cached response of a URL, marking it as recently used.
+
+        If the response's last use was recorded less than ACCESS_RESOLUTION seconds ago, it is not recorded again. If the response cannot be decoded, it is deleted.
+
+        Examples:
+            >>> cache = HTTPCache(database=None)
+            >>> with cache.lock, cache.conn:
+            ...     _ = cache.conn.execute("INSERT INTO http_cache VALUES ('example.com', 'https://example.com', 200, '{}', NULL, x'00', 1, 0, 0)")
+            >>> cache.get("https://example.com") is None
+            True
+            >>> cache.conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()
+            (0,)
+
+        Args:
+            url (str): Target URL.
+
+        Returns:
+            CachedResponse | None: If the URL's response is cached, the cached response.
+        """
+        key = cache_key(url)
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT url, status, headers, encoding, body, size, fetched_at, accessed_at FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, encoding, body, size, fetched_at, accessed_at = row
+        try:
+            cached = CachedResponse(
+                url=url,
+                status=status,
+                headers=json.loads(headers),
+                body=zlib.decompress(body),
+                encoding=encoding,
+                fetched_at=fetched_at,
+            )
+        except (zlib.error, TypeError, ValueError):
+            with self.lock, self.conn:
+                deleted = self.conn.execute(
+                    f"DELETE FROM {self.table} WHERE key = ?", (key,)
+                ).rowcount
+                if deleted:
+                    self.size -= size or 0
+            return None
+        now = time.time()
+        if now - (accessed_at or 0) > ACCESS_RESOLUTION:
+            with self.lock, self.conn:
+                self.conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        return cached
+
+    def put(self, url: str, response: Response) -> None:
+        """Store the response of a URL, evicting the least recently used responses if the cache is full.
+
+        Args:
+            url (str): Target URL.
+            response (Response): Response object returned from minet's request method.
+        """
+        key = cache_key(url)
+        body = zlib.compress(response.body)
+        headers = json.dumps(dict(response.headers))
+        now = time.time()
+        with self.lock, self.conn:
+            previous = self.conn.execute(
+                f"SELECT size FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                f"""
+            INSERT OR REPLACE INTO {self.table}
+            (key, url, status, headers, encoding, body, size, fetched_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    key,
+                    url,
+                    response.status,
+                    headers,
+                    response.encoding,
+                    body,
+                    len(body),
+                    now,
+                    now,
+                ),
+            )
+            self.size += len(body) - (previous[0] if previous else 0)
+            if self.size > self.max_size:
+                self._evict()
+
+    def revalidate(self, url: str) -> None:
+        """Record that the server confirmed the cached response of a URL is still valid, renewing its time-to-live.
+
+        Args:
+            url (str): Target URL.
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"UPDATE {self.table} SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, cache_key(url)),
+            )
+
+    def _evict(self) -> None:
+        """Delete the least recently used responses until the cache is below its maximum size, minus a margin."""
+        target = self.max_size * (1 - EVICTION_MARGIN)
+        cursor = self.conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at"
+        )
+        keys = []
+        for key, size in cursor:
+            if self.size <= target:
+                break
+            keys.append((key,))
+            self.size -= size
+        self.conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", keys)
+
+    def close(self) -> None:
+        """Close the connection to the cache's SQLite database."""
+        self.conn.close()
@@ -6,6 +6,7 @@ The class `APIKeys` contains the following methods and properties:
 
 - `__init__(config)` - Parses the minet client configuration details.
 - `env_string()` - Formats the minet client credentials as an environment variable string.
+- `parse_list(value)` - Parse a list of API tokens or keys, given as a list or a comma-separated string.
 - `load_config_file(config_file)` - Parse client configuration details from JSON or YAML file.
 """
 
@@ -23,14 +24,14 @@ class APIKeys:
     """Data class to store and manage minet client credentials.
 
     Attributes:
-        buzzsumo_token (Optional[str]): Buzzsumo API token. Optional.
-        crowdtangle_token (Optional[str]):  CrowdTangle API token. Optional.
+        buzzsumo_token (Optional[List[str]]): List of Buzzsumo API tokens. Optional.
+        crowdtangle_token (Optional[List[str]]):  List of CrowdTangle API tokens. Optional.
         crowdtangle_rate_limit (Optional[str]): CrowdTangle API rate limit, cast as a string. Optional.
         youtube_key (Optional[List[str]]) : List of YouTube API keys. Optional.
     """
 
-    buzzsumo_token: Optional[str]
-    crowdtangle_token: Optional[str]
+    buzzsumo_token: Optional[List[str]]
+    crowdtangle_token: Optional[List[str]]
     crowdtangle_rate_limit: Optional[str]
     youtube_key: Optional[List[str]]
 
@@ -52,8 +53,10 @@ class APIKeys:
                 parsed_config = self.load_config_file(config)
             else:
                 parsed_config = config
-            self.buzzsumo_token = parsed_config["buzzsumo"]["token"]
-            self.crowdtangle_token = parsed_config["crowdtangle"]["token"]
+            self.buzzsumo_token = self.parse_list(parsed_config["buzzsumo"]["token"])
+            self.crowdtangle_token = self.parse_list(
+                parsed_config["crowdtangle"]["token"]
+            )
             self.crowdtangle_rate_limit = parsed_config["crowdtangle"]["rate_limit"]
             yt_keys = parsed_config["youtube"]["key"]
             if isinstance(yt_keys, list):
@@ -61,8 +64,10 @@ class APIKeys:
             else:
                 self.youtube_key = parsed_config["youtube"]["key"].split(",")
         else:
-            self.buzzsumo_token = os.environ.get("BUZZSUMO_TOKEN")
-            self.crowdtangle_token = os.environ.get("CROWDTANGLE_TOKEN")
+            self.buzzsumo_token = self.parse_list(os.environ.get("BUZZSUMO_TOKEN"))
+            self.crowdtangle_token = self.parse_list(
+                os.environ.get("CROWDTANGLE_TOKEN")
+            )
             self.crowdtangle_rate_limit = os.environ.get("CROWDTANGLE_RATE_LIMIT")
             youtube_key = os.environ.get("YOUTUBE_KEY")
             if youtube_key:
@@ -84,12 +89,32 @@ class APIKeys:
         """
 
         return "BUZZSUMO_TOKEN={bz}\nCROWDTANGLE_TOKEN={ct}\nCROWDTANGLE_RATE_LIMIT={crl}\nYOUTUBE_KEY={yt}\n".format(
-            bz=self.buzzsumo_token,
-            ct=self.crowdtangle_token,
+            bz=",".join(self.buzzsumo_token) if self.buzzsumo_token else None,
+            ct=",".join(self.crowdtangle_token) if self.crowdtangle_token else None,
             crl=self.crowdtangle_rate_limit,
             yt=self.youtube_key,
         )
 
+    @staticmethod
+    def parse_list(value: str | List[str] | None) -> List[str]:
+        """Parse a list of API tokens or keys, given as a list or a comma-separated string.
+
+        Examples:
+            >>> APIKeys.parse_list("token1,token2")
+            ['token1', 'token2']
+
+        Args:
+            value (str | List[str] | None): List, or comma-separated string, of tokens.
+
+        Returns:
+            List[str]: List of tokens, empty if none was given.
+        """
+        if not value:
+            return []
+        if isinstance(value, list):
+            return value
+        return [token.strip() for token in value.split(",") if token.strip()]
+
     def load_config_file(self, config_file: str) -> dict:
         """Parse dictionary from JSON or YAML configuration file.
 
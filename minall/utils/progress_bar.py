@@ -1,8 +1,17 @@
 # minall/utils/progress_bar.py
 
 """Context for rich progress bar.
+
+Rich can only display one live progress bar at a time. So that the enrichment's sources can run at the same time, their tasks are added to a single shared progress bar, which is started by the first context that needs it and stopped by the last one.
+
+This module contains the following functions:
+
+- `start_progress_bar()` - Start, or join, the shared progress bar.
+- `stop_progress_bar()` - Leave the shared progress bar, stopping it if no other context uses it.
+- `progress_bar()` - Context for the shared progress bar.
 """
 
+import threading
 from contextlib import contextmanager
 from typing import Generator
 
@@ -14,6 +23,41 @@ from rich.progress import (
     TimeElapsedColumn,
 )
 
+_lock = threading.Lock()
+_shared: Progress | None = None
+_users = 0
+
+
+def start_progress_bar() -> Progress:
+    """Start the shared rich progress bar, or join it if it is already started.
+
+    Returns:
+        Progress: Rich progress bar.
+    """
+    global _shared, _users
+    with _lock:
+        if _shared is None:
+            _shared = Progress(
+                TextColumn("[progress.description]{task.description}"),
+                SpinnerColumn(),
+                MofNCompleteColumn(),
+                TimeElapsedColumn(),
+            )
+            _shared.start()
+        _users += 1
+        return _shared
+
+
+def stop_progress_bar() -> None:
+    """Leave the shared rich progress bar, stopping it if no other context uses it."""
+    global _shared, _users
+    with _lock:
+        _users -= 1
+        if _users <= 0 and _shared is not None:
+            _shared.stop()
+            _shared = None
+            _users = 0
+
 
 @contextmanager
 def progress_bar() -> Generator[Progress, None, None]:
@@ -22,10 +66,8 @@ def progress_bar() -> Generator[Progress, None, None]:
     Yields:
         Generator[Progress, None, None]: Rich progress bar context
     """
-    with Progress(
-        TextColumn("[progress.description]{task.description}"),
-        SpinnerColumn(),
-        MofNCompleteColumn(),
-        TimeElapsedColumn(),
-    ) as progress:
+    progress = start_progress_bar()
+    try:
         yield progress
+    finally:
+        stop_progress_bar()
@@ -0,0 +1,197 @@
+# minall/utils/quota.py
+
+"""Persistent ledger of the quota units spent on quota-limited APIs, stored in an SQLite database.
+
+The YouTube Data API grants each key a daily budget of quota units, reset at midnight Pacific time, and the Buzzsumo API grants each token a monthly budget of calls. So that a run knows how much of a key's budget previous runs already spent, the units spent are recorded on disk, per service, key, and quota period, along with the remaining units last reported by the API, if it reports them, and the units spent at the time of the report, from which the units left are estimated when the API stops reporting them. The keys themselves are not stored, only a digest of them.
+
+The module contains the following functions and classes:
+
+- `key_id(key)` - Digest of an API key, under which its spending is recorded.
+- `pacific_day()` - Current day in Pacific time, the period of YouTube's daily quota.
+- `current_month()` - Current month in UTC, the period of Buzzsumo's monthly quota.
+- `QuotaLedger(database)` - Record and look up the quota units spent, and left, per service, key, and period.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from minall.utils.database import connect_to_database
+
+# Time zone in which YouTube's daily quota is reset
+PACIFIC_TIME = ZoneInfo("America/Los_Angeles")
+
+
+def key_id(key: str) -> str:
+    """Digest of an API key, under which its spending is recorded, so that the ledger does not store the key.
+
+    Examples:
+        >>> key_id("key1")
+        '8174099687a26621'
+
+    Args:
+        key (str): API key or token.
+
+    Returns:
+        str: First 16 hexadecimal digits of the key's SHA-256 digest.
+    """
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def pacific_day() -> str:
+    """Current day in Pacific time, the period of YouTube's daily quota.
+
+    Returns:
+        str: ISO date, i.e. "2024-01-31".
+    """
+    return datetime.now(PACIFIC_TIME).date().isoformat()
+
+
+def current_month() -> str:
+    """Current month in UTC, the period of Buzzsumo's monthly quota.
+
+    Returns:
+        str: ISO month, i.e. "2024-01".
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+class QuotaLedger:
+    """Class to record and look up the quota units spent per service, key, and period.
+
+    The ledger can be shared by several threads.
+
+    Examples:
+        >>> ledger = QuotaLedger(database=None)
+        >>> ledger.spend("youtube", "key1", period="2024-01-31", units=2)
+        >>> ledger.spent("youtube", "key1", period="2024-01-31")
+        2
+    """
+
+    table = "quota_ledger"
+
+    def __init__(self, database: str | None) -> None:
+        """Connect to the ledger's SQLite database and create its table.
+
+        Args:
+            database (str | None): Path to the ledger's SQLite database. If None, the ledger is kept in memory.
+        """
+        self.conn = connect_to_database(database=database)
+        self.lock = self.conn.lock
+        with self.lock, self.conn:
+            if database:
+                self.conn.execute("PRAGMA journal_mode = WAL")
+                self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.conn.execute(
+                f"""
+            CREATE TABLE IF NOT EXISTS {self.table}(
+                service TEXT,
+                key_id TEXT,
+                period TEXT,
+                units INTEGER,
+                remaining INTEGER,
+                reported_units INTEGER,
+                PRIMARY KEY (service, key_id, period)
+            )"""
+            )
+
+    def spent(self, service: str, key: str, period: str) -> int:
+        """Look up the quota units spent with a key during a period.
+
+        Args:
+            service (str): Name of the API, i.e. "youtube".
+            key (str): API key or token.
+            period (str): Quota period, i.e. the day "2024-01-31".
+
+        Returns:
+            int: Units spent.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT units FROM {self.table} WHERE service = ? AND key_id = ? AND period = ?",
+                (service, key_id(key), period),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def spend(self, service: str, key: str, period: str, units: int) -> None:
+        """Record quota units spent with a key during a period.
+
+        Args:
+            service (str): Name of the API, i.e. "youtube".
+            key (str): API key or token.
+            period (str): Quota period, i.e. the day "2024-01-31".
+            units (int): Units spent.
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"""
+            INSERT INTO {self.table} (service, key_id, period, units) VALUES (?, ?, ?, ?)
+            ON CONFLICT (service, key_id, period) DO UPDATE SET units = units + excluded.units""",
+                (service, key_id(key), period, units),
+            )
+
+    def exhaust(self, service: str, key: str, period: str, quota: int) -> None:
+        """Record that the API refused a key for the rest of a period, as if its whole quota was spent.
+
+        Args:
+            service (str): Name of the API, i.e. "youtube".
+            key (str): API key or token.
+            period (str): Quota period, i.e. the day "2024-01-31".
+            quota (int): Units granted to the key per period.
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"""
+            INSERT INTO {self.table} (service, key_id, period, units) VALUES (?, ?, ?, ?)
+            ON CONFLICT (service, key_id, period) DO UPDATE SET units = MAX(units, excluded.units)""",
+                (service, key_id(key), period, quota),
+            )
+
+    def report_remaining(
+        self, service: str, key: str, period: str, remaining: int
+    ) -> None:
+        """Record the units the API reports are left to a key for a period, along with the units spent so far.
+
+        Args:
+            service (str): Name of the API, i.e. "buzzsumo".
+            key (str): API key or token.
+            period (str): Quota period, i.e. the month "2024-01".
+            remaining (int): Units left.
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"""
+            INSERT INTO {self.table} (service, key_id, period, units, remaining, reported_units) VALUES (?, ?, ?, 0, ?, 0)
+            ON CONFLICT (service, key_id, period) DO UPDATE SET remaining = excluded.remaining, reported_units = units""",
+                (service, key_id(key), period, remaining),
+            )
+
+    def remaining(self, service: str, key: str, period: str) -> int | None:
+        """Estimate the units left to a key for a period: the units the API last reported were left, minus the units spent since.
+
+        Examples:
+            >>> ledger = QuotaLedger(database=None)
+            >>> ledger.spend("buzzsumo", "key1", period="2024-01", units=1)
+            >>> ledger.report_remaining("buzzsumo", "key1", period="2024-01", remaining=500)
+            >>> ledger.spend("buzzsumo", "key1", period="2024-01", units=3)
+            >>> ledger.remaining("buzzsumo", "key1", period="2024-01")
+            497
+
+        Args:
+            service (str): Name of the API, i.e. "buzzsumo".
+            key (str): API key or token.
+            period (str): Quota period, i.e. the month "2024-01".
+
+        Returns:
+            int | None: Units left, None if the API never reported them.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT remaining - (units - COALESCE(reported_units, units)) FROM {self.table} WHERE service = ? AND key_id = ? AND period = ?",
+                (service, key_id(key), period),
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Close the connection to the ledger's SQLite database."""
+        self.conn.close()
@@ -0,0 +1,111 @@
+# minall/utils/rate_limit.py
+
+"""Process-wide, adaptive rate limiters of API tokens.
+
+An API's rate limit applies to a token, not to a client, so every thread and every client that uses the same token must draw from the same budget. The module keeps one token bucket per API token for the whole process. The bucket spaces the token's requests evenly over the period of its rate limit, so that threads neither queue behind a burst nor fire bursts that the API refuses.
+
+When the API answers with a rate-limit response, the bucket halves its rate and pauses, then recovers its nominal rate step by step as requests succeed.
+
+The module contains the following class and function:
+
+- `TokenBucket(rate, period, clock)` - Space out the requests of an API token, adapting to the API's rate-limit responses.
+- `shared_bucket(token, rate, period)` - Get the process-wide token bucket of an API token.
+"""
+
+import threading
+import time
+from typing import Callable, Dict
+
+# Maximum factor by which rate-limit responses can slow a bucket down
+MAX_SLOWDOWN = 16
+# Factor by which each successful request brings a slowed bucket back to its nominal rate
+RECOVERY = 0.9
+
+_lock = threading.Lock()
+_buckets: Dict[str, "TokenBucket"] = {}
+
+
+class TokenBucket:
+    """Class to space out the requests of an API token, adapting to the API's rate-limit responses.
+
+    The bucket can be shared by several threads.
+
+    Examples:
+        >>> bucket = TokenBucket(rate=60, period=60)
+        >>> bucket.reserve()
+        0.0
+        >>> round(bucket.reserve(), 1)
+        1.0
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        period: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Set up the bucket's nominal rate.
+
+        Args:
+            rate (int): Number of requests allowed per period.
+            period (float, optional): Period, in seconds, of the rate limit. Defaults to 60.
+            clock (Callable[[], float], optional): Monotonic clock, in seconds. Defaults to time.monotonic.
+        """
+        self.clock = clock
+        self.base_interval = period / rate
+        self.interval = self.base_interval
+        self.next_free = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def delay(self) -> float:
+        """Time, in seconds, until the bucket allows a request."""
+        return max(self.next_free - self.clock(), 0.0)
+
+    def reserve(self) -> float:
+        """Reserve the bucket's next free slot.
+
+        Returns:
+            float: Time, in seconds, to wait before sending the request.
+        """
+        with self.lock:
+            now = self.clock()
+            start = max(now, self.next_free)
+            self.next_free = start + self.interval
+            return start - now
+
+    def acquire(self) -> None:
+        """Wait for the bucket's next free slot."""
+        time.sleep(self.reserve())
+
+    def penalize(self) -> None:
+        """After a rate-limit response, halve the bucket's rate and pause it for one interval."""
+        with self.lock:
+            self.interval = min(self.interval * 2, self.base_interval * MAX_SLOWDOWN)
+            self.next_free = max(self.next_free, self.clock() + self.interval)
+
+    def reward(self) -> None:
+        """After a successful request, bring the bucket's rate closer to its nominal rate."""
+        with self.lock:
+            self.interval = max(self.base_interval, self.interval * RECOVERY)
+
+
+def shared_bucket(token: str, rate: int, period: float = 60) -> TokenBucket:
+    """Get the process-wide token bucket of an API token, creating it on first use.
+
+    Examples:
+        >>> shared_bucket("token", rate=10) is shared_bucket("token", rate=10)
+        True
+
+    Args:
+        token (str): API token.
+        rate (int): Number of requests allowed per period, used if the bucket is created.
+        period (float, optional): Period, in seconds, of the rate limit, used if the bucket is created. Defaults to 60.
+
+    Returns:
+        TokenBucket: Token bucket of the API token.
+    """
+    with _lock:
+        if token not in _buckets:
+            _buckets[token] = TokenBucket(rate=rate, period=period)
+        return _buckets[token]
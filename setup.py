@@ -43,8 +43,10 @@ setup(
         "pyyaml-env-tag==0.1",
         "watchdog==3.0.0",
     ],
-    extra_require={
+    extras_require={
         ":python_version<'3.11'": ["typing_extensions>=4.3"],
+        "parquet": ["pyarrow>=14"],
+        "zstd": ["zstandard>=0.22"],
     },
     entry_points={
         "console_scripts": ["minall=minall.cli.run:cli"],
@@ -0,0 +1,119 @@
+import asyncio
+import http.server
+import threading
+import unittest
+
+from minall.enrichment.article_text.engine import FetchEngine
+from minall.enrichment.article_text.scheduler import DomainScheduler
+from minall.enrichment.article_text.scraper import Scraper
+from tests.base import BaseTest
+
+
+class SchedulerTest(BaseTest):
+    def test_single_domain_run_beyond_lookahead(self):
+        # The URLs come sorted from the database, so one domain's URLs are contiguous
+        urls = [f"https://www.lemonde.fr/{i}" for i in range(LOOKAHEAD * 3)]
+        urls += [f"https://site{i}.com/{i}" for i in range(OTHER_DOMAINS)]
+
+        scheduler = DomainScheduler(
+            urls=urls,
+            max_per_domain=1,
+            delay=60,
+            lookahead=LOOKAHEAD,
+            max_buffered_per_domain=10,
+        )
+
+        async def dispatch():
+            handed_out = []
+            # Take every URL handed out without waiting for a domain's delay
+            while True:
+                try:
+                    url = await asyncio.wait_for(scheduler.get(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    return handed_out
+                if url is None:
+                    return handed_out
+                handed_out.append(url)
+
+        handed_out = asyncio.run(dispatch())
+        scheduler.close()
+
+        # The other domains are not held up behind the first domain's delay
+        self.assertEqual(len(handed_out), OTHER_DOMAINS + 1)
+        self.assertEqual(handed_out[0], urls[0])
+        self.assertEqual(set(handed_out[1:]), set(urls[LOOKAHEAD * 3 :]))
+
+    def test_spilled_urls_keep_their_order(self):
+        urls = [f"https://a.com/{i}" for i in range(LOOKAHEAD * 3)]
+        urls += ["https://b.com/1"]
+
+        scheduler = DomainScheduler(
+            urls=urls,
+            max_per_domain=1,
+            delay=0,
+            lookahead=LOOKAHEAD,
+            max_buffered_per_domain=10,
+        )
+
+        async def dispatch():
+            handed_out = []
+            while (url := await scheduler.get()) is not None:
+                handed_out.append(url)
+                scheduler.done(url)
+            return handed_out
+
+        handed_out = asyncio.run(dispatch())
+        scheduler.close()
+
+        self.assertEqual(len(handed_out), len(urls))
+        self.assertEqual([url for url in handed_out if "a.com" in url], urls[:-1])
+        self.assertEqual(scheduler.buffered, 0)
+
+
+class EngineTest(BaseTest):
+    def setUp(self) -> None:
+        # Serve the same article at every path of a local server
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ArticleHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def test_fetch_engine(self):
+        urls = [f"http://127.0.0.1:{self.server.server_port}/{i}" for i in range(20)]
+        engine = FetchEngine(
+            scraper=Scraper(), max_in_flight=4, delay=0, max_processes=2
+        )
+        results = list(engine(urls))
+
+        # Check that every URL was fetched and scraped once
+        self.assertEqual(sorted(url for url, _ in results), sorted(urls))
+        self.assertEqual([result.title for _, result in results], ["Hello"] * len(urls))
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ArticleHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(ARTICLE)))
+        self.end_headers()
+        self.wfile.write(ARTICLE)
+
+    def log_message(self, *args):
+        pass
+
+
+LOOKAHEAD = 50
+
+OTHER_DOMAINS = 20
+
+ARTICLE = (
+    b"<html><head><title>Hello</title></head><body><article><p>"
+    + b"Some text about things. " * 50
+    + b"</p></article></body></html>"
+)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,246 @@
+import http.server
+import os
+import threading
+import unittest
+from datetime import timedelta
+
+from minet.web import Response
+from urllib3._collections import HTTPHeaderDict
+
+from minall.enrichment.article_text.get_data import get_data
+from minall.enrichment.article_text.scraper import Scraper
+from minall.enrichment.buzzsumo.get_data import get_buzzsumo_data
+from minall.tables.sink import ResultSink
+from minall.utils.api_cache import APICache
+from minall.utils.exceptions import CacheMiss
+from minall.utils.http_cache import EVICTION_MARGIN, HTTPCache
+from tests.base import BaseTest
+
+
+class APICacheTest(BaseTest):
+    def setUp(self) -> None:
+        self.cache = APICache(database=None, ttl={"buzzsumo": timedelta(days=1)})
+        self.calls = []
+
+    def call(self, payload):
+        def f():
+            self.calls.append(payload)
+            return payload
+
+        return f
+
+    def test_ttl(self):
+        self.cache.fetch("buzzsumo", URL, call=self.call({"title": "Old"}))
+
+        # Check that a fresh payload is used without calling the API
+        self.assertEqual(
+            self.cache.fetch("buzzsumo", URL, call=self.call({"title": "New"})),
+            {"title": "Old"},
+        )
+
+        # Check that an expired payload is fetched and stored again
+        self.cache.conn.execute(
+            "UPDATE api_cache SET fetched_at = fetched_at - 2 * 86400"
+        )
+        self.assertEqual(
+            self.cache.fetch("buzzsumo", URL, call=self.call({"title": "New"})),
+            {"title": "New"},
+        )
+        self.assertEqual(self.calls, [{"title": "Old"}, {"title": "New"}])
+
+    def test_null_payload(self):
+        # Check that the API's empty response is cached rather than requested again
+        self.assertIsNone(self.cache.fetch("buzzsumo", URL, call=self.call(None)))
+        self.assertIsNone(self.cache.fetch("buzzsumo", URL, call=self.call({})))
+        self.assertEqual(self.calls, [None])
+        self.assertEqual(
+            self.cache.fetch_many("buzzsumo", [URL], call=lambda keys: []),
+            {URL: None},
+        )
+
+    def test_offline_miss(self):
+        self.cache.store("buzzsumo", [(URL, {"title": "Old"})])
+        self.cache.conn.execute(
+            "UPDATE api_cache SET fetched_at = fetched_at - 2 * 86400"
+        )
+        self.cache.offline = True
+
+        # Check that an expired payload is used, and a miss reported, without calling the API
+        self.assertEqual(
+            self.cache.fetch("buzzsumo", URL, call=self.call({"title": "New"})),
+            {"title": "Old"},
+        )
+        with self.assertRaises(CacheMiss):
+            self.cache.fetch("buzzsumo", OTHER_URL, call=self.call({"title": "New"}))
+        self.assertEqual(
+            self.cache.fetch_many(
+                "buzzsumo", [URL, OTHER_URL], call=lambda keys: self.fail()
+            ),
+            {URL: {"title": "Old"}},
+        )
+        self.assertEqual(self.calls, [])
+
+    def test_offline_miss_not_reported(self):
+        self.cache.store("buzzsumo", [(URL, None)])
+        self.cache.offline = True
+        sink = RecordingSink()
+        get_buzzsumo_data(
+            data=[URL, OTHER_URL], token="<TOKEN>", outfile=sink, cache=self.cache
+        )
+
+        # Check that the missed URL is neither written nor reported as a failure
+        self.assertEqual([row.url for row in sink.rows], [URL])
+        self.assertEqual(sink.marks, [(URL, False)])
+
+    def tearDown(self) -> None:
+        self.cache.close()
+
+
+class HTTPCacheTest(BaseTest):
+    def setUp(self) -> None:
+        self.cache = HTTPCache(database=None, ttl=timedelta(days=1))
+
+    def age(self, url, seconds):
+        self.cache.conn.execute(
+            "UPDATE http_cache SET fetched_at = fetched_at - ?, accessed_at = accessed_at - ? WHERE url = ?",
+            (seconds, seconds, url),
+        )
+
+    def test_ttl(self):
+        self.cache.put(URL, response(URL, ARTICLE))
+        self.assertTrue(self.cache.is_fresh(self.cache.get(URL)))
+        self.age(URL, 2 * 86400)
+        self.assertFalse(self.cache.is_fresh(self.cache.get(URL)))
+
+        # Check that an offline cache uses the expired response
+        self.cache.offline = True
+        self.assertTrue(self.cache.is_fresh(self.cache.get(URL)))
+
+    def test_revalidation(self):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/article"
+        scraper = Scraper(cache=self.cache)
+        try:
+            # Cache the response, then expire it
+            self.assertEqual(scraper.fetch(url), ARTICLE.decode())
+            self.age(url, 2 * 86400)
+            cached = self.cache.get(url)
+            self.assertEqual(cached.validators(), {"If-None-Match": ETAG})
+
+            # Check that the server's "304 Not Modified" renews the cached response
+            self.assertEqual(scraper.fetch(url), ARTICLE.decode())
+            self.assertTrue(self.cache.is_fresh(self.cache.get(url)))
+            self.assertEqual(ETagHandler.statuses, [200, 304])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_eviction(self):
+        # Incompressible bodies, of which two fit in the cache
+        bodies = {url: os.urandom(1000) for url in EVICTION_URLS}
+        self.cache.max_size = 2500
+        self.cache.put(
+            EVICTION_URLS[0], response(EVICTION_URLS[0], bodies[EVICTION_URLS[0]])
+        )
+        self.cache.put(
+            EVICTION_URLS[1], response(EVICTION_URLS[1], bodies[EVICTION_URLS[1]])
+        )
+        # The first response was used more recently than the second
+        self.age(EVICTION_URLS[1], 60)
+
+        # Check that the least recently used response is evicted to make room
+        self.cache.put(
+            EVICTION_URLS[2], response(EVICTION_URLS[2], bodies[EVICTION_URLS[2]])
+        )
+        rows = self.cache.conn.execute("SELECT url, size FROM http_cache").fetchall()
+        self.assertEqual(
+            sorted(url for url, _ in rows), [EVICTION_URLS[0], EVICTION_URLS[2]]
+        )
+        self.assertEqual(self.cache.size, sum(size for _, size in rows))
+        self.assertLessEqual(self.cache.size, 2500 * (1 - EVICTION_MARGIN))
+
+    def test_corrupt_entry(self):
+        self.cache.put(URL, response(URL, ARTICLE))
+        self.cache.conn.execute("UPDATE http_cache SET body = x'00'")
+
+        # Check that the corrupt response is a miss and is deleted
+        self.assertIsNone(self.cache.get(URL))
+        self.assertNotIn(URL, self.cache)
+        self.assertEqual(self.cache.size, 0)
+
+    def test_offline_miss_not_reported(self):
+        self.cache.put(URL, response(URL, ARTICLE))
+        self.cache.offline = True
+        sink = RecordingSink()
+        get_data(data=[URL, OTHER_URL], outfile=sink, cache=self.cache)
+
+        # Check that the missed URL is neither requested, nor written, nor reported
+        self.assertEqual(sink.marks, [(URL, True)])
+
+    def tearDown(self) -> None:
+        self.cache.close()
+
+
+class ETagHandler(http.server.BaseHTTPRequestHandler):
+    statuses = []
+
+    def do_GET(self):
+        # Record the status before answering, so that the client sees it once answered
+        if self.headers.get("If-None-Match") == ETAG:
+            ETagHandler.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        ETagHandler.statuses.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(ARTICLE)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(ARTICLE)
+
+    def log_message(self, *args):
+        pass
+
+
+def response(url, body):
+    return Response(
+        url,
+        None,
+        HTTPHeaderDict({"Content-Type": "text/html; charset=utf-8"}),
+        200,
+        body,
+    )
+
+
+class RecordingSink(ResultSink):
+    def __init__(self) -> None:
+        self.rows = []
+        self.marks = []
+
+    def writerow(self, row):
+        self.rows.append(row)
+
+    def mark(self, url, succeeded):
+        self.marks.append((url, succeeded))
+
+
+URL = "https://www.lemonde.fr/article"
+
+OTHER_URL = "https://www.lemonde.fr/other-article"
+
+EVICTION_URLS = [f"https://www.lemonde.fr/article-{i}" for i in range(3)]
+
+ETAG = '"abc"'
+
+ARTICLE = (
+    b"<html><head><title>Hello</title></head><body><article><p>"
+    + b"Some text about things. " * 50
+    + b"</p></article></body></html>"
+)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from minall.utils.concurrency import bounded_map
+from tests.base import BaseTest
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, max_workers: int) -> None:
+        super().__init__(max_workers=max_workers)
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class BoundedMapTest(BaseTest):
+    def test_max_in_flight(self):
+        with CountingExecutor(max_workers=4) as executor:
+            for consumed, _ in enumerate(
+                bounded_map(executor, str, range(50), max_in_flight=3), start=1
+            ):
+                # Check that no more tasks are submitted than the consumer can take
+                self.assertLessEqual(executor.submitted - consumed, 3)
+            self.assertEqual(executor.submitted, 50)
+
+    def test_ordered(self):
+        # The first item's task finishes only after the second item's task
+        second_done = threading.Event()
+
+        def func(item):
+            if item == 0:
+                second_done.wait(timeout=5)
+            elif item == 1:
+                second_done.set()
+            return item
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(
+                list(bounded_map(executor, func, range(10), max_in_flight=2)),
+                list(range(10)),
+            )
+            self.assertEqual(
+                sorted(
+                    bounded_map(
+                        executor, func, range(10), max_in_flight=2, ordered=False
+                    )
+                ),
+                list(range(10)),
+            )
+
+    def test_exception(self):
+        calls = []
+
+        def func(item):
+            calls.append(item)
+            if item == 3:
+                raise ValueError(item)
+            return item
+
+        for ordered in (True, False):
+            calls.clear()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                with self.assertRaises(ValueError):
+                    list(
+                        bounded_map(
+                            executor, func, range(100), max_in_flight=2, ordered=ordered
+                        )
+                    )
+            # Check that the tasks not yet started were cancelled
+            self.assertLess(len(calls), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from minall.utils.database import DATABASE_PROFILES, connect_to_database, ingesting
+from tests.base import BaseTest
+
+
+class DatabaseTest(BaseTest):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.database = str(Path(self.tempdir.name).joinpath("test.db"))
+
+    def assertPragmas(self, conn, pragmas):
+        for pragma, value in pragmas.items():
+            expected = PRAGMA_VALUES.get(pragma, {}).get(str(value), value)
+            (actual,) = conn.execute(f"PRAGMA {pragma}").fetchone()
+            if isinstance(actual, str):
+                actual, expected = actual.lower(), str(expected).lower()
+            self.assertEqual(actual, expected, msg=pragma)
+
+    def test_profiles(self):
+        for name, profile in DATABASE_PROFILES.items():
+            conn = connect_to_database(database=self.database, profile=name)
+            self.assertIs(conn.profile, profile)
+            self.assertPragmas(conn, profile.pragmas)
+
+            # Check that the ingest settings only apply during the ingest
+            with ingesting(conn):
+                self.assertPragmas(conn, {**profile.pragmas, **profile.ingest_pragmas})
+            self.assertPragmas(conn, profile.pragmas)
+            conn.close()
+            Path(self.database).unlink()
+
+    def test_default_settings(self):
+        conn = connect_to_database(database=self.database)
+        self.assertIsNone(conn.profile)
+        with ingesting(conn):
+            self.assertPragmas(conn, {"synchronous": "FULL"})
+        conn.close()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+
+# Values that SQLite returns for the named values of PRAGMA settings
+PRAGMA_VALUES = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+
+from minall.enrichment.youtube.exceptions import QuotaExhausted
+from minall.enrichment.youtube.key_pool import SERVICE, KeyPool
+from minall.utils.quota import QuotaLedger
+from tests.base import BaseTest
+
+
+class KeyPoolTest(BaseTest):
+    def setUp(self) -> None:
+        # Pin the day, so that the tests cannot straddle midnight Pacific time
+        patcher = patch(
+            "minall.enrichment.youtube.key_pool.pacific_day", return_value=DAY
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ledger = QuotaLedger(database=None)
+        # The first key already spent half of its usable units today
+        self.ledger.spend(SERVICE, "key1", period=DAY, units=50)
+        self.ledger.spend(SERVICE, "key1", period=YESTERDAY, units=100)
+
+    def tearDown(self) -> None:
+        self.ledger.close()
+
+    def pool(self) -> KeyPool:
+        return KeyPool(
+            keys=["key1", "key2"], ledger=self.ledger, daily_quota=200, reserve=100
+        )
+
+    def test_acquire(self):
+        pool = self.pool()
+        self.assertEqual(pool.remaining, {"key1": 50, "key2": 100})
+
+        # Check that the key with the most units left is taken until the keys are even
+        self.assertEqual([pool.acquire() for _ in range(50)], ["key2"] * 50)
+        self.assertEqual(pool.acquire(units=10), "key1")
+        self.assertEqual(pool.remaining, {"key1": 40, "key2": 50})
+
+        # Check that a request costing more than any key has left is refused
+        with self.assertRaises(QuotaExhausted):
+            pool.acquire(units=51)
+
+    def test_exhaust(self):
+        pool = self.pool()
+        pool.exhaust("key2")
+        self.assertEqual(self.ledger.spent(SERVICE, "key2", period=DAY), 200)
+
+        # Check that the remaining key is used until its quota is spent
+        self.assertEqual([pool.acquire() for _ in range(50)], ["key1"] * 50)
+        with self.assertRaises(QuotaExhausted):
+            pool.acquire()
+
+        # Check that a new pool knows the keys are spent
+        pool = self.pool()
+        pool.exhaust("key1")
+        with self.assertRaises(QuotaExhausted):
+            pool.acquire()
+
+
+DAY = "2024-01-31"
+
+YESTERDAY = "2024-01-30"
+
+
+if __name__ == "__main__":
+    unittest.main()
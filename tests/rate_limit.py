@@ -0,0 +1,62 @@
+import unittest
+
+from minall.utils.rate_limit import MAX_SLOWDOWN, RECOVERY, TokenBucket
+from tests.base import BaseTest
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TokenBucketTest(BaseTest):
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.bucket = TokenBucket(rate=60, period=60, clock=self.clock)
+
+    def test_reserve(self):
+        # Check that consecutive requests are spaced out by one interval
+        self.assertEqual(
+            [self.bucket.reserve() for _ in range(3)],
+            [0.0, 1.0, 2.0],
+        )
+        self.assertEqual(self.bucket.delay, 3.0)
+
+        # Check that the reserved slots are counted from the current time
+        self.clock.now = 2.5
+        self.assertEqual(self.bucket.reserve(), 0.5)
+
+        # Check that an idle bucket does not accumulate a burst
+        self.clock.now = 100.0
+        self.assertEqual(self.bucket.delay, 0.0)
+        self.assertEqual([self.bucket.reserve() for _ in range(2)], [0.0, 1.0])
+
+    def test_penalize(self):
+        self.bucket.penalize()
+
+        # Check that the rate is halved and the bucket paused for one interval
+        self.assertEqual(self.bucket.interval, 2.0)
+        self.assertEqual(self.bucket.reserve(), 2.0)
+        self.assertEqual(self.bucket.reserve(), 4.0)
+
+        # Check that the slowdown is capped
+        for _ in range(10):
+            self.bucket.penalize()
+        self.assertEqual(self.bucket.interval, MAX_SLOWDOWN)
+
+    def test_reward(self):
+        self.bucket.penalize()
+        self.bucket.reward()
+        self.assertAlmostEqual(self.bucket.interval, 2.0 * RECOVERY)
+
+        # Check that the bucket recovers its nominal rate, and no more
+        for _ in range(20):
+            self.bucket.reward()
+        self.assertEqual(self.bucket.interval, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
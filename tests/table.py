@@ -1,9 +1,16 @@
 import csv
+import gzip
+import importlib.util
+import threading
 import unittest
+from datetime import timedelta
 from pathlib import Path
 
+from minall.enrichment.precedence import SourcePrecedence
+from minall.tables.enrichment_state import EnrichmentStateTable, parse_refresh_policy
 from minall.tables.links import LinksTable
 from minall.tables.shared_content import SharedContentTable
+from minall.tables.sink import TableSink
 from minall.utils.database import connect_to_database
 from tests.base import BaseTest
 
@@ -38,6 +45,56 @@ class TableTest(BaseTest):
         # Check exported data against expected data
         self.assertEqual(export, LINKS_EXPORT)
 
+    def test_compressed_export(self):
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(SHARED_CONTENT_INPUT)
+        table = SharedContentTable(conn=self.conn, infile=INFILE, outfile=OUTFILE)
+
+        # Export the table in small batches to a gzip-compressed file
+        table.export(outfile=GZIP_OUTFILE, compression="gzip", batch_size=1)
+        with gzip.open(GZIP_OUTFILE, "rt") as f:
+            reader = csv.reader(f)
+            export = [row for row in reader]
+        GZIP_OUTFILE.unlink()
+
+        # Check exported data against expected data
+        self.assertEqual(
+            export[0], ["post_url", "content_url", "media_type", "height", "width"]
+        )
+        self.assertEqual(len(export), len(SHARED_CONTENT_INPUT))
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pyarrow"), "requires the 'parquet' extra"
+    )
+    def test_parquet_export(self):
+        import pyarrow.parquet as pq
+
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(SHARED_CONTENT_INPUT)
+        table = SharedContentTable(conn=self.conn, infile=INFILE, outfile=OUTFILE)
+        table.bulk_upsert(
+            cols=["post_url", "content_url", "height", "width"],
+            rows=[
+                ("facebook1", "image1", "10", 2.5),
+                ("facebook1", "image2", "n/a", None),
+            ],
+        )
+
+        # Export the table in small batches to a Parquet file and read it back
+        with self.assertLogs(level="WARNING") as logs:
+            table.export_parquet(outfile=PARQUET_OUTFILE, batch_size=1)
+        export = pq.read_table(PARQUET_OUTFILE)
+        PARQUET_OUTFILE.unlink()
+
+        # Check that the column types are kept and unconvertible integers are reported
+        self.assertEqual(export.schema, table.arrow_schema)
+        self.assertEqual(export.to_pylist(), SHARED_CONTENT_PARQUET_EXPORT)
+        self.assertIn("'height'", logs.output[0])
+
     def test_shared_content(self):
         # Produce test data
         with open(INFILE, "w") as f:
@@ -57,17 +114,314 @@ class TableTest(BaseTest):
         # Check result against expected result
         self.assertEqual(update, SHARED_CONTENT_UPDATE)
 
+    def test_batched_update(self):
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INPUT)
+        table = LinksTable(
+            conn=self.conn, infile=INFILE, url_col="target_url", outfile=OUTFILE
+        )
+
+        # Coalesce two rows for the same URL, one per batch
+        with open(OUTFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_BATCHED_ENRICHMENT)
+        n_rows = table.update_from_csv(datafile=OUTFILE, batch_size=1)
+        update = table.select_from(
+            "domain, work_type", "where url = '{}'".format(LINKS_INPUT[2][0])
+        )
+
+        # Check that empty values did not replace existing values
+        self.assertEqual(n_rows, 2)
+        self.assertEqual(update, [("github.com", "WebPage")])
+
+    def test_staged_shared_content(self):
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(SHARED_CONTENT_INPUT)
+        table = SharedContentTable(conn=self.conn, infile=INFILE, outfile=OUTFILE)
+
+        # Stage rows with different sets of columns, then merge them at once
+        table.stage(
+            cols=["post_url", "content_url", "height"],
+            rows=[("facebook1", "image1", 10)],
+        )
+        table.stage(
+            cols=["post_url", "content_url", "media_type"],
+            rows=[
+                ("facebook1", "image1", "PhotoObject"),
+                ("facebook2", "image1", None),
+            ],
+        )
+        table.merge_staged()
+        update = table.select_from("*")
+
+        # Check result against expected result
+        self.assertEqual(update, SHARED_CONTENT_STAGED_UPDATE)
+
+    def test_incremental_links(self):
+        # Produce test data and enrich the first run's table
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INPUT)
+        table = LinksTable(
+            conn=self.conn, infile=INFILE, url_col="target_url", outfile=OUTFILE
+        )
+        table.bulk_upsert(cols=["url", "domain"], rows=[LINKS_ENRICHMENT[1]])
+
+        # Rerun with a new in-file, keeping the existing table
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INCREMENTAL_INPUT)
+        table = LinksTable(
+            conn=self.conn,
+            infile=INFILE,
+            url_col="target_url",
+            outfile=OUTFILE,
+            drop=False,
+        )
+        update = table.select_from("url, domain, source")
+
+        # Check that enriched rows were kept and new rows and columns were merged
+        self.assertEqual(update, LINKS_INCREMENTAL_UPDATE)
+
+    def test_enrichment_state(self):
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INPUT)
+        table = LinksTable(
+            conn=self.conn, infile=INFILE, url_col="target_url", outfile=OUTFILE
+        )
+        state = EnrichmentStateTable(
+            conn=self.conn,
+            outfile=OUTFILE,
+            refresh={"buzzsumo": timedelta(days=7), "scraper": None},
+        )
+
+        # Record one success and one failure per source
+        outcomes = [(LINKS_INPUT[1][0], True), (LINKS_INPUT[2][0], False)]
+        state.mark(source="buzzsumo", outcomes=outcomes)
+        state.mark(source="scraper", outcomes=outcomes)
+
+        # Age the Buzzsumo data beyond its maximum age
+        state.execute(
+            "UPDATE enrichment_state SET fetched_at = '2000-01-01T00:00:00' WHERE source = 'buzzsumo'"
+        )
+
+        # Check that stale URLs are due, but not fresh successes nor fresh failures
+        self.assertEqual(
+            state.select_due(source="buzzsumo", links_table=table.name),
+            {LINKS_INPUT[1][0], LINKS_INPUT[2][0]},
+        )
+        self.assertEqual(
+            state.select_due(source="scraper", links_table=table.name),
+            set(),
+        )
+
+        # Check that a failure is retried once its delay has passed
+        state.execute(
+            "UPDATE enrichment_state SET fetched_at = datetime('now', '-2 days') WHERE source = 'scraper'"
+        )
+        self.assertEqual(
+            state.select_due(source="scraper", links_table=table.name),
+            {LINKS_INPUT[2][0]},
+        )
+
+        # Check that the delay doubles with each consecutive failure
+        state.mark(source="scraper", outcomes=[(LINKS_INPUT[2][0], False)])
+        state.execute(
+            "UPDATE enrichment_state SET fetched_at = datetime('now', '-36 hours') WHERE source = 'scraper'"
+        )
+        self.assertEqual(
+            state.select_due(source="scraper", links_table=table.name),
+            set(),
+        )
+        self.assertEqual(
+            state.select_from("url, failures", "WHERE source = 'scraper' ORDER BY url"),
+            [(LINKS_INPUT[1][0], 0), (LINKS_INPUT[2][0], 2)],
+        )
+
+    def test_refresh_policy(self):
+        sources = ["buzzsumo", "scraper"]
+        self.assertEqual(
+            parse_refresh_policy("buzzsumo=7d", sources=sources),
+            {"buzzsumo": timedelta(days=7)},
+        )
+        # Check that an unknown source is rejected rather than ignored
+        with self.assertRaises(ValueError):
+            parse_refresh_policy("buzzsum=7d", sources=sources)
+
+    def test_source_precedence(self):
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INPUT)
+        table = LinksTable(
+            conn=self.conn, infile=INFILE, url_col="target_url", outfile=OUTFILE
+        )
+        precedence = SourcePrecedence.parse("title=youtube>scraper")
+
+        # Stage the sources' results concurrently, as the enrichment's sources do
+        def stage(source):
+            with TableSink(table, batch_size=1, source=source, merge=False) as sink:
+                for _ in range(20):
+                    sink.writerow(PRECEDENCE_RESULTS[source])
+
+        threads = [
+            threading.Thread(target=stage, args=(source,))
+            for source in PRECEDENCE_RESULTS
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        table.merge_sources(groups=precedence.groups(columns=table.dtype_dict.keys()))
+
+        # Check the winner of each column: the declared precedence for the title,
+        # the default precedence for the domain, and the only non-empty value for the work type
+        self.assertEqual(
+            table.select_from(
+                "title, domain, work_type", f"WHERE url = '{LINKS_INPUT[1][0]}'"
+            ),
+            [("YouTube", "scraped.com", "Article")],
+        )
+
+        # Check that the declaration of an unknown column or source is rejected
+        with self.assertRaises(ValueError):
+            SourcePrecedence.parse("titel=youtube>scraper")
+        with self.assertRaises(ValueError):
+            SourcePrecedence.parse("title=youtub>scraper")
+
+    def test_resumed_enrichment(self):
+        # Produce test data
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INPUT)
+
+        def open_tables():
+            conn = connect_to_database(database=str(DATABASE))
+            table = LinksTable(
+                conn=conn,
+                infile=INFILE,
+                url_col="target_url",
+                outfile=OUTFILE,
+                drop=False,
+                durable_staging=True,
+            )
+            state = EnrichmentStateTable(
+                conn=conn, outfile=OUTFILE, drop=False, durable_staging=True
+            )
+            return conn, table, state
+
+        # Checkpoint the first URL's result, then interrupt the run before merging
+        conn, table, state = open_tables()
+        sink = TableSink(
+            table, batch_size=1, source="buzzsumo", state=state, merge=False
+        )
+        sink.writerow({"url": LINKS_INPUT[1][0], "domain": "facebook.com"})
+        sink.mark(LINKS_INPUT[1][0], succeeded=True)
+        sink.writerow({"url": LINKS_INPUT[2][0], "domain": "github.com"})
+        conn.close()
+
+        # Check that the resumed run skips the checkpointed URL and keeps its result
+        conn, table, state = open_tables()
+        self.assertEqual(
+            state.select_due(source="buzzsumo", links_table=table.name),
+            {LINKS_INPUT[2][0]},
+        )
+        table.merge_sources(groups=[(["buzzsumo"], ["domain"])])
+        self.assertEqual(
+            table.select_from("url, domain"),
+            [(LINKS_INPUT[1][0], "facebook.com"), (LINKS_INPUT[2][0], None)],
+        )
+        conn.close()
+
+    def test_resume_with_changed_infile(self):
+        # Produce test data and stage a result, then interrupt the run before merging
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INPUT)
+        conn = connect_to_database(database=str(DATABASE))
+        table = LinksTable(
+            conn=conn,
+            infile=INFILE,
+            url_col="target_url",
+            outfile=OUTFILE,
+            drop=False,
+            durable_staging=True,
+        )
+        sink = TableSink(table, batch_size=1, source="buzzsumo", merge=False)
+        sink.writerow({"url": LINKS_INPUT[1][0], "domain": "facebook.com"})
+        conn.close()
+
+        # Resume with an in-file that adds a column to the table
+        with open(INFILE, "w") as f:
+            writer = csv.writer(f)
+            writer.writerows(LINKS_INCREMENTAL_INPUT)
+        conn = connect_to_database(database=str(DATABASE))
+        table = LinksTable(
+            conn=conn,
+            infile=INFILE,
+            url_col="target_url",
+            outfile=OUTFILE,
+            drop=False,
+            durable_staging=True,
+        )
+        sink = TableSink(table, batch_size=1, source="buzzsumo", merge=False)
+        sink.writerow({"url": LINKS_INPUT[2][0], "domain": "github.com"})
+
+        # Check that the results staged before and after the change are merged
+        table.merge_sources(groups=[(["buzzsumo"], ["domain"])])
+        self.assertEqual(
+            table.select_from("url, domain, source"),
+            [
+                (LINKS_INPUT[1][0], "facebook.com", None),
+                (LINKS_INPUT[2][0], "github.com", None),
+                (LINKS_INCREMENTAL_INPUT[2][0], None, "b"),
+            ],
+        )
+        conn.close()
+
     def tearDown(self):
-        INFILE.unlink()
-        OUTFILE.unlink()
+        INFILE.unlink(missing_ok=True)
+        OUTFILE.unlink(missing_ok=True)
+        DATABASE.unlink(missing_ok=True)
 
 
 INFILE = Path(__file__).parent.joinpath("infile.csv")
+DATABASE = Path(__file__).parent.joinpath("resume.db")
 LINKS_INPUT = [
     ["target_url"],
     ["https://www.facebook.com/100063820962754/posts/721047780032581"],
     ["https://www.github/medialab/minall"],
 ]
+LINKS_INCREMENTAL_INPUT = [
+    ["target_url", "source"],
+    ["https://www.facebook.com/100063820962754/posts/721047780032581", "a"],
+    ["https://www.github/medialab/minet", "b"],
+]
+LINKS_INCREMENTAL_UPDATE = [
+    (
+        "https://www.facebook.com/100063820962754/posts/721047780032581",
+        "facebook.com",
+        None,
+    ),
+    ("https://www.github/medialab/minall", None, None),
+    ("https://www.github/medialab/minet", None, "b"),
+]
+PRECEDENCE_RESULTS = {
+    "buzzsumo": {
+        "url": LINKS_INPUT[1][0],
+        "title": "Buzzsumo",
+        "domain": "buzzsumo.com",
+        "work_type": "Article",
+    },
+    "youtube": {"url": LINKS_INPUT[1][0], "title": "YouTube", "domain": "youtube.com"},
+    "scraper": {"url": LINKS_INPUT[1][0], "title": "Scraped", "domain": "scraped.com"},
+}
 SHARED_CONTENT_INPUT = [
     ["post_url", "content_url"],
     ["facebook1", "image1"],
@@ -75,10 +429,17 @@ SHARED_CONTENT_INPUT = [
 ]
 
 OUTFILE = Path(__file__).parent.joinpath("newfile.csv")
+GZIP_OUTFILE = Path(__file__).parent.joinpath("newfile.csv.gz")
+PARQUET_OUTFILE = Path(__file__).parent.joinpath("newfile.parquet")
 LINKS_ENRICHMENT = [
     ["url", "domain"],
     ["https://www.facebook.com/100063820962754/posts/721047780032581", "facebook.com"],
 ]
+LINKS_BATCHED_ENRICHMENT = [
+    ["url", "domain", "work_type"],
+    ["https://www.github/medialab/minall", "github.com", ""],
+    ["https://www.github/medialab/minall", "", "WebPage"],
+]
 SHARED_CONTENT_ENRICHMENT = [
     ["post_url", "content_url", "media_type"],
     ["facebook1", "image1", "PhotoObject"],
@@ -90,6 +451,29 @@ SHARED_CONTENT_UPDATE = [
     ("facebook1", "image2", "PhotoObject", None, None),
 ]
 
+SHARED_CONTENT_PARQUET_EXPORT = [
+    {
+        "post_url": "facebook1",
+        "content_url": "image1",
+        "media_type": None,
+        "height": 10,
+        "width": 2,
+    },
+    {
+        "post_url": "facebook1",
+        "content_url": "image2",
+        "media_type": None,
+        "height": None,
+        "width": None,
+    },
+]
+
+SHARED_CONTENT_STAGED_UPDATE = [
+    ("facebook1", "image1", "PhotoObject", 10, None),
+    ("facebook1", "image2", None, None, None),
+    ("facebook2", "image1", None, None, None),
+]
+
 
 LINKS_EXPORT = [
     {